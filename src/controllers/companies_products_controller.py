@@ -4,32 +4,69 @@ from PyQt6.QtCore import Qt
 from src.utils.database import SessionLocal
 from src.models import CustomerCompany, Product, Inventory
 from src.utils.dialogs import CompanyDialog, ProductDialog
-from src.utils.helpers import log_action
+from src.utils.helpers import log_action, AuditWriter, BULK_COLLAPSE_THRESHOLD
+from src.utils.search_index import IncrementalSearch, company_search_clause
 
 class CompaniesProductsController:
     def __init__(self, view):
         self.view = view
         self.db_session = SessionLocal()
         self.selected_company = None
+        self.company_search = IncrementalSearch(self.lookup_companies)
+        self._companies_request = 0
 
     def load_companies(self):
+        """Reloads the company list on the task runner; only the newest request is shown."""
+        self._companies_request += 1
+        request = self._companies_request
+        self.view.run_in_background(
+            lambda context: [tuple(row) for row in context.session.query(CustomerCompany.id, CustomerCompany.name)
+                             .order_by(CustomerCompany.name)],
+            on_result=lambda companies: self.show_companies(companies) if request == self._companies_request else None,
+            error_title="Companies Error",
+            profile="reporting",
+        )
+
+    def show_companies(self, companies):
         current_selection = self.view.company_list.currentItem()
         current_id = current_selection.data(Qt.ItemDataRole.UserRole) if current_selection else None
         self.view.company_list.clear()
-        companies = self.db_session.query(CustomerCompany).order_by(CustomerCompany.name).all()
-        for company in companies:
+        for company_id, name in companies:
             item_widget = self.view.ui_manager.create_list_item_widget(
-                company.name, company, self.show_edit_company_dialog, self.handle_delete_company
+                name, company_id,
+                lambda cid: self.with_company(cid, self.show_edit_company_dialog),
+                lambda cid: self.with_company(cid, self.handle_delete_company),
             )
             list_item = QListWidgetItem(self.view.company_list)
             list_item.setSizeHint(item_widget.sizeHint())
-            list_item.setData(Qt.ItemDataRole.UserRole, company.id)
+            list_item.setData(Qt.ItemDataRole.UserRole, company_id)
             self.view.company_list.addItem(list_item)
             self.view.company_list.setItemWidget(list_item, item_widget)
-            if company.id == current_id:
+            if company_id == current_id:
                 self.view.company_list.setCurrentItem(list_item)
+        self.company_search.invalidate()
+        self.view.filter_companies()
         self.view.update_delete_button_state()
 
+    def with_company(self, company_id, action):
+        """Runs ``action(company)`` with the company loaded in this session; reloads the list if it is gone."""
+        company = self.db_session.get(CustomerCompany, company_id)
+        if company is None:
+            self.load_companies()
+            return
+        action(company)
+
+    def lookup_companies(self, term, limit):
+        query = self.db_session.query(CustomerCompany.id, CustomerCompany.name).filter(
+            company_search_clause(self.db_session, term)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        return [(cid, (name or "").lower()) for cid, name in query]
+
+    def search_company_ids(self, search_text):
+        return self.company_search.search(search_text)
+
     def on_company_selected(self, item):
         company_id = item.data(Qt.ItemDataRole.UserRole)
         self.selected_company = self.db_session.query(CustomerCompany).get(company_id)
@@ -117,11 +154,12 @@ class CompaniesProductsController:
         yes_btn.setStyleSheet("background-color: #d32f2f; color: white; font-weight: bold; padding: 6px 18px; border-radius: 5px;")
         msg_box.exec()
         if msg_box.clickedButton() == yes_btn:
-            for cid in company_ids_to_delete:
-                company = self.db_session.get(CustomerCompany, cid)
-                details = f"Company '{company.name}' and its products deleted in bulk."
-                log_action(self.db_session, "DELETE", "Company", cid, details)
-                self.db_session.delete(company)
+            with AuditWriter(self.db_session, BULK_COLLAPSE_THRESHOLD,
+                             summary="{count} companies and their products deleted in bulk.") as audit:
+                for cid in company_ids_to_delete:
+                    company = self.db_session.get(CustomerCompany, cid)
+                    audit.add("DELETE", "Company", cid, f"Company '{company.name}' and its products deleted in bulk.")
+                    self.db_session.delete(company)
             self.db_session.commit()
             self.load_companies()
             if self.selected_company and self.selected_company.id in company_ids_to_delete:
@@ -165,9 +203,11 @@ class CompaniesProductsController:
         if not product_ids_to_delete: return
         reply = QMessageBox.question(self.view, "Confirm Deletion", f"Are you sure you want to delete these {len(product_ids_to_delete)} products?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
         if reply == QMessageBox.StandardButton.Yes:
-            for pid in product_ids_to_delete:
-                product = self.db_session.get(Product, pid)
-                log_action(self.db_session, "DELETE", "Product", pid, f"Product '{product.name}' deleted in bulk.")
-                self.db_session.delete(product)
+            with AuditWriter(self.db_session, BULK_COLLAPSE_THRESHOLD,
+                             summary="{count} products deleted in bulk.") as audit:
+                for pid in product_ids_to_delete:
+                    product = self.db_session.get(Product, pid)
+                    audit.add("DELETE", "Product", pid, f"Product '{product.name}' deleted in bulk.")
+                    self.db_session.delete(product)
             self.db_session.commit()
             self.load_products_for_company()
@@ -1,18 +1,46 @@
 # src/controllers/main_controller.py
-from PyQt6.QtWidgets import QFileDialog, QMessageBox
+import sys
+from PyQt6.QtWidgets import QFileDialog, QMessageBox, QProgressDialog
+from PyQt6.QtCore import Qt, QTimer
 from src.utils.csv_manager import CsvManager
+from src.utils.background import get_task_runner
+
+# Audit log archiving runs shortly after startup, then daily while the app stays open
+ARCHIVE_STARTUP_DELAY_MS = 2 * 60 * 1000
+ARCHIVE_INTERVAL_MS = 24 * 60 * 60 * 1000
 
 class MainController:
     def __init__(self, main_view):
         self.main_view = main_view
-        self.csv_manager = CsvManager(
-            self.main_view.companies_tab_instance,
-            self.main_view.inventory_tab_instance,
-            self.main_view.audit_log_tab_instance,
-            self.main_view.invoice_history_tab_instance
+        # Tabs are built lazily; only the ones already open need refreshing
+        self.csv_manager = CsvManager(self.main_view.tabs_map.get)
+        self.progress_dialog = None
+        self.schedule_audit_archiving()
+
+    def schedule_audit_archiving(self):
+        from src.utils.audit_archive import DEFAULT_RETENTION_DAYS
+        if DEFAULT_RETENTION_DAYS <= 0:
+            return
+        self.archive_timer = QTimer(self.main_view)
+        self.archive_timer.setInterval(ARCHIVE_INTERVAL_MS)
+        self.archive_timer.timeout.connect(self.run_audit_archiving)
+        self.archive_timer.start()
+        QTimer.singleShot(ARCHIVE_STARTUP_DELAY_MS, self.run_audit_archiving)
+
+    def run_audit_archiving(self):
+        from src.utils.audit_archive import archive_job
+        # Silent unless something was archived; failures only go to stderr and are retried next run
+        get_task_runner().submit(
+            archive_job(),
+            on_result=self.on_audit_archived,
+            on_error=lambda message, details: print(f"Audit log archiving failed: {message}\n{details}", file=sys.stderr),
         )
-        # Optionally store reference to CreateInvoiceTab if present
-        self.create_invoice_tab = getattr(self.main_view, 'create_invoice_tab_instance', None)
+
+    def on_audit_archived(self, report):
+        if report.rows_archived:
+            audit_log_tab = self.main_view.tabs_map.get("Audit Log")
+            if audit_log_tab:
+                audit_log_tab.load_logs()
 
     def switch_page(self, name, button):
         if self.main_view.active_nav_button:
@@ -20,14 +48,14 @@ class MainController:
         button.setChecked(True)
         self.main_view.active_nav_button = button
 
-        self.main_view.stacked_widget.setCurrentWidget(self.main_view.tabs_map[name])
+        self.main_view.show_tab(name)
         self.main_view.header_title.setText(name)
         self.main_view.header_subtitle.setText(f"Manage your {name.lower()}")
 
     def handle_import_csv(self):
         dialog = QFileDialog(self.main_view)
         dialog.setFileMode(QFileDialog.FileMode.ExistingFile)
-        dialog.setNameFilter("CSV Files (*.csv)")
+        dialog.setNameFilters(["CSV Files (*.csv)", "Compressed CSV Files (*.csv.gz)"])
         dialog.setViewMode(QFileDialog.ViewMode.Detail)
         if dialog.exec():
             file_name = dialog.selectedFiles()[0]
@@ -39,35 +67,122 @@ class MainController:
                 QMessageBox.critical(self.main_view, "Import Error", "Could not determine import type from file name.")
                 return
 
-            success, message = self.csv_manager.handle_import_csv(file_name, import_type)
-            if success:
-                # Refresh company/product UI after import
-                self.main_view.companies_tab_instance.load_companies()
-                if self.create_invoice_tab:
-                    self.create_invoice_tab.load_latest_data()
-                QMessageBox.information(self.main_view, "Success", message)
+            if import_type == "companies_and_products":
+                # Validate the whole file first so the user sees rejected rows before anything is written
+                self.run_csv_job(
+                    lambda context: self.csv_manager.handle_import_csv(file_name, import_type, dry_run=True,
+                                                                       progress_callback=context.report_progress),
+                    "Validating", lambda result: self.confirm_import(file_name, import_type, result))
             else:
-                QMessageBox.critical(self.main_view, "Import Error", message)
+                self.start_import(file_name, import_type)
+
+    def confirm_import(self, file_name, import_type, result):
+        success, message = result
+        if not success:
+            QMessageBox.critical(self.main_view, "Import Error", message)
+            return
+        reply = QMessageBox.question(self.main_view, "Confirm Import", f"{message}\n\nProceed with the import?",
+                                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
+        if reply == QMessageBox.StandardButton.Yes:
+            self.start_import(file_name, import_type)
+
+    def start_import(self, file_name, import_type):
+        self.run_csv_job(
+            lambda context: self.csv_manager.handle_import_csv(file_name, import_type,
+                                                               progress_callback=context.report_progress),
+            "Importing", lambda result: self.on_import_finished(import_type, result),
+            on_cancelled=lambda: self.on_import_cancelled(import_type))
+
+    def on_import_finished(self, import_type, result):
+        success, message = result
+        if success:
+            self.csv_manager.refresh_views(f"{import_type}_import")
+            # Refresh company/product UI after import
+            if self.main_view.companies_tab_instance:
+                self.main_view.companies_tab_instance.load_companies()
+            if self.main_view.create_invoice_tab_instance:
+                self.main_view.create_invoice_tab_instance.load_latest_data()
+            QMessageBox.information(self.main_view, "Success", message)
+        else:
+            QMessageBox.critical(self.main_view, "Import Error", message)
+
+    def on_import_cancelled(self, import_type):
+        if import_type == "invoices":
+            # Invoice batches are committed as they go
+            self.csv_manager.refresh_views("invoices_import")
+            message = ("Import cancelled. Invoice batches imported before cancelling were kept. "
+                       "Importing the same file again updates those invoices, including rows without an "
+                       "invoice number, instead of duplicating them.")
+        else:
+            message = "Import cancelled. No changes were made."
+        QMessageBox.information(self.main_view, "Import", message)
+
+    def run_csv_job(self, fn, verb, on_result, on_cancelled=None):
+        """Runs a CsvManager call on the task runner behind a cancellable progress dialog."""
+        self.progress_dialog = QProgressDialog(f"{verb}...", "Cancel", 0, 0, self.main_view)
+        self.progress_dialog.setWindowTitle("CSV")
+        self.progress_dialog.setWindowModality(Qt.WindowModality.WindowModal)
+        self.progress_dialog.setMinimumDuration(0)
+        dialog = self.progress_dialog
+
+        def close_dialog():
+            if self.progress_dialog is dialog:
+                self.progress_dialog = None
+            dialog.close()
+
+        def finished(result):
+            close_dialog()
+            on_result(result)
+
+        def failed(message, details):
+            close_dialog()
+            QMessageBox.critical(self.main_view, "CSV Error", message)
+
+        def cancelled():
+            close_dialog()
+            if on_cancelled:
+                on_cancelled()
+
+        job = get_task_runner().submit(
+            fn, on_result=finished, on_error=failed, on_cancelled=cancelled,
+            on_progress=lambda rows: dialog.setLabelText(f"{verb}... {rows:,} rows"),
+            # CsvManager opens its own sessions on the worker thread
+            profile=None,
+        )
+        dialog.canceled.connect(job.cancel)
+        dialog.show()
+        return job
 
     def handle_export_csv(self):
         dialog = QFileDialog(self.main_view)
         dialog.setFileMode(QFileDialog.FileMode.AnyFile)
         dialog.setAcceptMode(QFileDialog.AcceptMode.AcceptSave)
-        dialog.setNameFilter("CSV Files (*.csv)")
+        dialog.setNameFilters(["CSV Files (*.csv)", "Compressed CSV Files (*.csv.gz)"])
         dialog.setDefaultSuffix("csv")
         dialog.setViewMode(QFileDialog.ViewMode.Detail)
         if dialog.exec():
             file_name = dialog.selectedFiles()[0]
             if "companies" in file_name.lower() or "products" in file_name.lower():
                 export_type = "companies_and_products"
+            elif "invoice" in file_name.lower() and "item" in file_name.lower():
+                # e.g. invoice_items.csv: one row per line item
+                export_type = "invoice_items"
             elif "invoice" in file_name.lower():
                 export_type = "invoices"
             else:
                 # Default to companies and products if not specified
                 export_type = "companies_and_products"
 
-            success, message = self.csv_manager.handle_export_csv(file_name, export_type)
-            if success:
-                QMessageBox.information(self.main_view, "Success", message)
-            else:
-                QMessageBox.critical(self.main_view, "Export Error", message)
+            self.run_csv_job(
+                lambda context: self.csv_manager.handle_export_csv(file_name, export_type,
+                                                                   progress_callback=context.report_progress),
+                "Exporting", self.on_export_finished,
+                on_cancelled=lambda: QMessageBox.information(self.main_view, "Export", "Export cancelled."))
+
+    def on_export_finished(self, result):
+        success, message = result
+        if success:
+            self.csv_manager.refresh_views("export")
+            QMessageBox.information(self.main_view, "Success", message)
+        else:
+            QMessageBox.critical(self.main_view, "Export Error", message)
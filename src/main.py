@@ -6,14 +6,21 @@ from PyQt6.QtGui import QFontDatabase
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+from src.utils import startup_timing
 from src.utils.database import Base, engine, SessionLocal
 from src.main_window import SaaSBillingApp
+from src.utils.search_index import ensure_search_index
+from src.utils.migrations import run_migrations
 from src.models import UserSettings # We only need one for the default check
+startup_timing.mark("imports")
 
 def initialize_database():
     """Creates the database and all tables."""
     # The 'Base' object now knows about all models thanks to the imports in src/models/__init__.py
     Base.metadata.create_all(bind=engine)
+    # Brings existing databases up to date (columns, indexes) that create_all won't touch
+    run_migrations(engine)
+    ensure_search_index(engine)
     
     db = SessionLocal()
     if db.query(UserSettings).count() == 0:
@@ -25,6 +32,7 @@ def initialize_database():
 def main():
     try:
         initialize_database()
+        startup_timing.mark("database initialized")
         app = QApplication(sys.argv)
 
         resource_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'resources')
@@ -32,6 +40,8 @@ def main():
         QFontDatabase.addApplicationFont(os.path.join(resource_path, "Roboto-Medium.ttf"))
 
         window = SaaSBillingApp()
+        startup_timing.mark("window constructed")
+        startup_timing.watch_first_paint(window)
         window.show()
         sys.exit(app.exec())
     except Exception as e:
@@ -1,17 +1,27 @@
 import os
+import time
+import importlib
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QPushButton, QLabel, QStackedWidget, QFileDialog, QMessageBox)
 from PyQt6.QtGui import QIcon
+from PyQt6.QtCore import Qt, QTimer
 
 from src.utils.theme import DARK_THEME
+from src.utils.startup_timing import report_tab_built
 from src.controllers.main_controller import MainController
-from src.tabs.dashboard_tab import DashboardTab
-from src.tabs.companies_products_tab import CompaniesProductsTab
-from src.tabs.create_invoice_tab import CreateInvoiceTab
-from src.tabs.invoice_history_tab import InvoiceHistoryTab
-from src.tabs.inventory_tab import InventoryTab
-from src.tabs.settings_tab import SettingsTab
-from src.tabs.audit_log_tab import AuditLogTab
+
+# Page name -> (module, class). Tabs are imported and built on first use,
+# so their queries and heavy imports (matplotlib, reportlab) stay off the
+# startup path.
+TAB_CLASSES = {
+    "Dashboard": ("src.tabs.dashboard_tab", "DashboardTab"),
+    "Companies & Products": ("src.tabs.companies_products_tab", "CompaniesProductsTab"),
+    "Create Invoice": ("src.tabs.create_invoice_tab", "CreateInvoiceTab"),
+    "Past Invoices": ("src.tabs.invoice_history_tab", "InvoiceHistoryTab"),
+    "Inventory": ("src.tabs.inventory_tab", "InventoryTab"),
+    "Audit Log": ("src.tabs.audit_log_tab", "AuditLogTab"),
+    "Settings": ("src.tabs.settings_tab", "SettingsTab"),
+}
 
 class SaaSBillingApp(QMainWindow):
     def __init__(self):
@@ -21,22 +31,9 @@ class SaaSBillingApp(QMainWindow):
         self.active_nav_button = None
         self.resource_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..', 'resources')
 
-        self.companies_tab_instance = CompaniesProductsTab()
-        self.inventory_tab_instance = InventoryTab()
-        self.audit_log_tab_instance = AuditLogTab()
-        self.invoice_history_tab_instance = InvoiceHistoryTab()
-
-
-        self.create_invoice_tab_instance = CreateInvoiceTab()
-        self.tabs_map = {
-            "Dashboard": DashboardTab(),
-            "Companies & Products": self.companies_tab_instance,
-            "Create Invoice": self.create_invoice_tab_instance,
-            "Past Invoices": self.invoice_history_tab_instance,
-            "Inventory": self.inventory_tab_instance,
-            "Audit Log": self.audit_log_tab_instance,
-            "Settings": SettingsTab()
-        }
+        # Built tabs by page name; the rest are "Loading..." placeholders in the stack
+        self.tabs_map = {}
+        self.placeholders = {}
 
         self.controller = MainController(self)
         self.init_ui()
@@ -64,8 +61,12 @@ class SaaSBillingApp(QMainWindow):
         self.stacked_widget = QStackedWidget()
         right_area_layout.addWidget(self.stacked_widget)
 
-        for widget in self.tabs_map.values():
-            self.stacked_widget.addWidget(widget)
+        for name in TAB_CLASSES:
+            placeholder = QLabel("Loading...")
+            placeholder.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            placeholder.setObjectName("tab-placeholder")
+            self.placeholders[name] = placeholder
+            self.stacked_widget.addWidget(placeholder)
 
         self.switch_page("Dashboard", self.dashboard_btn)
 
@@ -150,6 +151,60 @@ class SaaSBillingApp(QMainWindow):
     def switch_page(self, name, button):
         self.controller.switch_page(name, button)
 
+    # Built tab instances, or None until the page has been opened
+    @property
+    def companies_tab_instance(self):
+        return self.tabs_map.get("Companies & Products")
+
+    @property
+    def inventory_tab_instance(self):
+        return self.tabs_map.get("Inventory")
+
+    @property
+    def audit_log_tab_instance(self):
+        return self.tabs_map.get("Audit Log")
+
+    @property
+    def invoice_history_tab_instance(self):
+        return self.tabs_map.get("Past Invoices")
+
+    @property
+    def create_invoice_tab_instance(self):
+        return self.tabs_map.get("Create Invoice")
+
+    def get_tab(self, name):
+        """Returns the tab for a page, importing and building it now if needed."""
+        if name not in self.tabs_map:
+            started = time.perf_counter()
+            module_name, class_name = TAB_CLASSES[name]
+            tab = getattr(importlib.import_module(module_name), class_name)()
+            placeholder = self.placeholders.pop(name)
+            was_current = self.stacked_widget.currentWidget() is placeholder
+            self.stacked_widget.insertWidget(self.stacked_widget.indexOf(placeholder), tab)
+            self.stacked_widget.removeWidget(placeholder)
+            placeholder.deleteLater()
+            self.tabs_map[name] = tab
+            if was_current:
+                self.stacked_widget.setCurrentWidget(tab)
+            report_tab_built(name, time.perf_counter() - started)
+        return self.tabs_map[name]
+
+    def show_tab(self, name):
+        """Shows a page; an unbuilt tab shows its placeholder first and is built once that has painted."""
+        if name in self.tabs_map:
+            self.stacked_widget.setCurrentWidget(self.tabs_map[name])
+            return
+        self.stacked_widget.setCurrentWidget(self.placeholders[name])
+        QTimer.singleShot(0, lambda: self.get_tab(name))
+
+    def closeEvent(self, event):
+        # Stop background jobs at their next cancellation point before the sessions go away
+        from src.utils.background import get_task_runner
+        runner = get_task_runner()
+        runner.cancel_all()
+        runner.wait_for_done(5000)
+        super().closeEvent(event)
+
     def apply_styles(self):
         self.setStyleSheet(f"""
             QMainWindow {{ background-color: {DARK_THEME['bg_main']}; font-family: Roboto; }}
@@ -171,6 +226,7 @@ class SaaSBillingApp(QMainWindow):
             #top-header {{ background-color: {DARK_THEME['bg_surface']}; border-bottom: 1px solid {DARK_THEME['border_main']}; }}
             #header-title {{ font-size: 20px; font-weight: 600; color: {DARK_THEME['text_primary']}; }}
             #header-subtitle {{ font-size: 13px; color: {DARK_THEME['text_secondary']}; }}
+            #tab-placeholder {{ font-size: 15px; color: {DARK_THEME['text_secondary']}; }}
             
             #header-button {{
                 background-color: transparent; color: {DARK_THEME['text_secondary']};
@@ -3,6 +3,9 @@
 from .user import UserSettings
 from .company import CustomerCompany
 from .product import Product
-from .invoice import Invoice, InvoiceItem, Payment
+from .invoice import Invoice, InvoiceItem, Payment, InvoiceSequence
 from .inventory import Inventory, InventoryHistory
-from .audit_log import AuditLog
\ No newline at end of file
+from .audit_log import AuditLog
+from .pdf_cache import PdfCacheEntry
+from .sales_rollup import DailySales, DailyInvoiceTotals
+from .audit_archive import AuditArchiveSegment
\ No newline at end of file
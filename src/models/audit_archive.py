@@ -0,0 +1,20 @@
+# src/models/audit_archive.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from src.utils.database import Base
+
+class AuditArchiveSegment(Base):
+    """One gzip JSONL file of archived audit log entries; see src/utils/audit_archive.py."""
+    __tablename__ = 'audit_archive_segments'
+    id = Column(Integer, primary_key=True)
+    file_name = Column(String, unique=True, nullable=False)  # relative to the archive directory
+    first_id = Column(Integer, nullable=False)
+    last_id = Column(Integer, nullable=False)
+    first_timestamp = Column(String, nullable=False, index=True)  # same text format as audit_logs.timestamp
+    last_timestamp = Column(String, nullable=False, index=True)
+    row_count = Column(Integer, nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    # Comma-separated distinct values, so searches can skip segments without opening them
+    actions = Column(String)
+    entity_types = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -1,13 +1,17 @@
 # src/models/audit_log.py
-from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy import Column, Integer, String, DateTime, Index
 from sqlalchemy.sql import func
 from src.utils.database import Base
 
 class AuditLog(Base):
     __tablename__ = 'audit_logs'
     id = Column(Integer, primary_key=True, index=True)
-    timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    action = Column(String)       # e.g., 'CREATE', 'UPDATE', 'DELETE', 'IMPORT'
+    timestamp = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    action = Column(String, index=True)  # e.g., 'CREATE', 'UPDATE', 'DELETE', 'IMPORT'
     entity_type = Column(String)  # e.g., 'Company', 'Product', 'Inventory', 'System'
     entity_id = Column(Integer, nullable=True)
-    details = Column(String)      # e.g., "Company 'ABC Corp' created."
\ No newline at end of file
+    details = Column(String)      # e.g., "Company 'ABC Corp' created."
+
+    __table_args__ = (
+        Index('ix_audit_logs_entity_type_entity_id', 'entity_type', 'entity_id'),
+    )
\ No newline at end of file
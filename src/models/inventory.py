@@ -1,5 +1,5 @@
 # src/models/inventory.py
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from src.utils.database import Base
@@ -17,10 +17,14 @@ class Inventory(Base):
 
 class InventoryHistory(Base):
     __tablename__ = 'inventory_history'
+    __table_args__ = (
+        # Per-product history in time order
+        Index('ix_inventory_history_product_id_timestamp', 'product_id', 'timestamp'),
+    )
     id = Column(Integer, primary_key=True, index=True)
     product_id = Column(Integer, ForeignKey('products.id'))
     change_quantity = Column(Integer)
     new_stock = Column(Integer)  # Track resulting stock after change
     reason = Column(String)
     timestamp = Column(DateTime(timezone=True), server_default=func.now())
-    user_id = Column(Integer, nullable=True)  # Optionally track user
\ No newline at end of file
+    user_id = Column(Integer, nullable=True)  # Optionally track user
\ No newline at end of file
@@ -6,11 +6,13 @@ class Invoice(Base):
     __tablename__ = 'invoices'
     id = Column(Integer, primary_key=True, index=True)
     invoice_number = Column(String, unique=True, nullable=False)
-    customer_id = Column(Integer, ForeignKey('customer_companies.id'))
+    customer_id = Column(Integer, ForeignKey('customer_companies.id'), index=True)
     vehicle_number = Column(String)
-    date = Column(Date, nullable=False)
+    date = Column(Date, nullable=False, index=True)
     total_amount = Column(Float)
-    payment_status = Column(String)
+    payment_status = Column(String, index=True)
+    # Identity of a CSV row imported without an InvoiceNumber, so re-importing it finds this invoice
+    import_key = Column(String, unique=True, index=True)
     
     # SQLAlchemy can now find 'CustomerCompany' correctly
     customer = relationship("CustomerCompany", back_populates="invoices")
@@ -20,7 +22,7 @@ class Invoice(Base):
 class InvoiceItem(Base):
     __tablename__ = 'invoice_items'
     id = Column(Integer, primary_key=True, index=True)
-    invoice_id = Column(Integer, ForeignKey('invoices.id'))
+    invoice_id = Column(Integer, ForeignKey('invoices.id'), index=True)
     product_name = Column(String)
     quantity = Column(Integer)
     price_per_unit = Column(Float)
@@ -33,4 +35,10 @@ class Payment(Base):
     payment_date = Column(Date)
     amount_paid = Column(Float)
     payment_method = Column(String)
-    invoice = relationship("Invoice", back_populates="payments")
\ No newline at end of file
+    invoice = relationship("Invoice", back_populates="payments")
+
+class InvoiceSequence(Base):
+    __tablename__ = 'invoice_sequences'
+    # Number prefix, e.g. 'INV-' or 'INV-2025-26-' for per-financial-year numbering
+    prefix = Column(String, primary_key=True)
+    last_value = Column(Integer, nullable=False, default=0)
\ No newline at end of file
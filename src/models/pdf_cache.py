@@ -0,0 +1,14 @@
+# src/models/pdf_cache.py
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from src.utils.database import Base
+
+class PdfCacheEntry(Base):
+    __tablename__ = 'pdf_cache_entries'
+    # sha256 of the invoice payload, rendered settings fields and template version
+    cache_key = Column(String, primary_key=True)
+    invoice_number = Column(String, index=True)
+    file_path = Column(String, nullable=False)  # relative to the cache directory
+    size_bytes = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    last_accessed = Column(DateTime(timezone=True), server_default=func.now(), index=True)
@@ -6,9 +6,9 @@ from src.utils.database import Base
 class Product(Base):
     __tablename__ = 'products'
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
+    name = Column(String, nullable=False, index=True)
     price = Column(Float, nullable=False)
-    company_id = Column(Integer, ForeignKey('customer_companies.id'))
+    company_id = Column(Integer, ForeignKey('customer_companies.id'), index=True)
     
     company = relationship("CustomerCompany", back_populates="products")
     # --- DEFINITIVE FIX: Establishes the one-to-one link to its inventory record ---
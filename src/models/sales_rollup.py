@@ -0,0 +1,29 @@
+# src/models/sales_rollup.py
+from sqlalchemy import Column, Integer, String, Float, Date, Index
+from src.utils.database import Base
+
+# Pre-aggregated copies of invoices/invoice_items for the dashboard; kept in
+# sync by src/utils/sales_rollup.py and rebuildable from the facts at any time.
+
+class DailySales(Base):
+    __tablename__ = 'daily_sales'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    customer_id = Column(Integer)
+    product_name = Column(String)
+    quantity = Column(Integer, nullable=False, default=0)
+    revenue = Column(Float, nullable=False, default=0)  # sum of quantity * price_per_unit
+    __table_args__ = (
+        Index('ix_daily_sales_date_customer_id', 'date', 'customer_id'),
+    )
+
+class DailyInvoiceTotals(Base):
+    __tablename__ = 'daily_invoice_totals'
+    id = Column(Integer, primary_key=True)
+    date = Column(Date, nullable=False)
+    customer_id = Column(Integer)
+    invoice_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0)
+    __table_args__ = (
+        Index('ix_daily_invoice_totals_date_customer_id', 'date', 'customer_id'),
+    )
@@ -1,9 +1,12 @@
 # src/tabs/audit_log_tab.py
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-                             QHeaderView, QHBoxLayout, QLabel, QAbstractItemView, QPushButton)
+from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableView, QHeaderView, QHBoxLayout, QLabel,
+                             QAbstractItemView, QPushButton, QComboBox, QLineEdit, QCheckBox, QDateEdit, QMessageBox)
+from PyQt6.QtCore import QDate
+from PyQt6.QtGui import QIntValidator
 from src.utils.database import SessionLocal
-from src.models import AuditLog
 from src.utils.theme import DARK_THEME
+from src.utils.debounce import Debouncer
+from src.utils.audit_log_model import AuditLogTableModel, AUDIT_ACTIONS, AUDIT_ENTITY_TYPES
 
 from src.tabs.base_tab import BaseTab
 
@@ -28,52 +31,101 @@ class AuditLogTab(BaseTab):
         refresh_btn.clicked.connect(self.load_logs)
         header_layout.addWidget(refresh_btn)
 
-        self.log_table = QTableWidget()
-        self.log_table.setColumnCount(4)
-        self.log_table.setHorizontalHeaderLabels(["Timestamp", "Action", "Entity", "Details"])
+        # Filters; all applied in SQL by the model
+        filter_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search details...")
+        self.search_debouncer = Debouncer(self.apply_filters, delay_ms=250, parent=self)
+        self.search_input.textChanged.connect(self.search_debouncer.trigger)
+        self.action_combo = QComboBox()
+        self.action_combo.addItems(["All Actions"] + AUDIT_ACTIONS)
+        self.action_combo.currentIndexChanged.connect(self.apply_filters)
+        self.entity_combo = QComboBox()
+        self.entity_combo.addItems(["All Entities"] + AUDIT_ENTITY_TYPES)
+        self.entity_combo.currentIndexChanged.connect(self.apply_filters)
+        self.entity_id_input = QLineEdit()
+        self.entity_id_input.setPlaceholderText("Entity ID")
+        self.entity_id_input.setValidator(QIntValidator(0, 2**31 - 1, self))
+        self.entity_id_input.setFixedWidth(90)
+        self.entity_id_input.textChanged.connect(self.search_debouncer.trigger)
+        self.date_range_check = QCheckBox("Date range")
+        self.date_range_check.toggled.connect(self.apply_filters)
+        self.from_date = QDateEdit(QDate.currentDate().addMonths(-1))
+        self.from_date.setCalendarPopup(True)
+        self.from_date.dateChanged.connect(self.on_date_changed)
+        self.to_date = QDateEdit(QDate.currentDate())
+        self.to_date.setCalendarPopup(True)
+        self.to_date.dateChanged.connect(self.on_date_changed)
+        filter_layout.addWidget(self.search_input, 1)
+        filter_layout.addWidget(self.action_combo)
+        filter_layout.addWidget(self.entity_combo)
+        filter_layout.addWidget(self.entity_id_input)
+        filter_layout.addWidget(self.date_range_check)
+        filter_layout.addWidget(self.from_date)
+        filter_layout.addWidget(QLabel("to"))
+        filter_layout.addWidget(self.to_date)
+
+        # Rows are fetched in batches as the view scrolls
+        self.log_model = AuditLogTableModel(batch_size=200, parent=self)
+        self.log_model.fetch_failed.connect(lambda message: QMessageBox.critical(self, "Audit Log Error", message))
+        self.log_table = QTableView()
+        self.log_table.setModel(self.log_model)
         self.log_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.log_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.ResizeToContents)
         self.log_table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
         self.log_table.horizontalHeader().setSectionResizeMode(3, QHeaderView.ResizeMode.Stretch)
+        self.log_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.log_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.log_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.log_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
-        self.log_table.cellDoubleClicked.connect(self.show_details_dialog)
+        self.log_table.doubleClicked.connect(lambda index: self.show_details_dialog(index.row(), index.column()))
 
         main_layout.addLayout(header_layout)
+        main_layout.addLayout(filter_layout)
         main_layout.addWidget(self.log_table, 1)
 
+    def on_date_changed(self):
+        if self.date_range_check.isChecked():
+            self.apply_filters()
+
+    def apply_filters(self):
+        action = self.action_combo.currentText()
+        entity_type = self.entity_combo.currentText()
+        entity_id = self.entity_id_input.text().strip()
+        use_dates = self.date_range_check.isChecked()
+        self.log_model.set_filters(
+            action=action if action in AUDIT_ACTIONS else None,
+            entity_type=entity_type if entity_type in AUDIT_ENTITY_TYPES else None,
+            entity_id=int(entity_id) if entity_id else None,
+            from_date=self.from_date.date().toPyDate() if use_dates else None,
+            to_date=self.to_date.date().toPyDate() if use_dates else None,
+            search_text=self.search_input.text(),
+        )
+
     def load_logs(self):
-        self.log_table.setRowCount(0)
-        self.logs = self.db_session.query(AuditLog).order_by(AuditLog.timestamp.desc()).all()
-        for log in self.logs:
-            row = self.log_table.rowCount()
-            self.log_table.insertRow(row)
-            self.log_table.setItem(row, 0, QTableWidgetItem(log.timestamp.strftime("%Y-%m-%d %H:%M:%S")))
-            self.log_table.setItem(row, 1, QTableWidgetItem(log.action))
-            entity_str = f"{log.entity_type} (ID: {log.entity_id})" if log.entity_id else log.entity_type
-            self.log_table.setItem(row, 2, QTableWidgetItem(entity_str))
-            details_item = QTableWidgetItem(log.details)
-            self.log_table.setItem(row, 3, details_item)
+        # Resetting the model lets the view pull the first batch through fetchMore, on a worker thread.
+        # End this session's read transaction too so the details dialog sees the same entries
+        self.db_session.rollback()
+        self.log_model.refresh()
 
     def show_details_dialog(self, row, col):
         # Only show dialog for Details column or STOCK_ADJUST/PRODUCT/INVENTORY actions
-        log = self.logs[row]
-        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QDialogButtonBox
+        log_id, timestamp, action, entity_type, entity_id, details = self.log_model.log_row(row)
+        from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QDialogButtonBox, QListWidget
+        from src.utils.helpers import parse_summary_details
         from src.models import Product, Inventory, CustomerCompany
         session = self.db_session
-        details = log.details
         dialog = QDialog(self)
         dialog.setWindowTitle("Audit Log Details")
         layout = QVBoxLayout(dialog)
         # Main info
-        layout.addWidget(QLabel(f"<b>Timestamp:</b> {log.timestamp.strftime('%Y-%m-%d %H:%M:%S')}"))
-        layout.addWidget(QLabel(f"<b>Action:</b> {log.action}"))
-        layout.addWidget(QLabel(f"<b>Entity:</b> {log.entity_type} (ID: {log.entity_id})"))
+        layout.addWidget(QLabel(f"<b>Timestamp:</b> {timestamp.strftime('%Y-%m-%d %H:%M:%S') if timestamp else ''}"))
+        layout.addWidget(QLabel(f"<b>Action:</b> {action}"))
+        layout.addWidget(QLabel(f"<b>Entity:</b> {entity_type} (ID: {entity_id})"))
         # If inventory/product, show more info
-        if log.entity_type in ("Inventory", "Product") and log.entity_id:
-            if log.entity_type == "Inventory":
-                inv = session.query(Inventory).filter_by(id=log.entity_id).first()
+        if entity_type in ("Inventory", "Product") and entity_id:
+            if entity_type == "Inventory":
+                inv = session.query(Inventory).filter_by(id=entity_id).first()
                 if inv:
                     prod = session.query(Product).filter_by(id=inv.product_id).first()
                     if prod:
@@ -87,8 +139,8 @@ class AuditLogTab(BaseTab):
                                 layout.addWidget(QLabel(f"<b>State:</b> {company.state or ''} ({company.state_code or ''})"))
                         layout.addWidget(QLabel(f"<b>Stock Quantity:</b> {inv.stock_quantity}"))
                         layout.addWidget(QLabel(f"<b>Low Stock Threshold:</b> {inv.low_stock_threshold}"))
-            elif log.entity_type == "Product":
-                prod = session.query(Product).filter_by(id=log.entity_id).first()
+            elif entity_type == "Product":
+                prod = session.query(Product).filter_by(id=entity_id).first()
                 if prod:
                     layout.addWidget(QLabel(f"<b>Product:</b> {prod.name} (ID: {prod.id})"))
                     layout.addWidget(QLabel(f"<b>Price:</b> ₹{prod.price:,.2f}"))
@@ -98,8 +150,16 @@ class AuditLogTab(BaseTab):
                             layout.addWidget(QLabel(f"<b>Company:</b> {company.name} (ID: {company.id})"))
                             layout.addWidget(QLabel(f"<b>GSTIN:</b> {company.gstin or ''}"))
                             layout.addWidget(QLabel(f"<b>State:</b> {company.state or ''} ({company.state_code or ''})"))
-        # Always show details
-        layout.addWidget(QLabel(f"<b>Details:</b> {details}"))
+        # Always show details; collapsed bulk entries list every record
+        summary = parse_summary_details(details) if entity_id is None else None
+        if summary is not None:
+            layout.addWidget(QLabel(f"<b>Details:</b> {summary.get('message', '')}"))
+            entries = QListWidget()
+            for record_id, record_details in summary.get("entries") or [(i, "") for i in summary["entity_ids"]]:
+                entries.addItem(f"ID {record_id}: {record_details}" if record_details else f"ID {record_id}")
+            layout.addWidget(entries)
+        else:
+            layout.addWidget(QLabel(f"<b>Details:</b> {details}"))
         # Dialog buttons
         buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok)
         buttons.accepted.connect(dialog.accept)
@@ -110,7 +170,7 @@ class AuditLogTab(BaseTab):
 
     def apply_styles(self):
         self.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {DARK_THEME['bg_surface']};
                 gridline-color: {DARK_THEME['border_main']};
                 border: 1px solid {DARK_THEME['border_main']};
@@ -124,7 +184,7 @@ class AuditLogTab(BaseTab):
                 border-bottom: 1px solid {DARK_THEME['border_main']};
                 font-weight: 600;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 10px;
                 border-bottom: 1px solid {DARK_THEME['border_main']};
                 color: {DARK_THEME['text_primary']};
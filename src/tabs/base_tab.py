@@ -1,5 +1,5 @@
 # src/tabs/base_tab.py
-from PyQt6.QtWidgets import QWidget
+from PyQt6.QtWidgets import QWidget, QMessageBox
 
 class BaseTab(QWidget):
     def __init__(self, parent=None):
@@ -10,3 +10,22 @@ class BaseTab(QWidget):
         # get the database session from a central location.
         from src.utils.database import SessionLocal
         return SessionLocal()
+
+    def run_in_background(self, fn, on_result=None, on_progress=None, on_cancelled=None, on_error=None,
+                          error_title="Error", **kwargs):
+        """Runs ``fn(context)`` on the task runner with its own session; errors are shown in a message box.
+
+        ``on_error(message, details)``, if given, runs just before the message box.
+
+        ``fn`` must only use ``context.session``, never ``self.db_session``,
+        and must return plain data rather than touching widgets.
+        """
+        from src.utils.background import get_task_runner
+
+        def show_error(message, details):
+            if on_error:
+                on_error(message, details)
+            QMessageBox.critical(self, error_title, message)
+
+        return get_task_runner().submit(fn, on_result=on_result, on_error=show_error, on_progress=on_progress,
+                                        on_cancelled=on_cancelled, **kwargs)
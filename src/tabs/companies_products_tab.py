@@ -5,6 +5,7 @@ from PyQt6.QtCore import Qt
 from src.utils.theme import DARK_THEME
 from src.controllers.companies_products_controller import CompaniesProductsController
 from src.utils.ui_manager import UIManager
+from src.utils.debounce import Debouncer
 
 from src.tabs.base_tab import BaseTab
 
@@ -40,7 +41,9 @@ class CompaniesProductsTab(BaseTab):
         search_frame.setObjectName("search-frame")
         self.company_search_input = QLineEdit()
         self.company_search_input.setPlaceholderText("Search companies...")
-        self.company_search_input.textChanged.connect(self.filter_companies)
+        # Typing is coalesced into one lookup once the user pauses
+        self.company_search_debouncer = Debouncer(self.filter_companies, delay_ms=250, parent=self)
+        self.company_search_input.textChanged.connect(self.company_search_debouncer.trigger)
         search_layout.addWidget(self.company_search_input)
         left_layout.addWidget(search_frame)
 
@@ -130,11 +133,12 @@ class CompaniesProductsTab(BaseTab):
         return header
 
     def filter_companies(self):
-        search_text = self.company_search_input.text().lower()
+        search_text = self.company_search_input.text().strip()
+        matching_ids = set(self.controller.search_company_ids(search_text)) if search_text else None
         for i in range(self.company_list.count()):
             item = self.company_list.item(i)
-            widget = self.company_list.itemWidget(item)
-            item.setHidden(search_text not in widget.label.text().lower())
+            company_id = item.data(Qt.ItemDataRole.UserRole)
+            item.setHidden(matching_ids is not None and company_id not in matching_ids)
 
     def on_company_selection_changed(self):
         for i in range(self.company_list.count()):
@@ -6,10 +6,12 @@ from PyQt6.QtCore import QDate, Qt
 from src.models.inventory import Inventory
 
 from src.utils.database import SessionLocal
-from src.models import CustomerCompany, Product, Invoice, InvoiceItem, UserSettings, InventoryHistory
+from src.models import CustomerCompany, Product, UserSettings
 from src.utils.theme import DARK_THEME
-from src.utils.pdf_service import PdfService
 from src.utils.invoice_number_service import InvoiceNumberService
+from src.utils.invoice_posting import InvoicePostingService, InsufficientStockError
+from sqlalchemy.exc import SQLAlchemyError
+from src.utils.query_profiles import with_profile
 
 from src.tabs.base_tab import BaseTab
 
@@ -39,6 +41,7 @@ class CreateInvoiceTab(BaseTab):
         super().__init__()
         self.db_session = self.get_db_session()
         self.invoice_number_service = InvoiceNumberService()
+        self.invoice_posting_service = InvoicePostingService(self.db_session, self.invoice_number_service)
         self.init_ui()
         self.apply_styles()
         self.load_initial_data()
@@ -153,9 +156,8 @@ class CreateInvoiceTab(BaseTab):
         self.product_combo.clear()
         if company_id:
             products = (
-                self.db_session.query(Product)
+                with_profile(self.db_session.query(Product), "product_stock")
                 .filter(Product.company_id == company_id)
-                .outerjoin(Product.inventory)
                 .all()
             )
             for i, product in enumerate(products):
@@ -183,8 +185,8 @@ class CreateInvoiceTab(BaseTab):
             return
         # Check for duplicate product in table
         for row in range(self.items_table.rowCount()):
-            existing_name = self.items_table.item(row, 0).text()
-            if existing_name == product.name:
+            existing_id = self.items_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            if existing_id == product.id:
                 # Ask user if they want to add to previous quantity
                 reply = QMessageBox.question(self, "Duplicate Product", f"'{product.name}' is already in the invoice.\nDo you want to add this quantity to the previous one?", QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.Yes)
                 if reply == QMessageBox.StandardButton.Yes:
@@ -202,7 +204,9 @@ class CreateInvoiceTab(BaseTab):
 
         row_position = self.items_table.rowCount()
         self.items_table.insertRow(row_position)
-        self.items_table.setItem(row_position, 0, QTableWidgetItem(product.name))
+        name_item = QTableWidgetItem(product.name)
+        name_item.setData(Qt.ItemDataRole.UserRole, product.id)
+        self.items_table.setItem(row_position, 0, name_item)
         self.items_table.setItem(row_position, 1, QTableWidgetItem(f"₹{product.price:,.2f}"))
         self.items_table.setItem(row_position, 2, QTableWidgetItem(str(quantity)))
         self.items_table.setItem(row_position, 3, QTableWidgetItem(f"₹{product.price * quantity:,.2f}"))
@@ -224,6 +228,8 @@ class CreateInvoiceTab(BaseTab):
 
     def generate_invoice_pdf(self):
         import os
+        # reportlab is only loaded once a PDF is actually needed
+        from src.utils.pdf_service import generate_invoice_job
         from PyQt6.QtWidgets import QMessageBox
         from PyQt6.QtGui import QDesktopServices
         from PyQt6.QtCore import QUrl
@@ -244,11 +250,13 @@ class CreateInvoiceTab(BaseTab):
         for row in range(self.items_table.rowCount()):
             try:
                 product_name = self.items_table.item(row, 0).text()
+                product_id = self.items_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
                 quantity_text = self.items_table.item(row, 2).text()
                 price_text = self.items_table.item(row, 1).text().replace("₹", "").replace(",", "")
                 quantity = self.safe_int(quantity_text)
                 price_per_unit = self.safe_float(price_text)
                 items.append({
+                    "product_id": product_id,
                     "product_name": product_name,
                     "quantity": quantity,
                     "price_per_unit": price_per_unit
@@ -304,57 +312,31 @@ class CreateInvoiceTab(BaseTab):
                 return
             # else: overwrite
 
-        pdf_service = PdfService(settings)
-        pdf_service.generate_invoice(invoice_data, file_path=file_path)
-        msg = QMessageBox(self)
-        msg.setWindowTitle("PDF Saved")
-        msg.setText(f"Invoice PDF generated and saved as {file_path}\n\nWould you like to open the PDF folder?")
-        open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
-        close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.exec()
-        if msg.clickedButton() == open_btn:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
+        def show_saved(file_path):
+            msg = QMessageBox(self)
+            msg.setWindowTitle("PDF Saved")
+            msg.setText(f"Invoice PDF generated and saved as {file_path}\n\nWould you like to open the PDF folder?")
+            open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
+            close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.exec()
+            if msg.clickedButton() == open_btn:
+                QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
 
-    def save_invoice(self, invoice_data):
-        invoice_number = self.invoice_number_service.get_next_invoice_number()
-        new_invoice = Invoice(
-            invoice_number=invoice_number,
-            customer_id=invoice_data['customer_id'],
-            vehicle_number=invoice_data['vehicle_number'],
-            date=invoice_data['date'],
-            total_amount=invoice_data['total_amount']
-        )
-        self.db_session.add(new_invoice)
-        self.db_session.flush()
+        # Render off the GUI thread; the invoice itself is already saved
+        self.run_in_background(generate_invoice_job(invoice_data, file_path), on_result=show_saved, error_title="PDF Error")
 
+    def save_invoice(self, invoice_data):
         user_id = None  # TODO: Replace with actual user ID if available
-        for item in invoice_data['items']:
-            product = self.db_session.query(Product).filter(Product.name == item['product_name']).first()
-            if product:
-                if product.inventory.stock_quantity < item['quantity']:
-                    QMessageBox.critical(self, "Error", f"Insufficient stock for {product.name}.")
-                    return None
-                product.inventory.stock_quantity -= item['quantity']
-                history_entry = InventoryHistory(
-                    product_id=product.id,
-                    change_quantity=-item['quantity'],
-                    new_stock=product.inventory.stock_quantity,
-                    reason=f"Invoice {invoice_number}",
-                    user_id=user_id
-                )
-                self.db_session.add(history_entry)
-
-            new_item = InvoiceItem(
-                invoice_id=new_invoice.id,
-                product_name=item['product_name'],
-                quantity=item['quantity'],
-                price_per_unit=item['price_per_unit']
-            )
-            self.db_session.add(new_item)
-
-        self.db_session.commit()
-        return new_invoice
+        try:
+            return self.invoice_posting_service.post_invoice(invoice_data, user_id=user_id)
+        except InsufficientStockError as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return None
+        except SQLAlchemyError as e:
+            # post_invoice has already rolled back, so the form can simply be saved again
+            QMessageBox.critical(self, "Error", f"The invoice could not be saved:\n{e}")
+            return None
 
     def apply_styles(self):
         self.setStyleSheet(f"""
@@ -4,8 +4,7 @@ from PyQt6.QtCore import Qt
 from sqlalchemy import func
 from src.utils.theme import DARK_THEME
 from src.utils.database import SessionLocal
-from src.models import Invoice, CustomerCompany, InvoiceItem
-from src.utils.plot_canvas import PlotCanvas
+from src.models import CustomerCompany, DailySales, DailyInvoiceTotals
 
 from src.tabs.base_tab import BaseTab
 
@@ -54,10 +53,13 @@ class DashboardTab(BaseTab):
         # --- Graphs ---
         grid_layout = QGridLayout()
         grid_layout.setSpacing(28)
-        self.top_products_chart = PlotCanvas(self, width=5, height=4)
-        self.invoice_stats_chart = PlotCanvas(self, width=5, height=4)
+        # Placeholders until the first data arrives; see ensure_charts
+        self.chart_grid = grid_layout
+        self.top_products_chart = self.create_graph_placeholder("Top 5 Products by Quantity Sold")
+        self.revenue_chart = self.create_graph_placeholder("Revenue Over Time")
+        self.charts_ready = False
         grid_layout.addWidget(self.top_products_chart, 0, 0)
-        grid_layout.addWidget(self.invoice_stats_chart, 0, 1)
+        grid_layout.addWidget(self.revenue_chart, 0, 1)
         main_layout.addLayout(grid_layout)
         main_layout.addStretch()
 
@@ -85,57 +87,107 @@ class DashboardTab(BaseTab):
         layout.addWidget(label)
         return graph_frame
 
+    def ensure_charts(self):
+        """Swaps the placeholders for matplotlib canvases; matplotlib is imported here, not at startup."""
+        if self.charts_ready:
+            return
+        from src.utils.plot_canvas import PlotCanvas
+        for attr in ("top_products_chart", "revenue_chart"):
+            placeholder = getattr(self, attr)
+            chart = PlotCanvas(self, width=5, height=4)
+            self.chart_grid.replaceWidget(placeholder, chart)
+            placeholder.deleteLater()
+            setattr(self, attr, chart)
+        self.charts_ready = True
+
     def load_dashboard_data(self):
-        from PyQt6.QtCore import QDate
-        from sqlalchemy import and_
         # Date filter
         from_date = self.from_date.date().toPyDate() if hasattr(self, 'from_date') else None
         to_date = self.to_date.date().toPyDate() if hasattr(self, 'to_date') else None
-        invoice_query = self.db_session.query(Invoice)
+        # Only the newest request updates the cards; earlier ones are cancelled or ignored
+        self._dashboard_request = getattr(self, '_dashboard_request', 0) + 1
+        request = self._dashboard_request
+        if getattr(self, 'dashboard_job', None) is not None:
+            self.dashboard_job.cancel()
+        self.dashboard_job = self.run_in_background(
+            lambda context: self.fetch_dashboard_data(context.session, from_date, to_date),
+            on_result=lambda data: self.apply_dashboard_data(data) if request == self._dashboard_request else None,
+            error_title="Dashboard Error",
+            profile="reporting",
+        )
+
+    def fetch_dashboard_data(self, db, from_date, to_date):
+        """Runs on a worker thread; repeated ranges are served from the query cache until the data changes."""
+        from src.utils.query_cache import get_query_cache
+        return get_query_cache().get_or_compute(
+            db, "dashboard", (from_date, to_date), lambda: self.query_dashboard_data(db, from_date, to_date)
+        )
+
+    def query_dashboard_data(self, db, from_date, to_date):
+        """Runs the dashboard queries; returns plain values only.
+
+        Reads the daily rollup tables (see src/utils/sales_rollup.py) rather than the invoices.
+        """
+        from sqlalchemy import and_
+        totals_query = db.query(func.sum(DailyInvoiceTotals.invoice_count), func.sum(DailyInvoiceTotals.total_amount))
         if from_date and to_date:
-            invoice_query = invoice_query.filter(and_(Invoice.date >= from_date, Invoice.date <= to_date))
-        total_invoices = invoice_query.count()
-        paid_invoices = invoice_query.filter(Invoice.payment_status == "Paid").count()
-        unpaid_invoices = invoice_query.filter(Invoice.payment_status != "Paid").count()
-        total_companies = self.db_session.query(CustomerCompany).count()
-        total_revenue = invoice_query.with_entities(func.sum(Invoice.total_amount)).scalar() or 0
+            totals_query = totals_query.filter(and_(DailyInvoiceTotals.date >= from_date, DailyInvoiceTotals.date <= to_date))
+        total_invoices, total_revenue = totals_query.one()
+        total_companies = db.query(CustomerCompany).count()
 
         # Top products in date range
-        top_products = self.db_session.query(
-            InvoiceItem.product_name,
-            func.sum(InvoiceItem.quantity)
-        ).join(Invoice, InvoiceItem.invoice_id == Invoice.id)
+        top_products = db.query(DailySales.product_name, func.sum(DailySales.quantity))
+        if from_date and to_date:
+            top_products = top_products.filter(and_(DailySales.date >= from_date, DailySales.date <= to_date))
+        top_products = top_products.group_by(DailySales.product_name).order_by(func.sum(DailySales.quantity).desc()).limit(5).all()
+
+        # One point per day; the chart downsamples long ranges
+        revenue_by_date = db.query(DailyInvoiceTotals.date, func.sum(DailyInvoiceTotals.total_amount))
         if from_date and to_date:
-            top_products = top_products.filter(and_(Invoice.date >= from_date, Invoice.date <= to_date))
-        top_products = top_products.group_by(InvoiceItem.product_name).order_by(func.sum(InvoiceItem.quantity).desc()).limit(5).all()
+            revenue_by_date = revenue_by_date.filter(and_(DailyInvoiceTotals.date >= from_date, DailyInvoiceTotals.date <= to_date))
+        revenue_by_date = revenue_by_date.group_by(DailyInvoiceTotals.date).order_by(DailyInvoiceTotals.date).all()
+
+        return {
+            "total_invoices": total_invoices or 0,
+            "total_companies": total_companies,
+            "total_revenue": total_revenue or 0,
+            "top_products": [(name, quantity) for name, quantity in top_products],
+            "revenue_by_date": [(day, amount or 0) for day, amount in revenue_by_date],
+        }
+
+    def apply_dashboard_data(self, data):
+        total_invoices = data["total_invoices"]
+        total_companies = data["total_companies"]
+        total_revenue = data["total_revenue"]
+        top_products = data["top_products"]
 
         self.total_invoices_card.findChild(QLabel, "stat-value").setText(str(total_invoices))
         self.total_companies_card.findChild(QLabel, "stat-value").setText(str(total_companies))
         self.total_revenue_card.findChild(QLabel, "stat-value").setText(f"₹{total_revenue:,.2f}")
 
-        # Update bar chart
-        if top_products:
-            product_names = [p[0] for p in top_products]
-            quantities = [float(p[1]) for p in top_products]
-            if any(q > 0 for q in quantities):
-                self.top_products_chart.plot_bar(
-                    product_names,
-                    quantities,
-                    "Top 5 Products by Quantity Sold",
-                    "Product",
-                    "Quantity Sold"
-                )
-            else:
-                self.top_products_chart.axes.cla()
-                self.top_products_chart.axes.text(0.5, 0.5, 'No sales data available',
-                    horizontalalignment='center', verticalalignment='center')
-                self.top_products_chart.draw()
-
-        # Remove pie chart for now, show placeholder
-        self.invoice_stats_chart.axes.cla()
-        self.invoice_stats_chart.axes.text(0.5, 0.5, 'Invoice status chart is temporarily disabled',
-            horizontalalignment='center', verticalalignment='center', fontsize=14, color=DARK_THEME['text_secondary'])
-        self.invoice_stats_chart.draw()
+        self.ensure_charts()
+        if top_products and any(float(p[1]) > 0 for p in top_products):
+            self.top_products_chart.plot_bar(
+                [p[0] for p in top_products],
+                [float(p[1]) for p in top_products],
+                "Top 5 Products by Quantity Sold",
+                "Product",
+                "Quantity Sold"
+            )
+        else:
+            self.top_products_chart.show_message('No sales data available')
+
+        revenue_by_date = data["revenue_by_date"]
+        if revenue_by_date:
+            self.revenue_chart.plot_line(
+                [day for day, _ in revenue_by_date],
+                [amount for _, amount in revenue_by_date],
+                "Revenue Over Time",
+                "Date",
+                "Revenue"
+            )
+        else:
+            self.revenue_chart.show_message('No revenue in this period')
 
     def apply_styles(self):
         self.setStyleSheet(f"""
@@ -1,4 +1,5 @@
 # src/tabs/inventory_tab.py
+import threading
 from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem, QLineEdit, QComboBox,
                              QHeaderView, QPushButton, QFrame, QLabel, QAbstractItemView)
 from PyQt6.QtCore import Qt
@@ -6,9 +7,14 @@ from src.utils.database import SessionLocal
 from src.models import CustomerCompany, Product, Inventory, InventoryHistory
 from src.utils.dialogs import StockAdjustmentDialog
 from src.utils.theme import DARK_THEME
-from sqlalchemy.orm import joinedload
 from src.utils.helpers import log_action
 from src.utils.ui_manager import UIManager
+from src.utils.query_profiles import with_profile
+from src.utils.pagination import QueryPager
+from src.utils.stock_summary import get_stock_summary, apply_stock_filter
+from src.utils.query_cache import get_query_cache
+from src.utils.search_index import IncrementalSearch, product_search_clause
+from src.utils.debounce import Debouncer
 
 from src.tabs.base_tab import BaseTab
 
@@ -42,16 +48,18 @@ class InventoryTab(BaseTab):
         controls_layout = QHBoxLayout(controls_frame)
         self.search_input = QLineEdit()
         self.search_input.setPlaceholderText("Search product or company...")
-        self.search_input.textChanged.connect(self.load_inventory_data)
+        # Typing is coalesced into one lookup once the user pauses
+        self.search_debouncer = Debouncer(self.on_filter_changed, delay_ms=250, parent=self)
+        self.search_input.textChanged.connect(self.search_debouncer.trigger)
         self.stock_filter_combo = QComboBox()
         self.stock_filter_combo.addItems(["All Stock", "Low Stock", "Out of Stock"])
-        self.stock_filter_combo.currentIndexChanged.connect(self.load_inventory_data)
+        self.stock_filter_combo.currentIndexChanged.connect(self.on_filter_changed)
         add_product_btn = QPushButton("Add Product")
         add_product_btn.setObjectName("primary-button")
         # add_product_btn.clicked.connect(self.show_add_product_dialog)  # Implement as needed
         refresh_btn = QPushButton("Refresh")
         refresh_btn.setObjectName("secondary-button")
-        refresh_btn.clicked.connect(self.load_inventory_data)
+        refresh_btn.clicked.connect(self.refresh_inventory)
         # Pagination and sync toggle
         self.nav_prev_btn = QPushButton("← Prev")
         self.nav_next_btn = QPushButton("Next →")
@@ -82,70 +90,111 @@ class InventoryTab(BaseTab):
         main_layout.addWidget(self.inventory_table, 1)
 
         # For navigation (pagination)
-        self.current_page = 0
-        self.page_size = 20
-
-    def load_inventory_data(self):
-        search_text = self.search_input.text().lower()
-        stock_filter = self.stock_filter_combo.currentText()
-
-        query = self.db_session.query(Product).join(Product.company).options(
-            joinedload(Product.company),
-            joinedload(Product.inventory)
-        )
+        self.pager = QueryPager(page_size=20)
+        self.last_page = 0
+        self.product_search = IncrementalSearch(max_cached=500)
+        # Pages load on the task runner; the pager counts and search cache are shared
+        # between those jobs, so they take this lock and run one at a time
+        self._load_lock = threading.Lock()
+        self._caches_stale = False
+        self._inventory_request = 0
+        self.inventory_job = None
 
+    def build_inventory_query(self, db, search_text, stock_filter):
+        """Returns the filtered, ordered product query on ``db``."""
+        query = db.query(Product).join(Product.company)
         if search_text:
-            query = query.filter(Product.name.ilike(f"%{search_text}%") | CustomerCompany.name.ilike(f"%{search_text}%"))
+            product_ids = self.product_search.search(
+                search_text, lookup=lambda term, limit: self.lookup_products(db, term, limit)
+            )
+            if product_ids is None:
+                query = query.filter(product_search_clause(db, search_text))
+            else:
+                query = query.filter(Product.id.in_(product_ids))
+        return apply_stock_filter(query, stock_filter).order_by(Product.name, Product.id)
 
-        all_products_for_stats = self.db_session.query(Product).all()
+    def lookup_products(self, db, term, limit):
+        query = (db.query(Product.id, Product.name, CustomerCompany.name)
+                 .join(Product.company)
+                 .filter(product_search_clause(db, term)))
+        if limit is not None:
+            query = query.limit(limit)
+        return [(pid, (name or "").lower(), (company or "").lower()) for pid, name, company in query]
 
-        if stock_filter == "Low Stock":
-            product_ids = [p.id for p in all_products_for_stats if p.inventory and p.inventory.stock_quantity <= p.inventory.low_stock_threshold and p.inventory.stock_quantity > 0]
-            query = query.filter(Product.id.in_(product_ids))
-        elif stock_filter == "Out of Stock":
-            product_ids = [p.id for p in all_products_for_stats if p.inventory and p.inventory.stock_quantity == 0]
-            query = query.filter(Product.id.in_(product_ids))
-
-        products = query.order_by(Product.name).all()
+    def on_filter_changed(self):
+        self.pager.reset()
+        self.load_inventory_data()
 
-        # Pagination
-        self.all_products = products
-        start = self.current_page * self.page_size
-        end = start + self.page_size
-        paged_products = products[start:end]
+    def refresh_inventory(self):
+        # Dropped by the next load job, under the lock
+        self._caches_stale = True
+        self.load_inventory_data()
 
-        self.inventory_table.setRowCount(0)
-        low_stock_count = 0
-        out_of_stock_count = 0
+    def load_inventory_data(self):
+        """Loads the current page and the stock cards on the task runner; only the newest request is shown."""
+        search_text = self.search_input.text().lower()
+        stock_filter = self.stock_filter_combo.currentText()
+        page = self.pager.current_page
+        self._inventory_request += 1
+        request = self._inventory_request
+        if self.inventory_job is not None:
+            self.inventory_job.cancel()
+        self.inventory_job = self.run_in_background(
+            lambda context: self.fetch_inventory_data(context, search_text, stock_filter, page),
+            on_result=lambda data: self.apply_inventory_data(data) if request == self._inventory_request else None,
+            error_title="Inventory Error",
+            profile="reporting",
+        )
 
-        for p in all_products_for_stats:
-            stock = p.inventory.stock_quantity if p.inventory else 0
-            low_thresh = p.inventory.low_stock_threshold if p.inventory else 10
-            if stock <= low_thresh and stock > 0: low_stock_count += 1
-            if stock == 0: out_of_stock_count += 1
+    def fetch_inventory_data(self, context, search_text, stock_filter, page):
+        """Runs on a worker thread; returns the page as plain rows plus the stock summary."""
+        db = context.session
+        with self._load_lock:
+            context.check_cancelled()
+            if self._caches_stale:
+                self._caches_stale = False
+                self.pager.invalidate()
+                self.product_search.invalidate()
+            query = self.build_inventory_query(db, search_text, stock_filter)
+            # Clamp in case rows were removed since the last render
+            last_page = self.pager.max_page(query, (search_text, stock_filter))
+            page = min(page, last_page)
+            rows = [
+                (product.id, product.name, product.company.name, product.price,
+                 product.inventory.stock_quantity if product.inventory else None,
+                 product.inventory.low_stock_threshold if product.inventory else None)
+                for product in self.pager.fetch_page(with_profile(query, "product_inventory"), page)
+            ]
+        summary = get_query_cache().get_or_compute(db, "stock_summary", (), lambda: get_stock_summary(db))
+        return {"page": page, "last_page": last_page, "rows": rows, "summary": summary}
 
-        self.total_products_card.findChild(QLabel, "stat-value").setText(str(len(all_products_for_stats)))
-        self.low_stock_card.findChild(QLabel, "stat-value").setText(str(low_stock_count))
-        self.out_of_stock_card.findChild(QLabel, "stat-value").setText(str(out_of_stock_count))
+    def apply_inventory_data(self, data):
+        self.pager.current_page = data["page"]
+        self.last_page = data["last_page"]
+        summary = data["summary"]
+        self.total_products_card.findChild(QLabel, "stat-value").setText(str(summary["total"]))
+        self.low_stock_card.findChild(QLabel, "stat-value").setText(str(summary["low_stock"]))
+        self.out_of_stock_card.findChild(QLabel, "stat-value").setText(str(summary["out_of_stock"]))
 
-        for product in paged_products:
+        self.inventory_table.setRowCount(0)
+        for product_id, name, company_name, price, stock, low_stock_threshold in data["rows"]:
             row = self.inventory_table.rowCount()
             self.inventory_table.insertRow(row)
-            self.inventory_table.setItem(row, 0, QTableWidgetItem(product.name))
-            self.inventory_table.setItem(row, 1, QTableWidgetItem(product.company.name))
-            stock_value = product.inventory.stock_quantity if product.inventory else 0
+            self.inventory_table.setItem(row, 0, QTableWidgetItem(name))
+            self.inventory_table.setItem(row, 1, QTableWidgetItem(company_name))
+            stock_value = stock if stock is not None else 0
             stock_item = QTableWidgetItem(str(stock_value))
             stock_item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
             # Color indicator for low/out-of-stock
-            if product.inventory:
+            if stock is not None:
                 if stock_value == 0:
                     stock_item.setBackground(Qt.GlobalColor.red)
-                elif stock_value <= product.inventory.low_stock_threshold:
+                elif stock_value <= low_stock_threshold:
                     stock_item.setBackground(Qt.GlobalColor.yellow)
                 else:
                     stock_item.setBackground(Qt.GlobalColor.green)
             self.inventory_table.setItem(row, 2, stock_item)
-            price_item = QTableWidgetItem(f"₹{product.price:,.2f}")
+            price_item = QTableWidgetItem(f"₹{price:,.2f}")
             self.inventory_table.setItem(row, 3, price_item)
             # --- History button, centered and full label ---
             history_widget = QWidget()
@@ -155,7 +204,7 @@ class InventoryTab(BaseTab):
             history_btn = QPushButton("View Stock Change History")
             history_btn.setObjectName("secondary-button")
             history_btn.setMinimumWidth(160)
-            history_btn.clicked.connect(lambda chk, p=product: self.show_history_modal(p))
+            history_btn.clicked.connect(lambda chk, pid=product_id: self.open_product_dialog(pid, self.show_history_modal))
             history_layout.addWidget(history_btn)
             self.inventory_table.setCellWidget(row, 4, history_widget)
             # --- Improved Actions button ---
@@ -167,7 +216,7 @@ class InventoryTab(BaseTab):
             adjust_btn.setObjectName("primary-button")
             adjust_btn.setStyleSheet(f"background-color: {DARK_THEME['accent_primary']}; color: {DARK_THEME['text_on_accent']}; border: none; border-radius: 6px; padding: 8px 18px; font-weight: 600; font-size: 14px;")
             adjust_btn.setMinimumWidth(120)
-            adjust_btn.clicked.connect(lambda chk, p=product: self.show_adjust_stock_dialog(p))
+            adjust_btn.clicked.connect(lambda chk, pid=product_id: self.open_product_dialog(pid, self.show_adjust_stock_dialog))
             action_layout.addWidget(adjust_btn)
             self.inventory_table.setCellWidget(row, 5, action_widget)
             # Make the row double thick for better visibility
@@ -177,16 +226,25 @@ class InventoryTab(BaseTab):
         self.inventory_table.sortItems(logicalIndex, order=self.inventory_table.horizontalHeader().sortIndicatorOrder())
 
     def goto_prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
+        if self.pager.has_prev():
+            self.pager.current_page -= 1
             self.load_inventory_data()
 
     def goto_next_page(self):
-        max_page = (len(self.all_products) - 1) // self.page_size
-        if self.current_page < max_page:
-            self.current_page += 1
+        if self.pager.current_page < self.last_page:
+            self.pager.current_page += 1
             self.load_inventory_data()
 
+    def open_product_dialog(self, product_id, show_dialog):
+        # End the session's read transaction so the dialog sees the stock the table shows
+        self.db_session.rollback()
+        product = self.db_session.get(Product, product_id)
+        if product is None:
+            # Deleted since the page was loaded
+            self.refresh_inventory()
+            return
+        show_dialog(product)
+
     def show_history_modal(self, product):
         from PyQt6.QtWidgets import QDialog, QVBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QHeaderView, QDialogButtonBox
         from src.models import InventoryHistory
@@ -242,7 +300,7 @@ class InventoryTab(BaseTab):
 
                 log_action(self.db_session, "STOCK_ADJUST", "Inventory", product.id, details)
                 self.db_session.commit()
-                self.load_inventory_data()
+                self.refresh_inventory()
 
     def apply_styles(self):
         self.setStyleSheet(f"""
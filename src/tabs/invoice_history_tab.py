@@ -1,9 +1,13 @@
-from PyQt6.QtWidgets import (QWidget, QVBoxLayout, QTableWidget, QTableWidgetItem,
-                             QHeaderView, QPushButton, QHBoxLayout, QComboBox, QMessageBox, QLabel)
+from PyQt6.QtWidgets import (QVBoxLayout, QTableView, QAbstractItemView,
+                             QHeaderView, QPushButton, QHBoxLayout, QComboBox, QMessageBox, QLabel, QProgressDialog)
+from PyQt6.QtCore import Qt
 from src.utils.database import SessionLocal
-from src.models import Invoice, UserSettings
+from src.models import Invoice, UserSettings, CustomerCompany
 from src.utils.theme import DARK_THEME
-from src.utils.pdf_service import PdfService
+from src.utils.batch_pdf import BatchPdfRenderer, invoice_payload, load_invoice_payloads
+from src.utils.dialogs import BulkPdfDialog
+from src.utils.query_profiles import with_profile
+from src.utils.invoice_table_model import InvoiceTableModel, StatusDelegate, ActionsDelegate
 
 from src.tabs.base_tab import BaseTab
 
@@ -20,131 +24,132 @@ class InvoiceHistoryTab(BaseTab):
         main_layout.setContentsMargins(20, 20, 20, 20)
         main_layout.setSpacing(15)
 
-        # Top controls: navigation, sorting, and refresh
+        # Top controls: sorting and refresh
         controls_layout = QHBoxLayout()
         self.sort_combo = QComboBox()
         self.sort_combo.addItems(["Newest First", "Oldest First", "Paid", "Pending", "Overdue"])
-        self.sort_combo.currentIndexChanged.connect(self.load_invoices)
+        self.sort_combo.currentIndexChanged.connect(self.on_sort_changed)
         refresh_btn = QPushButton("Refresh")
         refresh_btn.clicked.connect(self.handle_refresh)
-        # Navigation buttons
-        nav_prev_btn = QPushButton("← Prev")
-        nav_next_btn = QPushButton("Next →")
-        nav_prev_btn.clicked.connect(self.goto_prev_page)
-        nav_next_btn.clicked.connect(self.goto_next_page)
-        controls_layout.addWidget(nav_prev_btn)
-        controls_layout.addWidget(nav_next_btn)
+        export_pdfs_btn = QPushButton("Export PDFs")
+        export_pdfs_btn.clicked.connect(self.export_pdfs)
+        self.count_label = QLabel()
+        controls_layout.addWidget(self.count_label)
         controls_layout.addStretch()
         controls_layout.addWidget(QLabel("Sort by:"))
         controls_layout.addWidget(self.sort_combo)
         controls_layout.addWidget(refresh_btn)
+        controls_layout.addWidget(export_pdfs_btn)
         main_layout.addLayout(controls_layout)
 
-        self.invoice_table = QTableWidget()
-        self.invoice_table.setColumnCount(6)
-        self.invoice_table.setHorizontalHeaderLabels(["Invoice #", "Company", "Date", "Total", "Status", "Actions"])
+        # Rows are fetched in batches as the view scrolls; status and actions are painted by delegates
+        self.invoice_model = InvoiceTableModel(self.db_session, batch_size=100, parent=self)
+        self.invoice_table = QTableView()
+        self.invoice_table.setModel(self.invoice_model)
         self.invoice_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.invoice_table.setColumnWidth(5, 240)  # Double the default width for Actions
+        self.invoice_table.setColumnWidth(InvoiceTableModel.ACTIONS_COLUMN, 240)  # Double the default width for Actions
+        self.invoice_table.verticalHeader().setDefaultSectionSize(60)  # Double thick rows for better visibility
+        self.invoice_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.invoice_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.invoice_table.setEditTriggers(QAbstractItemView.EditTrigger.SelectedClicked | QAbstractItemView.EditTrigger.DoubleClicked)
         self.invoice_table.setSortingEnabled(True)
-        self.invoice_table.horizontalHeader().sectionClicked.connect(self.handle_header_sort)
+        self.invoice_table.horizontalHeader().setSortIndicator(2, Qt.SortOrder.DescendingOrder)
+
+        self.status_delegate = StatusDelegate(self.invoice_table)
+        self.actions_delegate = ActionsDelegate(self.invoice_table)
+        self.actions_delegate.download_requested.connect(lambda row: self.redownload_invoice(self.get_invoice(row)))
+        self.actions_delegate.share_requested.connect(lambda row: self.share_invoice(self.get_invoice(row)))
+        self.invoice_table.setItemDelegateForColumn(InvoiceTableModel.STATUS_COLUMN, self.status_delegate)
+        self.invoice_table.setItemDelegateForColumn(InvoiceTableModel.ACTIONS_COLUMN, self.actions_delegate)
         main_layout.addWidget(self.invoice_table)
 
-        # For navigation (pagination)
-        self.current_page = 0
-        self.page_size = 20
+    def on_sort_changed(self):
+        sort_option = self.sort_combo.currentText()
+        status_filter = sort_option if sort_option in ("Paid", "Pending", "Overdue") else None
+        order = Qt.SortOrder.AscendingOrder if sort_option == "Oldest First" else Qt.SortOrder.DescendingOrder
+        self.invoice_model.set_filter(status_filter, order)
+        self.invoice_table.horizontalHeader().setSortIndicator(2, order)
+        self.update_count_label()
 
     def load_invoices(self):
-        self.invoice_table.setRowCount(0)
-        sort_option = self.sort_combo.currentText() if hasattr(self, 'sort_combo') else "Newest First"
-        query = self.db_session.query(Invoice)
-        if sort_option == "Newest First":
-            query = query.order_by(Invoice.date.desc())
-        elif sort_option == "Oldest First":
-            query = query.order_by(Invoice.date.asc())
-        elif sort_option == "Paid":
-            query = query.filter(Invoice.payment_status == "Paid").order_by(Invoice.date.desc())
-        elif sort_option == "Pending":
-            query = query.filter(Invoice.payment_status == "Pending").order_by(Invoice.date.desc())
-        elif sort_option == "Overdue":
-            query = query.filter(Invoice.payment_status == "Overdue").order_by(Invoice.date.desc())
-        invoices = query.all()
-
-        # Pagination
-        start = self.current_page * self.page_size
-        end = start + self.page_size
-        paged_invoices = invoices[start:end]
-
-        for inv in paged_invoices:
-            row = self.invoice_table.rowCount()
-            self.invoice_table.insertRow(row)
-            self.invoice_table.setItem(row, 0, QTableWidgetItem(inv.invoice_number))
-            self.invoice_table.setItem(row, 1, QTableWidgetItem(inv.customer.name))
-            self.invoice_table.setItem(row, 2, QTableWidgetItem(inv.date.strftime("%Y-%m-%d")))
-            self.invoice_table.setItem(row, 3, QTableWidgetItem(f"₹{inv.total_amount:,.2f}"))
-
-            # Status with improved color plate
-            status_combo = QComboBox()
-            status_combo.addItems(["Pending", "Paid", "Overdue"])
-            status_combo.setCurrentText(inv.payment_status)
-            color_map = {
-                "Paid": "background-color: #43a047; color: #fff; border: 2px solid #388e3c; font-weight: bold;",
-                "Pending": "background-color: #fbc02d; color: #222; border: 2px solid #fbc02d; font-weight: bold;",
-                "Overdue": "background-color: #e53935; color: #fff; border: 2px solid #b71c1c; font-weight: bold;"
-            }
-            status_style = color_map.get(inv.payment_status, color_map["Pending"])
-            status_combo.setStyleSheet(f"QComboBox {{{status_style} border-radius: 6px; padding: 6px 12px;}}")
-            self.invoice_table.setCellWidget(row, 4, status_combo)
-
-            actions_widget = QWidget()
-            actions_layout = QHBoxLayout(actions_widget)
-            download_btn = QPushButton("Download PDF")
-            download_btn.clicked.connect(lambda chk, inv=inv: self.redownload_invoice(inv))
-            share_btn = QPushButton("Share")
-            share_btn.clicked.connect(lambda chk, inv=inv: self.share_invoice(inv))
-            actions_layout.addWidget(download_btn)
-            actions_layout.addWidget(share_btn)
-            actions_layout.setContentsMargins(0,0,0,0)
-            self.invoice_table.setCellWidget(row, 5, actions_widget)
-            # Make the row double thick for better visibility
-            self.invoice_table.setRowHeight(row, 60)
+        # Resetting the model lets the view pull the first batch through fetchMore
+        self.invoice_model.refresh()
+        self.update_count_label()
+
+    def update_count_label(self):
+        self.count_label.setText(f"{self.invoice_model.total_count():,} invoices")
 
     def handle_refresh(self):
-        # Fully reloads the table and updates all colors/styles
+        # Fully reloads the table from a fresh session
         self.db_session.close()
         self.db_session = self.get_db_session()
+        self.invoice_model.db_session = self.db_session
         self.load_invoices()
 
-    def handle_header_sort(self, logicalIndex):
-        # Sorts by column when header is clicked
-        self.invoice_table.sortItems(logicalIndex, order=self.invoice_table.horizontalHeader().sortIndicatorOrder())
-
-    def goto_prev_page(self):
-        if self.current_page > 0:
-            self.current_page -= 1
-            self.load_invoices()
-
-    def goto_next_page(self):
-        # Only go to next page if there are more invoices
-        sort_option = self.sort_combo.currentText() if hasattr(self, 'sort_combo') else "Newest First"
-        query = self.db_session.query(Invoice)
-        if sort_option == "Newest First":
-            query = query.order_by(Invoice.date.desc())
-        elif sort_option == "Oldest First":
-            query = query.order_by(Invoice.date.asc())
-        elif sort_option == "Paid":
-            query = query.filter(Invoice.payment_status == "Paid").order_by(Invoice.date.desc())
-        elif sort_option == "Pending":
-            query = query.filter(Invoice.payment_status == "Pending").order_by(Invoice.date.desc())
-        elif sort_option == "Overdue":
-            query = query.filter(Invoice.payment_status == "Overdue").order_by(Invoice.date.desc())
-        invoices = query.all()
-        max_page = (len(invoices) - 1) // self.page_size
-        if self.current_page < max_page:
-            self.current_page += 1
-            self.load_invoices()
+    def get_invoice(self, row):
+        invoice_id = self.invoice_model.invoice_id(row)
+        return with_profile(self.db_session.query(Invoice), "invoice_detail").filter(Invoice.id == invoice_id).one()
+
+    def export_pdfs(self):
+        import os
+        from PyQt6.QtGui import QDesktopServices
+        from PyQt6.QtCore import QUrl
+
+        if not self.db_session.query(UserSettings).first():
+            QMessageBox.critical(self, "Error", "Please configure your company settings first.")
+            return
+        customers = self.db_session.query(CustomerCompany.id, CustomerCompany.name).order_by(CustomerCompany.name).all()
+        dialog = BulkPdfDialog(customers, parent=self)
+        if not dialog.exec():
+            return
+        options = dialog.get_data()
+
+        batch_name = f"invoices_{options['from_date']:%Y%m%d}_{options['to_date']:%Y%m%d}"
+        if options['customer_id']:
+            batch_name += f"_customer{options['customer_id']}"
+        pdf_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../pdf'))
+        output_dir = os.path.join(pdf_dir, batch_name)
+        zip_path = os.path.join(pdf_dir, f"{batch_name}.zip") if options['zip'] else None
+
+        def render(context):
+            payloads = load_invoice_payloads(context.session, options['from_date'], options['to_date'], options['customer_id'])
+            settings = context.session.query(UserSettings).first()
+            # The pool workers don't need the database; release the session while they run
+            context.session.close()
+            renderer = BatchPdfRenderer(output_dir, progress_callback=lambda done, total: context.report_progress((done, total)))
+            return renderer.run(payloads, settings, zip_path=zip_path)
+
+        progress = QProgressDialog("Loading invoices...", "Cancel", 0, 0, self)
+        progress.setWindowTitle("Export PDFs")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+
+        def on_progress(value):
+            done, total = value
+            progress.setMaximum(total)
+            progress.setValue(done)
+            progress.setLabelText(f"Rendered {done:,} of {total:,} PDFs...")
+
+        def on_result(report):
+            progress.close()
+            msg = QMessageBox(self)
+            msg.setWindowTitle("PDFs Exported")
+            msg.setText(report.summary())
+            open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
+            msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
+            msg.setIcon(QMessageBox.Icon.Information)
+            msg.exec()
+            if msg.clickedButton() == open_btn:
+                QDesktopServices.openUrl(QUrl.fromLocalFile(output_dir))
+
+        job = self.run_in_background(render, on_result=on_result, on_progress=on_progress, on_cancelled=progress.close,
+                                     on_error=lambda *args: progress.close(), error_title="PDF Export Error")
+        progress.canceled.connect(job.cancel)
+        progress.show()
 
     def redownload_invoice(self, invoice):
         import os
+        from src.utils.pdf_cache import cached_invoice_job
         from PyQt6.QtWidgets import QFileDialog
         from PyQt6.QtGui import QDesktopServices
         from PyQt6.QtCore import QUrl
@@ -154,26 +159,7 @@ class InvoiceHistoryTab(BaseTab):
             QMessageBox.critical(self, "Error", "Please configure your company settings first.")
             return
 
-        items = []
-        for item in invoice.items:
-            items.append({
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "price_per_unit": item.price_per_unit
-            })
-
-        invoice_data = {
-            "invoice_number": invoice.invoice_number,
-            "date": invoice.date.strftime("%Y-%m-%d"),
-            "vehicle_number": invoice.vehicle_number,
-            "customer": {
-                "name": invoice.customer.name,
-                "address": invoice.customer.address,
-                "gstin": invoice.customer.gstin,
-                "state_code": invoice.customer.state_code
-            },
-            "items": items
-        }
+        invoice_data = invoice_payload(invoice)
 
         pdf_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../pdf'))
         if not os.path.exists(pdf_dir):
@@ -181,54 +167,27 @@ class InvoiceHistoryTab(BaseTab):
         file_name = f"invoice_{invoice.invoice_number}.pdf"
         file_path = os.path.join(pdf_dir, file_name)
 
-        if os.path.exists(file_path):
+        def show_saved(file_path):
             msg = QMessageBox(self)
-            msg.setWindowTitle("PDF Exists")
-            msg.setText(f"A PDF for this invoice already exists. What would you like to do?")
-            open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
-            overwrite_btn = msg.addButton("Overwrite PDF", QMessageBox.ButtonRole.DestructiveRole)
-            cancel_btn = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
-            msg.setIcon(QMessageBox.Icon.Question)
+            msg.setWindowTitle("PDF Saved")
+            msg.setText(f"Invoice PDF saved as {file_path}\n\nWhat would you like to do?")
+            open_folder_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
+            open_pdf_btn = msg.addButton("Open PDF", QMessageBox.ButtonRole.ActionRole)
+            close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
+            msg.setIcon(QMessageBox.Icon.Information)
             msg.exec()
-            if msg.clickedButton() == open_btn:
+            if msg.clickedButton() == open_folder_btn:
                 QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
-                return
-            elif msg.clickedButton() == cancel_btn:
-                return
-            # else: overwrite
-
-        # Generate and save PDF in pdf/ folder
-        pdf_service = PdfService(settings)
-        # Patch PdfService to allow custom path
-        if hasattr(pdf_service, 'generate_invoice'):
-            try:
-                pdf_service.generate_invoice(invoice_data, file_path=file_path)
-            except TypeError:
-                # fallback for old signature
-                generated = pdf_service.generate_invoice(invoice_data)
-                # Move to pdf_dir if not already there
-                if os.path.abspath(generated) != os.path.abspath(file_path):
-                    import shutil
-                    shutil.move(generated, file_path)
-        else:
-            QMessageBox.critical(self, "Error", "PDF generation service is not available.")
-            return
+            elif msg.clickedButton() == open_pdf_btn:
+                QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
 
-        msg = QMessageBox(self)
-        msg.setWindowTitle("PDF Saved")
-        msg.setText(f"Invoice PDF saved as {file_path}\n\nWhat would you like to do?")
-        open_folder_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
-        open_pdf_btn = msg.addButton("Open PDF", QMessageBox.ButtonRole.ActionRole)
-        close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.exec()
-        if msg.clickedButton() == open_folder_btn:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
-        elif msg.clickedButton() == open_pdf_btn:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
+        # Unchanged invoices are copied from the PDF cache instead of being re-rendered
+        self.run_in_background(cached_invoice_job(invoice_data, file_path),
+                               on_result=lambda result: show_saved(result[0]), error_title="PDF Error")
 
     def share_invoice(self, invoice):
         import os
+        from src.utils.pdf_cache import cached_invoice_job
         from PyQt6.QtWidgets import QMessageBox
         from PyQt6.QtGui import QDesktopServices
         from PyQt6.QtCore import QUrl
@@ -238,26 +197,7 @@ class InvoiceHistoryTab(BaseTab):
             QMessageBox.critical(self, "Error", "Please configure your company settings first.")
             return
 
-        items = []
-        for item in invoice.items:
-            items.append({
-                "product_name": item.product_name,
-                "quantity": item.quantity,
-                "price_per_unit": item.price_per_unit
-            })
-
-        invoice_data = {
-            "invoice_number": invoice.invoice_number,
-            "date": invoice.date.strftime("%Y-%m-%d"),
-            "vehicle_number": invoice.vehicle_number,
-            "customer": {
-                "name": invoice.customer.name,
-                "address": invoice.customer.address,
-                "gstin": invoice.customer.gstin,
-                "state_code": invoice.customer.state_code
-            },
-            "items": items
-        }
+        invoice_data = invoice_payload(invoice)
 
         pdf_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../pdf'))
         if not os.path.exists(pdf_dir):
@@ -265,38 +205,24 @@ class InvoiceHistoryTab(BaseTab):
         file_name = f"invoice_{invoice.invoice_number}.pdf"
         file_path = os.path.join(pdf_dir, file_name)
 
-        if os.path.exists(file_path):
+        def show_saved(file_path):
             msg = QMessageBox(self)
-            msg.setWindowTitle("PDF Exists")
-            msg.setText(f"A PDF for this invoice already exists. What would you like to do?")
-            open_btn = msg.addButton("Open PDF", QMessageBox.ButtonRole.AcceptRole)
-            overwrite_btn = msg.addButton("Overwrite PDF", QMessageBox.ButtonRole.DestructiveRole)
-            cancel_btn = msg.addButton("Cancel", QMessageBox.ButtonRole.RejectRole)
-            msg.setIcon(QMessageBox.Icon.Question)
+            msg.setWindowTitle("PDF Saved")
+            msg.setText(f"Invoice PDF generated and saved as {file_path}\n\nWould you like to open the PDF folder?")
+            open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
+            close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
+            msg.setIcon(QMessageBox.Icon.Information)
             msg.exec()
             if msg.clickedButton() == open_btn:
-                QDesktopServices.openUrl(QUrl.fromLocalFile(file_path))
-                return
-            elif msg.clickedButton() == cancel_btn:
-                return
-            # else: overwrite
-
-        pdf_service = PdfService(settings)
-        pdf_service.generate_invoice(invoice_data, file_path=file_path)
-        msg = QMessageBox(self)
-        msg.setWindowTitle("PDF Saved")
-        msg.setText(f"Invoice PDF generated and saved as {file_path}\n\nWould you like to open the PDF folder?")
-        open_btn = msg.addButton("Open Folder", QMessageBox.ButtonRole.AcceptRole)
-        close_btn = msg.addButton("Close", QMessageBox.ButtonRole.RejectRole)
-        msg.setIcon(QMessageBox.Icon.Information)
-        msg.exec()
-        if msg.clickedButton() == open_btn:
-            QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
+                QDesktopServices.openUrl(QUrl.fromLocalFile(pdf_dir))
+
+        self.run_in_background(cached_invoice_job(invoice_data, file_path),
+                               on_result=lambda result: show_saved(result[0]), error_title="PDF Error")
 
 
     def apply_styles(self):
         self.setStyleSheet(f"""
-            QTableWidget {{
+            QTableView {{
                 background-color: {DARK_THEME['bg_surface']};
                 gridline-color: {DARK_THEME['border_main']};
                 border: 1px solid {DARK_THEME['border_main']};
@@ -308,7 +234,7 @@ class InvoiceHistoryTab(BaseTab):
                 padding: 10px;
                 border: none;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 10px;
                 color: {DARK_THEME['text_primary']};
             }}
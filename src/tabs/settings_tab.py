@@ -7,6 +7,7 @@ from src.utils.database import SessionLocal
 from src.models.user import UserSettings
 from src.utils.helpers import log_action
 import re
+import sys
 from src.tabs.base_tab import BaseTab
 
 class SettingsTab(BaseTab):
@@ -146,6 +147,10 @@ class SettingsTab(BaseTab):
             
             log_action(self.db_session, "UPDATE", "Settings", settings.id, details)
             self.db_session.commit()
+            # The next PDF rebuilds the letterhead from the new settings (nothing to do if no PDF was made yet)
+            invoice_template = sys.modules.get("src.utils.invoice_template")
+            if invoice_template:
+                invoice_template.invalidate_letterhead_cache()
             
             msg_box = QMessageBox(self)
             msg_box.setText("Settings have been saved successfully.")
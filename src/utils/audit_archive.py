@@ -0,0 +1,181 @@
+# src/utils/audit_archive.py
+import os
+import gzip
+import json
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import String, type_coerce, delete
+from src.models import AuditLog, AuditArchiveSegment
+from .database import PROJECT_ROOT
+from .helpers import log_action, parse_summary_details
+
+DEFAULT_ARCHIVE_DIR = os.path.join(PROJECT_ROOT, "archive", "audit_logs")
+# Entries older than this are moved out of the database; 0 disables scheduled archiving
+DEFAULT_RETENTION_DAYS = int(os.environ.get("BILLING_APP_AUDIT_RETENTION_DAYS", "365"))
+DEFAULT_SEGMENT_ROWS = 20000
+
+# audit_logs.timestamp is SQLite CURRENT_TIMESTAMP text, i.e. UTC
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ArchiveReport:
+    def __init__(self):
+        self.rows_archived = 0
+        self.segments = []  # file names
+
+    def summary(self):
+        return f"Archived {self.rows_archived} audit log entries into {len(self.segments)} segments."
+
+
+def _format_timestamp(value):
+    return value.strftime(TIMESTAMP_FORMAT) if value else ""
+
+
+def write_segment(rows, path):
+    """Writes rows as gzip JSONL to a temporary file and renames it into place; returns the size in bytes."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".jsonl.gz.tmp")
+    os.close(fd)
+    try:
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as out:
+            for log_id, timestamp, action, entity_type, entity_id, details in rows:
+                out.write(json.dumps({
+                    "id": log_id, "timestamp": _format_timestamp(timestamp), "action": action,
+                    "entity_type": entity_type, "entity_id": entity_id, "details": details,
+                }, ensure_ascii=False, separators=(",", ":")))
+                out.write("\n")
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
+
+
+def archive_old_logs(db_session, retention_days=DEFAULT_RETENTION_DAYS, archive_dir=DEFAULT_ARCHIVE_DIR,
+                     segment_rows=DEFAULT_SEGMENT_ROWS, progress_callback=None):
+    """Moves audit log entries older than ``retention_days`` into gzip JSONL segments.
+
+    Segments are written oldest first, ``segment_rows`` entries each, and
+    never modified afterwards. Each one is committed on its own: the file
+    is renamed into place, then its index row is added and the archived
+    entries are deleted in one transaction. A run that is interrupted
+    between the two leaves a file that the next run simply overwrites
+    with the same entries.
+    """
+    os.makedirs(archive_dir, exist_ok=True)
+    report = ArchiveReport()
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).strftime(TIMESTAMP_FORMAT)
+    older = AuditLog.timestamp < type_coerce(cutoff, String)
+    while True:
+        rows = (db_session.query(AuditLog.id, AuditLog.timestamp, AuditLog.action, AuditLog.entity_type,
+                                 AuditLog.entity_id, AuditLog.details)
+                .filter(older).order_by(AuditLog.id).limit(segment_rows).all())
+        if not rows:
+            break
+        first_id, last_id = rows[0][0], rows[-1][0]
+        file_name = f"audit_{first_id:012d}_{last_id:012d}.jsonl.gz"
+        size = write_segment(rows, os.path.join(archive_dir, file_name))
+        db_session.add(AuditArchiveSegment(
+            file_name=file_name, first_id=first_id, last_id=last_id,
+            first_timestamp=min(_format_timestamp(r[1]) for r in rows),
+            last_timestamp=max(_format_timestamp(r[1]) for r in rows),
+            row_count=len(rows), size_bytes=size,
+            actions=",".join(sorted({r[2] for r in rows if r[2]})),
+            entity_types=",".join(sorted({r[3] for r in rows if r[3]})),
+        ))
+        # Exactly the selected rows: the oldest matching ids up to last_id
+        db_session.execute(delete(AuditLog.__table__).where(AuditLog.id.between(first_id, last_id), older))
+        db_session.commit()
+        report.rows_archived += len(rows)
+        report.segments.append(file_name)
+        if progress_callback:
+            progress_callback(report.rows_archived)
+    if report.rows_archived:
+        log_action(db_session, "ARCHIVE", "System", None,
+                   f"Archived {report.rows_archived} audit log entries older than {retention_days} days "
+                   f"into {len(report.segments)} segments.")
+        db_session.commit()
+    return report
+
+
+def search_archive(db_session, text=None, action=None, entity_type=None, entity_id=None,
+                   from_date=None, to_date=None, archive_dir=DEFAULT_ARCHIVE_DIR):
+    """Yields archived entries (dicts, oldest first) matching every given filter.
+
+    The segment index narrows the search by time range, action and entity
+    type, so only candidate files are decompressed.
+    """
+    query = db_session.query(AuditArchiveSegment).order_by(AuditArchiveSegment.first_id)
+    if from_date:
+        query = query.filter(AuditArchiveSegment.last_timestamp >= from_date.isoformat())
+    if to_date:
+        query = query.filter(AuditArchiveSegment.first_timestamp < (to_date + timedelta(days=1)).isoformat())
+    if action:
+        query = query.filter(AuditArchiveSegment.actions.like(f"%{action}%"))
+    if entity_type:
+        query = query.filter(AuditArchiveSegment.entity_types.like(f"%{entity_type}%"))
+    lowered = text.lower() if text else None
+    from_bound = from_date.isoformat() if from_date else None
+    to_bound = (to_date + timedelta(days=1)).isoformat() if to_date else None
+
+    for segment in query.all():
+        with gzip.open(os.path.join(archive_dir, segment.file_name), "rt", encoding="utf-8") as infile:
+            for line in infile:
+                entry = json.loads(line)
+                if action and entry["action"] != action:
+                    continue
+                if entity_type and entry["entity_type"] != entity_type:
+                    continue
+                if entity_id is not None and entry["entity_id"] != entity_id:
+                    summary = parse_summary_details(entry["details"]) if entry["entity_id"] is None else None
+                    if summary is None or entity_id not in summary["entity_ids"]:
+                        continue
+                if from_bound and entry["timestamp"] < from_bound:
+                    continue
+                if to_bound and entry["timestamp"] >= to_bound:
+                    continue
+                if lowered and lowered not in (entry["details"] or "").lower():
+                    continue
+                yield entry
+
+
+def archive_job(retention_days=DEFAULT_RETENTION_DAYS):
+    """Background-job function for the task runner; returns the ArchiveReport."""
+    def job(context):
+        return archive_old_logs(context.session, retention_days, progress_callback=context.report_progress)
+    return job
+
+
+def main():
+    """python -m src.utils.audit_archive archive [--days N] [--vacuum]
+    python -m src.utils.audit_archive search [TEXT] [--action A] [--entity-type T] [--entity-id N]"""
+    from .database import Base, DEFAULT_PROFILE, get_sessionmaker, get_engine
+
+    parser = argparse.ArgumentParser(prog="python -m src.utils.audit_archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    archive = commands.add_parser("archive", help="move old audit log entries into the archive")
+    archive.add_argument("--days", type=int, default=DEFAULT_RETENTION_DAYS or 365)
+    archive.add_argument("--vacuum", action="store_true", help="VACUUM the database afterwards to shrink the file")
+    search = commands.add_parser("search", help="search archived audit log entries")
+    search.add_argument("text", nargs="?")
+    search.add_argument("--action")
+    search.add_argument("--entity-type")
+    search.add_argument("--entity-id", type=int)
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=get_engine(DEFAULT_PROFILE), tables=[AuditArchiveSegment.__table__])
+    with get_sessionmaker(DEFAULT_PROFILE)() as db_session:
+        if args.command == "archive":
+            print(archive_old_logs(db_session, args.days).summary())
+        else:
+            for entry in search_archive(db_session, args.text, args.action, args.entity_type, args.entity_id):
+                print(f"{entry['timestamp']}  {entry['action']:<12} {entry['entity_type']} "
+                      f"({entry['entity_id']})  {entry['details']}")
+    if args.command == "archive" and args.vacuum:
+        with get_engine(DEFAULT_PROFILE).connect() as conn:
+            conn.exec_driver_sql("VACUUM")
+
+
+if __name__ == "__main__":
+    main()
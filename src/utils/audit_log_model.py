@@ -0,0 +1,169 @@
+# src/utils/audit_log_model.py
+from datetime import timedelta
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, pyqtSignal
+from sqlalchemy import String, type_coerce, text, or_, and_
+from src.models import AuditLog
+from src.utils.helpers import parse_summary_details
+from src.utils.search_index import audit_details_search_clause
+from src.utils.background import get_task_runner
+
+# Values written by log_action across the app, offered as filter choices
+AUDIT_ACTIONS = ["CREATE", "UPDATE", "DELETE", "STOCK_ADJUST", "IMPORT", "EXPORT", "ARCHIVE"]
+AUDIT_ENTITY_TYPES = ["Company", "Product", "Inventory", "Invoice", "Settings", "System"]
+
+
+class AuditLogTableModel(QAbstractTableModel):
+    """Lazily fetched audit log rows for a QTableView, newest first.
+
+    Every filter is applied in SQL. Rows are pulled ``batch_size`` at a
+    time with keyset pagination on the id (``id < last id``), so each
+    fetch is an index range scan no matter how far the view has scrolled,
+    and no COUNT over the whole table is ever needed. Batches are queried
+    on the task runner and appended when they arrive. Only plain tuples
+    are cached: the columns plus their display texts, built once per
+    fetched row so painting never parses JSON details.
+    """
+
+    HEADERS = ["Timestamp", "Action", "Entity", "Details"]
+
+    # Error message of a failed batch; fetching stops until the next refresh
+    fetch_failed = pyqtSignal(str)
+
+    def __init__(self, batch_size=200, parent=None):
+        super().__init__(parent)
+        self.batch_size = batch_size
+        self.action = None
+        self.entity_type = None
+        self.entity_id = None
+        self.from_date = None
+        self.to_date = None
+        self.search_text = ""
+        self._rows = []
+        self._exhausted = False
+        self._fetching = False
+        self._generation = 0
+
+    def set_filters(self, action=None, entity_type=None, entity_id=None, from_date=None, to_date=None, search_text=""):
+        self.action = action
+        self.entity_type = entity_type
+        self.entity_id = entity_id
+        self.from_date = from_date
+        self.to_date = to_date
+        self.search_text = search_text.strip()
+        self.refresh()
+
+    def refresh(self):
+        self.beginResetModel()
+        self._rows = []
+        self._exhausted = False
+        # A batch still in flight belongs to the old filters and is dropped
+        self._fetching = False
+        self._generation += 1
+        self.endResetModel()
+
+    def build_query(self, db):
+        query = db.query(
+            AuditLog.id, AuditLog.timestamp, AuditLog.action, AuditLog.entity_type, AuditLog.entity_id, AuditLog.details
+        )
+        if self.action:
+            query = query.filter(AuditLog.action == self.action)
+        if self.entity_type:
+            query = query.filter(AuditLog.entity_type == self.entity_type)
+        if self.entity_id is not None:
+            # Collapsed bulk entries (see AuditWriter) list their ids in JSON details
+            in_summary = text(
+                "CASE WHEN json_valid(audit_logs.details) THEN EXISTS (SELECT 1 FROM "
+                "json_each(audit_logs.details, '$.entity_ids') WHERE json_each.value = :summary_entity_id) END"
+            ).bindparams(summary_entity_id=self.entity_id)
+            query = query.filter(or_(AuditLog.entity_id == self.entity_id,
+                                     and_(AuditLog.entity_id.is_(None), AuditLog.details.like("{%"), in_summary)))
+        # Timestamps are stored as 'YYYY-MM-DD HH:MM:SS' text, so ISO date strings bound the range
+        # and keep ix_audit_logs_timestamp usable
+        if self.from_date:
+            query = query.filter(AuditLog.timestamp >= type_coerce(self.from_date.isoformat(), String))
+        if self.to_date:
+            query = query.filter(AuditLog.timestamp < type_coerce((self.to_date + timedelta(days=1)).isoformat(), String))
+        if self.search_text:
+            query = query.filter(audit_details_search_clause(db, self.search_text))
+        return query
+
+    def log_row(self, row):
+        """(id, timestamp, action, entity_type, entity_id, details) for a view row."""
+        return self._rows[row][:6]
+
+    @staticmethod
+    def _with_display(row):
+        """Appends the texts shown in the four columns to a fetched row."""
+        log_id, timestamp, action, entity_type, entity_id, details = row
+        summary = parse_summary_details(details) if entity_id is None else None
+        if summary is not None:
+            entity = f"{entity_type} ({len(summary['entity_ids'])} records)"
+            details_text = summary.get("message", details)
+        else:
+            entity = f"{entity_type} (ID: {entity_id})" if entity_id else entity_type
+            details_text = details
+        timestamp_text = timestamp.strftime("%Y-%m-%d %H:%M:%S") if timestamp else ""
+        return tuple(row) + (timestamp_text, action, entity, details_text)
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            return None
+        column = index.column()
+        if 0 <= column < len(self.HEADERS):
+            return self._rows[index.row()][6 + column]
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetch_batch(self, db, before_id):
+        """Runs on a worker thread; returns the next batch (ids below ``before_id``) as cached row tuples."""
+        query = self.build_query(db)
+        if before_id is not None:
+            query = query.filter(AuditLog.id < before_id)
+        return [self._with_display(r) for r in query.order_by(AuditLog.id.desc()).limit(self.batch_size)]
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._fetching:
+            return
+        self._fetching = True
+        generation = self._generation
+        before_id = self._rows[-1][0] if self._rows else None
+        get_task_runner().submit(
+            lambda context: self.fetch_batch(context.session, before_id),
+            on_result=lambda batch: self._append_batch(generation, batch),
+            on_error=lambda message, details: self._fetch_error(generation, message),
+            profile="reporting",
+        )
+
+    def _append_batch(self, generation, batch):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        if len(batch) < self.batch_size:
+            self._exhausted = True
+        if not batch:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+
+    def _fetch_error(self, generation, message):
+        if generation != self._generation:
+            return
+        self._fetching = False
+        self._exhausted = True
+        self.fetch_failed.emit(message)
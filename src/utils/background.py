@@ -0,0 +1,143 @@
+# src/utils/background.py
+import time
+import threading
+import traceback
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from .database import get_sessionmaker, DEFAULT_PROFILE
+
+# Progress signals are coalesced to at most one per interval so a fast job
+# can't flood the GUI thread's event queue
+PROGRESS_INTERVAL_SECONDS = 0.05
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it notices it has been cancelled."""
+
+
+class JobSignals(QObject):
+    # Signals are emitted from the worker thread and delivered queued on the GUI thread
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str, str)  # message, traceback
+    cancelled = pyqtSignal()
+
+
+class JobContext:
+    """Handed to the job function: its own database session plus progress and cancellation hooks."""
+
+    def __init__(self, job):
+        self._job = job
+        self.session = None
+        self._last_progress = 0.0
+
+    @property
+    def is_cancelled(self):
+        return self._job.cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self.is_cancelled:
+            raise JobCancelled()
+
+    def report_progress(self, value, force=False):
+        """Emits progress (throttled) and raises JobCancelled if the job was cancelled.
+
+        Can be passed directly as a ``progress_callback``, so long-running
+        loops get cancellation points for free.
+        """
+        self.check_cancelled()
+        now = time.monotonic()
+        if force or now - self._last_progress >= PROGRESS_INTERVAL_SECONDS:
+            self._last_progress = now
+            self._job.signals.progress.emit(value)
+
+
+class BackgroundJob(QRunnable):
+    """Runs ``fn(context)`` on a pool thread.
+
+    With a ``profile`` the job opens a session from that engine profile on
+    the worker thread and closes it afterwards; sessions are never shared
+    with the GUI thread. Pass ``profile=None`` for jobs that don't touch
+    the database.
+    """
+
+    def __init__(self, fn, profile=DEFAULT_PROFILE):
+        super().__init__()
+        self.fn = fn
+        self.profile = profile
+        self.signals = JobSignals()
+        self.cancel_event = threading.Event()
+        # The runner keeps the Python wrapper alive; don't let Qt delete it under us
+        self.setAutoDelete(False)
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def run(self):
+        context = JobContext(self)
+        try:
+            if self.profile is not None:
+                context.session = get_sessionmaker(self.profile)()
+            context.check_cancelled()
+            result = self.fn(context)
+        except JobCancelled:
+            if context.session is not None:
+                context.session.rollback()
+            self.signals.cancelled.emit()
+        except Exception as e:
+            if context.session is not None:
+                context.session.rollback()
+            self.signals.error.emit(str(e), traceback.format_exc())
+        else:
+            self.signals.finished.emit(result)
+        finally:
+            if context.session is not None:
+                context.session.close()
+
+
+class TaskRunner(QObject):
+    """Submits BackgroundJobs to a QThreadPool and keeps them alive until they finish."""
+
+    def __init__(self, thread_pool=None, parent=None):
+        super().__init__(parent)
+        self.thread_pool = thread_pool or QThreadPool.globalInstance()
+        self._jobs = set()
+
+    def submit(self, fn, on_result=None, on_error=None, on_progress=None, on_cancelled=None, profile=DEFAULT_PROFILE):
+        """Starts ``fn(context)`` in the background and returns the job (call ``job.cancel()`` to stop it).
+
+        Callbacks run on the GUI thread: ``on_result(result)``,
+        ``on_error(message, traceback)``, ``on_progress(value)`` and
+        ``on_cancelled()``.
+        """
+        job = BackgroundJob(fn, profile=profile)
+        if on_progress:
+            job.signals.progress.connect(on_progress)
+        if on_result:
+            job.signals.finished.connect(on_result)
+        if on_error:
+            job.signals.error.connect(on_error)
+        if on_cancelled:
+            job.signals.cancelled.connect(on_cancelled)
+        for signal in (job.signals.finished, job.signals.error, job.signals.cancelled):
+            signal.connect(lambda *args, job=job: self._jobs.discard(job))
+        self._jobs.add(job)
+        self.thread_pool.start(job)
+        return job
+
+    def cancel_all(self):
+        for job in list(self._jobs):
+            job.cancel()
+
+    def wait_for_done(self, timeout_ms=-1):
+        return self.thread_pool.waitForDone(timeout_ms)
+
+
+_task_runner = None
+
+
+def get_task_runner():
+    """Shared TaskRunner for the application, created on first use from the GUI thread."""
+    global _task_runner
+    if _task_runner is None:
+        _task_runner = TaskRunner()
+    return _task_runner
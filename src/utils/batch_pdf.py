@@ -0,0 +1,167 @@
+# src/utils/batch_pdf.py
+import os
+import time
+import zipfile
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from sqlalchemy import select
+from src.models import Invoice, InvoiceItem, CustomerCompany, UserSettings
+from .pdf_worker import write_pdf_atomically, init_worker, render_in_worker
+
+# Invoices handed to a worker process per round trip
+DEFAULT_CHUNK_SIZE = 16
+
+
+def settings_snapshot(settings):
+    """Copies the UserSettings columns into a picklable dict for worker processes."""
+    return {column.name: getattr(settings, column.name) for column in UserSettings.__table__.columns}
+
+
+def pdf_file_name(invoice_number):
+    return f"invoice_{invoice_number}.pdf"
+
+
+def invoice_payload(invoice):
+    """invoice_data dict for the PDF template from an Invoice with customer and items loaded."""
+    return {
+        "invoice_number": invoice.invoice_number,
+        "date": invoice.date.strftime("%Y-%m-%d"),
+        "vehicle_number": invoice.vehicle_number,
+        "total_amount": invoice.total_amount or 0,
+        "customer": {
+            "name": invoice.customer.name,
+            "address": invoice.customer.address,
+            "gstin": invoice.customer.gstin,
+            "state_code": invoice.customer.state_code,
+        },
+        "items": [
+            {"product_name": item.product_name, "quantity": item.quantity, "price_per_unit": item.price_per_unit}
+            for item in invoice.items
+        ],
+    }
+
+
+def load_invoice_payloads(db, from_date=None, to_date=None, customer_id=None):
+    """Builds invoice_data dicts for every matching invoice with one joined query, in date order."""
+    stmt = (
+        select(Invoice.id, Invoice.invoice_number, Invoice.date, Invoice.vehicle_number, Invoice.total_amount,
+               CustomerCompany.name, CustomerCompany.address, CustomerCompany.gstin, CustomerCompany.state_code,
+               InvoiceItem.product_name, InvoiceItem.quantity, InvoiceItem.price_per_unit)
+        .outerjoin(CustomerCompany, Invoice.customer_id == CustomerCompany.id)
+        .outerjoin(InvoiceItem, InvoiceItem.invoice_id == Invoice.id)
+        .order_by(Invoice.date, Invoice.id, InvoiceItem.id)
+    )
+    if from_date:
+        stmt = stmt.where(Invoice.date >= from_date)
+    if to_date:
+        stmt = stmt.where(Invoice.date <= to_date)
+    if customer_id:
+        stmt = stmt.where(Invoice.customer_id == customer_id)
+
+    payloads = []
+    current_id = None
+    for (invoice_id, number, invoice_date, vehicle, total, name, address, gstin, state_code,
+         product_name, quantity, price_per_unit) in db.execute(stmt):
+        if invoice_id != current_id:
+            current_id = invoice_id
+            payloads.append({
+                "invoice_number": number,
+                "date": invoice_date.strftime("%Y-%m-%d"),
+                "vehicle_number": vehicle,
+                "total_amount": total or 0,
+                "customer": {"name": name or "", "address": address or "", "gstin": gstin or "", "state_code": state_code},
+                "items": [],
+            })
+        if product_name is not None:
+            payloads[-1]["items"].append(
+                {"product_name": product_name, "quantity": quantity, "price_per_unit": price_per_unit}
+            )
+    return payloads
+
+
+class BatchRenderReport:
+    def __init__(self):
+        self.rendered = []  # file paths
+        self.failed = []  # (invoice_number, error)
+        self.elapsed = 0.0
+        self.zip_path = None
+
+    @property
+    def pdfs_per_second(self):
+        return len(self.rendered) / self.elapsed if self.elapsed else 0.0
+
+    def summary(self, max_failures=10):
+        lines = [f"Rendered {len(self.rendered)} PDFs in {self.elapsed:.1f}s ({self.pdfs_per_second:.1f} PDFs/s)."]
+        if self.zip_path:
+            lines.append(f"Bundled into {self.zip_path}")
+        if self.failed:
+            lines.append(f"{len(self.failed)} invoices failed:")
+            lines.extend(f"  {number}: {error}" for number, error in self.failed[:max_failures])
+            if len(self.failed) > max_failures:
+                lines.append(f"  ... and {len(self.failed) - max_failures} more")
+        return "\n".join(lines)
+
+
+class BatchPdfRenderer:
+    """Renders many invoice PDFs in parallel on a process pool.
+
+    Payloads are plain dicts (see load_invoice_payloads) and settings are
+    sent once per worker, so nothing ORM-bound crosses the process
+    boundary. Each PDF is written to a temporary file and renamed into
+    ``output_dir``; with ``zip_path`` the results are also bundled into a
+    zip written the same way. ``progress_callback(done, total)`` is called
+    as results come back and may raise to cancel the remaining work.
+    """
+
+    def __init__(self, output_dir, max_workers=None, chunk_size=DEFAULT_CHUNK_SIZE, progress_callback=None):
+        self.output_dir = output_dir
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.progress_callback = progress_callback
+
+    def run(self, payloads, settings, zip_path=None):
+        os.makedirs(self.output_dir, exist_ok=True)
+        report = BatchRenderReport()
+        jobs = [(payload, os.path.join(self.output_dir, pdf_file_name(payload["invoice_number"]))) for payload in payloads]
+        paths = dict((payload["invoice_number"], path) for payload, path in jobs)
+        started = time.perf_counter()
+
+        # Spawned, not forked: the pool is started from a worker thread of a multithreaded Qt
+        # process, and a forked child can inherit locks held by other threads
+        executor = ProcessPoolExecutor(max_workers=min(self.max_workers, max(len(jobs), 1)),
+                                       mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=init_worker, initargs=(settings_snapshot(settings),))
+        try:
+            for done, (invoice_number, error) in enumerate(
+                    executor.map(render_in_worker, jobs, chunksize=self.chunk_size), start=1):
+                if error is None:
+                    report.rendered.append(paths[invoice_number])
+                else:
+                    report.failed.append((invoice_number, error))
+                if self.progress_callback:
+                    self.progress_callback(done, len(jobs))
+        except BaseException:
+            executor.shutdown(wait=True, cancel_futures=True)
+            raise
+        executor.shutdown(wait=True)
+
+        if zip_path and report.rendered:
+            report.zip_path = self.write_zip(report.rendered, zip_path)
+        report.elapsed = time.perf_counter() - started
+        return report
+
+    def write_zip(self, file_paths, zip_path):
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(zip_path)), suffix=".zip.tmp")
+        os.close(fd)
+        try:
+            # PDFs are already compressed; storing them keeps zipping I/O-bound
+            with zipfile.ZipFile(tmp_path, "w", compression=zipfile.ZIP_STORED) as archive:
+                for path in file_paths:
+                    archive.write(path, arcname=os.path.basename(path))
+            os.replace(tmp_path, zip_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return zip_path
@@ -0,0 +1,161 @@
+# src/utils/bulk_import.py
+import csv
+import re
+from itertools import islice
+from sqlalchemy import select, insert, exists, func, literal
+from src.models import CustomerCompany, Product, Inventory
+from .stock_summary import DEFAULT_LOW_STOCK_THRESHOLD
+
+DEFAULT_CHUNK_SIZE = 5000
+# Keeps IN (...) lists under SQLite's historical 999 bound-parameter limit
+LOOKUP_BATCH_SIZE = 900
+
+
+def parse_state(state_raw):
+    """Splits "State (Code: 07)" into ("State", "07"); plain names get an empty code."""
+    match = re.search(r"(.+?)\s*\(Code:\s*(\d+)\)", state_raw)
+    if match:
+        return match.group(1).strip(), match.group(2).strip()
+    return state_raw, ""
+
+
+def format_rejections(rejected, max_rejections=10):
+    """Formats (line_number, reason) pairs for an import summary message."""
+    if not rejected:
+        return []
+    lines = [f"{len(rejected)} rows were rejected:"]
+    lines.extend(f"  line {line}: {reason}" for line, reason in rejected[:max_rejections])
+    if len(rejected) > max_rejections:
+        lines.append(f"  ... and {len(rejected) - max_rejections} more")
+    return lines
+
+
+class ImportReport:
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.rows_read = 0
+        self.companies_created = 0
+        self.products_created = 0
+        self.rejected = []  # (line_number, reason)
+
+    def summary(self, max_rejections=10):
+        verb = "Would import" if self.dry_run else "Imported"
+        lines = [f"{verb} {self.companies_created} new companies and {self.products_created} products "
+                 f"from {self.rows_read} rows."]
+        lines.extend(format_rejections(self.rejected, max_rejections))
+        return "\n".join(lines)
+
+
+class CompanyProductImporter:
+    """Streams a companies/products CSV into the database with Core bulk inserts.
+
+    Rows are read ``chunk_size`` at a time. Company names in each chunk are
+    resolved with one batched SELECT against an in-memory name -> id map,
+    new companies and products are inserted with executemany, and inventory
+    rows for the new products are created with a single INSERT ... SELECT
+    per chunk. Everything runs in the session's transaction; the caller
+    commits. In dry-run mode rows are validated and counted but nothing is
+    written.
+    """
+
+    def __init__(self, db_session, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, progress_callback=None):
+        self.db_session = db_session
+        self.chunk_size = chunk_size
+        self.dry_run = dry_run
+        self.progress_callback = progress_callback
+        self.company_ids = {}
+        self.report = ImportReport(dry_run=dry_run)
+
+    def run(self, file_name):
+        from .invoice_csv import open_csv  # invoice_csv imports this module
+        conn = self.db_session.connection()
+        with open_csv(file_name, 'r') as infile:
+            reader = csv.DictReader(infile)
+            # Line 1 is the header
+            numbered_rows = enumerate(reader, start=2)
+            while True:
+                chunk = list(islice(numbered_rows, self.chunk_size))
+                if not chunk:
+                    break
+                self._import_chunk(conn, chunk)
+                if self.progress_callback:
+                    self.progress_callback(self.report.rows_read)
+        return self.report
+
+    def _validate(self, line_number, row):
+        company_name = (row.get('CompanyName') or '').strip()
+        if not company_name:
+            self.report.rejected.append((line_number, "missing CompanyName"))
+            return None
+        product_name = (row.get('ProductName') or '').strip()
+        price = 0.0
+        if product_name:
+            price_str = (row.get('Price') or '').strip()
+            try:
+                price = float(price_str) if price_str else 0.0
+            except ValueError:
+                self.report.rejected.append((line_number, f"invalid Price '{price_str}'"))
+                return None
+            if price < 0:
+                self.report.rejected.append((line_number, f"negative Price {price_str}"))
+                return None
+        return company_name, product_name, price
+
+    def _resolve_companies(self, conn, names):
+        unknown = [name for name in names if name not in self.company_ids]
+        for start in range(0, len(unknown), LOOKUP_BATCH_SIZE):
+            batch = unknown[start:start + LOOKUP_BATCH_SIZE]
+            rows = conn.execute(
+                select(CustomerCompany.id, CustomerCompany.name).where(CustomerCompany.name.in_(batch))
+            )
+            self.company_ids.update((name, company_id) for company_id, name in rows)
+
+    def _import_chunk(self, conn, chunk):
+        valid = []
+        new_companies = {}
+        for line_number, row in chunk:
+            self.report.rows_read += 1
+            parsed = self._validate(line_number, row)
+            if parsed is not None:
+                valid.append(parsed)
+                company_name = parsed[0]
+                if company_name not in new_companies:
+                    state_name, state_code = parse_state((row.get('State') or '').strip())
+                    new_companies[company_name] = {
+                        "name": company_name, "address": (row.get('Address') or '').strip(),
+                        "state": state_name, "state_code": state_code,
+                        "gstin": (row.get('GSTIN') or '').strip(),
+                    }
+
+        self._resolve_companies(conn, list(new_companies))
+        to_create = [values for name, values in new_companies.items() if name not in self.company_ids]
+        self.report.companies_created += len(to_create)
+        product_rows = [(company, product, price) for company, product, price in valid if product]
+        self.report.products_created += len(product_rows)
+
+        if self.dry_run:
+            # Remember would-be companies so later chunks don't count them again
+            self.company_ids.update((values["name"], None) for values in to_create)
+            return
+
+        if to_create:
+            conn.execute(insert(CustomerCompany.__table__), to_create)
+            self._resolve_companies(conn, [values["name"] for values in to_create])
+        if product_rows:
+            # products.id is a rowid alias, so the rows inserted next get ids above this maximum
+            max_id_before = conn.execute(select(func.coalesce(func.max(Product.id), 0))).scalar()
+            conn.execute(insert(Product.__table__), [
+                {"name": product, "price": price, "company_id": self.company_ids[company]}
+                for company, product, price in product_rows
+            ])
+            # A rowid range scan over this chunk's products. If this chunk opened the
+            # transaction, another writer may have added a product (with its stock row)
+            # after the max was read, so ids that already have stock are skipped
+            conn.execute(
+                insert(Inventory.__table__).from_select(
+                    ["product_id", "stock_quantity", "low_stock_threshold"],
+                    select(Product.id, literal(0), literal(DEFAULT_LOW_STOCK_THRESHOLD)).where(
+                        Product.id > max_id_before, ~exists().where(Inventory.product_id == Product.id)
+                    )
+                )
+            )
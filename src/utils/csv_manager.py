@@ -1,82 +1,82 @@
 # src/utils/csv_manager.py
 import csv
 import os
-import re
-from .database import SessionLocal
+from .database import SessionLocal, get_sessionmaker
 from .helpers import log_action
-from src.models import CustomerCompany, Product, Inventory
-
-from src.models import Invoice, InvoiceItem
+from .background import JobCancelled
+from .query_profiles import with_profile
+from .bulk_import import CompanyProductImporter
+from .invoice_csv import InvoiceExporter, InvoiceImporter, open_csv
+from src.models import CustomerCompany
 
 class CsvManager:
-    def __init__(self, companies_tab, inventory_tab, audit_log_tab, invoice_history_tab):
-        self.companies_tab = companies_tab
-        self.inventory_tab = inventory_tab
-        self.audit_log_tab = audit_log_tab
-        self.invoice_history_tab = invoice_history_tab
+    """Runs CSV imports and exports with their own sessions, so they can be called from a worker thread.
+
+    The import/export methods never touch widgets; the GUI thread calls
+    refresh_views() afterwards to reload the affected tabs.
+    """
+
+    def __init__(self, get_tab):
+        # get_tab(page name) -> the tab widget, or None if it hasn't been built yet
+        self.get_tab = get_tab
 
-    def handle_import_csv(self, file_name, import_type):
+    def handle_import_csv(self, file_name, import_type, dry_run=False, progress_callback=None):
         if import_type == "companies_and_products":
-            return self.import_companies_and_products(file_name)
+            return self.import_companies_and_products(file_name, dry_run=dry_run, progress_callback=progress_callback)
         elif import_type == "invoices":
-            return self.import_invoices(file_name)
+            return self.import_invoices(file_name, progress_callback=progress_callback)
 
-    def handle_export_csv(self, file_name, export_type):
+    def handle_export_csv(self, file_name, export_type, progress_callback=None):
         if export_type == "companies_and_products":
             return self.export_companies_and_products(file_name)
         elif export_type == "invoices":
-            return self.export_invoices(file_name)
-
-    def import_companies_and_products(self, file_name):
+            return self.export_invoices(file_name, progress_callback=progress_callback)
+        elif export_type == "invoice_items":
+            return self.export_invoices(file_name, line_items=True, progress_callback=progress_callback)
+
+    def refresh_views(self, kind):
+        """Reloads the tabs affected by an import or export of ``kind`` (an import or export type)."""
+        # Tabs that haven't been built yet load fresh data when first opened
+        companies_tab = self.get_tab("Companies & Products")
+        inventory_tab = self.get_tab("Inventory")
+        invoice_history_tab = self.get_tab("Past Invoices")
+        audit_log_tab = self.get_tab("Audit Log")
+        if kind == "companies_and_products_import":
+            if companies_tab:
+                companies_tab.load_companies()
+            if inventory_tab:
+                inventory_tab.refresh_inventory()
+        elif kind == "invoices_import" and invoice_history_tab:
+            invoice_history_tab.handle_refresh()
+        if audit_log_tab:
+            audit_log_tab.load_logs()
+
+    def import_companies_and_products(self, file_name, dry_run=False, progress_callback=None):
         try:
-            with SessionLocal() as db_session:
-                companies_cache = {c.name: c for c in db_session.query(CustomerCompany).all()}
-
-                with open(file_name, mode='r', encoding='utf-8-sig') as infile:
-                    reader = csv.DictReader(infile)
-                    for row in reader:
-                        company_name = row.get('CompanyName', '').strip()
-                        if not company_name:
-                            continue
-
-                        company = companies_cache.get(company_name)
-                        if not company:
-                            state_raw = row.get('State', '').strip()
-                            state_name, state_code = self._parse_state(state_raw)
-
-                            company = CustomerCompany(
-                                name=company_name, address=row.get('Address', '').strip(),
-                                state=state_name, state_code=state_code,
-                                gstin=row.get('GSTIN', '').strip()
-                            )
-                            db_session.add(company)
-                            db_session.flush()
-                            companies_cache[company_name] = company
-
-                        product_name = row.get('ProductName', '').strip()
-                        if product_name:
-                            price_str = row.get('Price', '0').strip()
-                            price = float(price_str) if price_str else 0.0
-                            new_product = Product(name=product_name, price=price, company_id=company.id)
-                            new_inventory = Inventory(stock_quantity=0, product=new_product)
-                            db_session.add(new_product)
-                            db_session.add(new_inventory)
-
-                log_action(db_session, "IMPORT", "System", None, f"Imported data from CSV file: {os.path.basename(file_name)}.")
+            with get_sessionmaker("bulk_load")() as db_session:
+                importer = CompanyProductImporter(db_session, dry_run=dry_run, progress_callback=progress_callback)
+                report = importer.run(file_name)
+                if dry_run:
+                    db_session.rollback()
+                    return True, report.summary()
+
+                log_action(db_session, "IMPORT", "System", None,
+                           f"Imported data from CSV file: {os.path.basename(file_name)} "
+                           f"({report.companies_created} companies, {report.products_created} products, "
+                           f"{len(report.rejected)} rejected rows).")
                 db_session.commit()
 
-            self.companies_tab.load_companies()
-            self.inventory_tab.load_inventory_data()
-            self.audit_log_tab.load_logs()
-            return True, "Data imported successfully!"
+            return True, report.summary()
+        except JobCancelled:
+            raise
         except Exception as e:
             return False, f"An error occurred during import:\n{e}"
 
     def export_companies_and_products(self, file_name):
         try:
             with SessionLocal() as db_session:
-                companies = db_session.query(CustomerCompany).order_by(CustomerCompany.name).all()
-                with open(file_name, mode='w', newline='', encoding='utf-8') as outfile:
+                companies = with_profile(db_session.query(CustomerCompany), "company_products").order_by(CustomerCompany.name).all()
+                with open_csv(file_name, 'w') as outfile:
                     writer = csv.writer(outfile)
                     writer.writerow(['CompanyName', 'CompanyID', 'Address', 'State', 'GSTIN', 'ProductID', 'ProductName', 'Price'])
 
@@ -91,70 +91,46 @@ class CsvManager:
                 log_action(db_session, "EXPORT", "System", None, f"Exported data to CSV file: {os.path.basename(file_name)}.")
                 db_session.commit()
 
-            self.audit_log_tab.load_logs()
             return True, "Data exported successfully!"
         except Exception as e:
             return False, f"An error occurred during export:\n{e}"
 
-    def import_invoices(self, file_name):
+    def import_invoices(self, file_name, progress_callback=None):
+        importer = None
         try:
-            with SessionLocal() as db_session:
-                with open(file_name, mode='r', encoding='utf-8-sig') as infile:
-                    reader = csv.DictReader(infile)
-                    for row in reader:
-                        # This is a simplified import process. A real-world application
-                        # would need more robust error handling and data validation.
-                        customer = db_session.query(CustomerCompany).filter(CustomerCompany.name == row['CustomerName']).first()
-                        if customer:
-                            invoice = Invoice(
-                                invoice_number=row['InvoiceNumber'],
-                                customer_id=customer.id,
-                                vehicle_number=row['VehicleNumber'],
-                                date=row['Date'],
-                                total_amount=row['TotalAmount']
-                            )
-                            db_session.add(invoice)
-                            db_session.flush()
-
-                            # Assuming items are in a separate file or a more complex format
-                            # For simplicity, we are not importing items here.
-
-                log_action(db_session, "IMPORT", "System", None, f"Imported invoices from CSV file: {os.path.basename(file_name)}.")
+            with get_sessionmaker("bulk_load")() as db_session:
+                importer = InvoiceImporter(db_session, progress_callback=progress_callback)
+                report = importer.run(file_name)
+
+                log_action(db_session, "IMPORT", "System", None,
+                           f"Imported invoices from CSV file: {os.path.basename(file_name)} "
+                           f"({report.invoices_imported} invoices, {report.items_imported} items, "
+                           f"{len(report.rejected)} rejected rows).")
                 db_session.commit()
 
-            self.invoice_history_tab.load_invoices()
-            self.audit_log_tab.load_logs()
-            return True, "Invoices imported successfully!"
+            return True, report.summary()
+        except JobCancelled:
+            raise
         except Exception as e:
-            return False, f"An error occurred during invoice import:\n{e}"
-
-    def export_invoices(self, file_name):
+            message = f"An error occurred during invoice import:\n{e}"
+            if importer is not None and importer.report.last_committed_line:
+                message += (f"\n\nRows up to line {importer.report.last_committed_line} were committed. "
+                            f"Importing the same file again is safe; invoices already imported, including rows "
+                            f"without an invoice number, are updated rather than duplicated.")
+            return False, message
+
+    def export_invoices(self, file_name, line_items=False, progress_callback=None):
         try:
             with SessionLocal() as db_session:
-                invoices = db_session.query(Invoice).order_by(Invoice.date.desc()).all()
-                with open(file_name, mode='w', newline='', encoding='utf-8') as outfile:
-                    writer = csv.writer(outfile)
-                    writer.writerow(['InvoiceNumber', 'CustomerName', 'Date', 'VehicleNumber', 'TotalAmount'])
-
-                    for invoice in invoices:
-                        writer.writerow([
-                            invoice.invoice_number,
-                            invoice.customer.name,
-                            invoice.date,
-                            invoice.vehicle_number,
-                            invoice.total_amount
-                        ])
-
-                log_action(db_session, "EXPORT", "System", None, f"Exported invoices to CSV file: {os.path.basename(file_name)}.")
+                exporter = InvoiceExporter(db_session, line_items=line_items, progress_callback=progress_callback)
+                rows_written = exporter.run(file_name)
+
+                kind = "invoice line items" if line_items else "invoices"
+                log_action(db_session, "EXPORT", "System", None, f"Exported {rows_written} {kind} to CSV file: {os.path.basename(file_name)}.")
                 db_session.commit()
 
-            self.audit_log_tab.load_logs()
             return True, "Invoices exported successfully!"
+        except JobCancelled:
+            raise
         except Exception as e:
             return False, f"An error occurred during invoice export:\n{e}"
-
-    def _parse_state(self, state_raw):
-        match = re.search(r"(.+?)\s*\(Code:\s*(\d+)\)", state_raw)
-        if match:
-            return match.group(1).strip(), match.group(2).strip()
-        return state_raw, ""
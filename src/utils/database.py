@@ -1,5 +1,5 @@
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 # This file is now self-contained. It prepares the database tools.
@@ -10,10 +10,91 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(_
 DATABASE_NAME = "billing_app.db"
 DATABASE_PATH = os.path.join(PROJECT_ROOT, DATABASE_NAME)
 
+# Connection pragmas per use case, applied in order on every new connection.
+# busy_timeout comes first so switching journal_mode waits for other
+# connections instead of failing. foreign_keys stays OFF: deleting a company
+# with invoices or a product with stock history relies on it not being enforced.
+ENGINE_PROFILES = {
+    # UI sessions: WAL lets readers run alongside a writer, NORMAL only syncs on checkpoint
+    "interactive": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -64000,  # negative means KiB, ~64 MB
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": "OFF",
+    },
+    # CSV imports and other long jobs: a longer busy timeout and a bigger cache. WAL with
+    # NORMAL only syncs on checkpoint, so a power cut can lose the last committed batches
+    # (imports are resumable) but never corrupts the file, which OFF could
+    "bulk_load": {
+        "busy_timeout": 30000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -256000,
+        "mmap_size": 256 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": "OFF",
+    },
+    # Dashboards and exports: large cache and mmap, writes refused
+    "reporting": {
+        "busy_timeout": 5000,
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -128000,
+        "mmap_size": 1024 * 1024 * 1024,
+        "temp_store": "MEMORY",
+        "foreign_keys": "OFF",
+        "query_only": "ON",
+    },
+}
+DEFAULT_PROFILE = os.environ.get("BILLING_APP_DB_PROFILE", "interactive")
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+    finally:
+        cursor.close()
+
+
+def create_profiled_engine(profile=DEFAULT_PROFILE, database_path=DATABASE_PATH):
+    """Creates an engine whose connections are configured with ENGINE_PROFILES[profile] (None for SQLite defaults)."""
+    new_engine = create_engine(f'sqlite:///{database_path}')
+    if profile is not None:
+        pragmas = ENGINE_PROFILES[profile]
+
+        @event.listens_for(new_engine, "connect")
+        def on_connect(dbapi_connection, connection_record):
+            apply_pragmas(dbapi_connection, pragmas)
+
+    return new_engine
+
 
 # Setup the database engine
-engine = create_engine(f'sqlite:///{DATABASE_PATH}')
+engine = create_profiled_engine(DEFAULT_PROFILE)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+_profile_engines = {DEFAULT_PROFILE: engine}
+_profile_sessions = {DEFAULT_PROFILE: SessionLocal}
+
+
+def get_engine(profile):
+    """Shared engine for a named profile, e.g. get_engine("reporting")."""
+    if profile not in _profile_engines:
+        _profile_engines[profile] = create_profiled_engine(profile)
+    return _profile_engines[profile]
+
+
+def get_sessionmaker(profile):
+    """Session factory bound to a named profile; use like SessionLocal."""
+    if profile not in _profile_sessions:
+        _profile_sessions[profile] = sessionmaker(autocommit=False, autoflush=False, bind=get_engine(profile))
+    return _profile_sessions[profile]
+
+
 # Create the Base class that all models will inherit from
-Base = declarative_base()
\ No newline at end of file
+Base = declarative_base()
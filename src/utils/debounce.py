@@ -0,0 +1,27 @@
+# src/utils/debounce.py
+from PyQt6.QtCore import QObject, QTimer
+
+
+class Debouncer(QObject):
+    """Coalesces bursts of UI signals (e.g. textChanged) into one callback after a quiet period."""
+
+    def __init__(self, callback, delay_ms=250, parent=None):
+        super().__init__(parent)
+        self.callback = callback
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.callback)
+
+    def trigger(self, *args):
+        """Restarts the quiet period; signal arguments are ignored."""
+        self._timer.start()
+
+    def flush(self):
+        """Runs a pending callback immediately."""
+        if self._timer.isActive():
+            self._timer.stop()
+            self.callback()
+
+    def cancel(self):
+        self._timer.stop()
@@ -1,6 +1,7 @@
 # src/utils/dialogs.py
 from PyQt6.QtWidgets import (QDialog, QGridLayout, QLabel, QLineEdit,
-                             QComboBox, QDialogButtonBox, QDoubleSpinBox, QSpinBox)
+                             QComboBox, QDialogButtonBox, QDoubleSpinBox, QSpinBox, QDateEdit, QCheckBox)
+from PyQt6.QtCore import QDate
 from src.utils.theme import DARK_THEME
 from src.utils.constants import INDIAN_STATES
 
@@ -116,4 +117,37 @@ class StockAdjustmentDialog(BaseDialog):
         new_stock = self.current_stock + self.adjustment_input.value()
         self.new_stock_lbl.setText(f"<b>New Stock after Adjustment: <span style='color:#fff;'>{new_stock}</span></b>")
     def get_data(self):
-        return {"adjustment": self.adjustment_input.value(), "reason": self.reason_input.text().strip()}
\ No newline at end of file
+        return {"adjustment": self.adjustment_input.value(), "reason": self.reason_input.text().strip()}
+
+class BulkPdfDialog(BaseDialog):
+    def __init__(self, customers, parent=None):
+        """``customers`` is a list of (id, name) pairs for the customer filter."""
+        super().__init__(parent)
+        self.setWindowTitle("Export Invoice PDFs")
+        self.setMinimumWidth(400)
+        layout = QGridLayout(self)
+        layout.setSpacing(15)
+        today = QDate.currentDate()
+        self.from_date = QDateEdit(QDate(today.year(), today.month(), 1))
+        self.from_date.setCalendarPopup(True)
+        self.to_date = QDateEdit(today)
+        self.to_date.setCalendarPopup(True)
+        self.customer_combo = QComboBox()
+        self.customer_combo.addItem("All Customers", None)
+        for customer_id, name in customers:
+            self.customer_combo.addItem(name, customer_id)
+        self.zip_checkbox = QCheckBox("Also bundle into a zip file")
+        self.zip_checkbox.setChecked(True)
+        layout.addWidget(QLabel("From:"), 0, 0); layout.addWidget(self.from_date, 0, 1)
+        layout.addWidget(QLabel("To:"), 1, 0); layout.addWidget(self.to_date, 1, 1)
+        layout.addWidget(QLabel("Customer:"), 2, 0); layout.addWidget(self.customer_combo, 2, 1)
+        layout.addWidget(self.zip_checkbox, 3, 0, 1, 2)
+        buttons = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+        buttons.accepted.connect(self.accept); buttons.rejected.connect(self.reject)
+        ok_button = buttons.button(QDialogButtonBox.StandardButton.Ok)
+        ok_button.setText("Export PDFs")
+        ok_button.setStyleSheet(f"background-color: {DARK_THEME['accent_primary']}; color: {DARK_THEME['text_on_accent']}; border: none; border-radius: 4px; padding: 8px 16px; font-weight: 600;")
+        layout.addWidget(buttons, 4, 0, 1, 2)
+    def get_data(self):
+        return {"from_date": self.from_date.date().toPyDate(), "to_date": self.to_date.date().toPyDate(),
+                "customer_id": self.customer_combo.currentData(), "zip": self.zip_checkbox.isChecked()}
\ No newline at end of file
@@ -0,0 +1,57 @@
+# src/utils/engine_benchmark.py
+"""Measures commit latency for each engine profile against a scratch database.
+
+Run with: python -m src.utils.engine_benchmark [commits]
+"""
+import os
+import sys
+import time
+import tempfile
+import statistics
+from sqlalchemy import text
+from .database import ENGINE_PROFILES, create_profiled_engine
+
+
+def measure_commit_latency(profile, commits=500):
+    """Returns per-commit latencies in milliseconds for one small INSERT per transaction."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bench_engine = create_profiled_engine(profile, os.path.join(tmp_dir, "bench.db"))
+        try:
+            with bench_engine.begin() as conn:
+                conn.execute(text("CREATE TABLE bench (id INTEGER PRIMARY KEY, payload TEXT)"))
+            latencies = []
+            with bench_engine.connect() as conn:
+                for i in range(commits):
+                    start = time.perf_counter()
+                    conn.execute(text("INSERT INTO bench (payload) VALUES (:payload)"), {"payload": f"row {i}"})
+                    conn.commit()
+                    latencies.append((time.perf_counter() - start) * 1000)
+            return latencies
+        finally:
+            bench_engine.dispose()
+
+
+def run_benchmark(commits=500):
+    # "reporting" is query_only, so it can't take part in a write benchmark
+    profiles = [None] + [name for name, pragmas in ENGINE_PROFILES.items() if pragmas.get("query_only") != "ON"]
+    results = {}
+    for profile in profiles:
+        latencies = sorted(measure_commit_latency(profile, commits))
+        results[profile or "sqlite defaults"] = (
+            statistics.mean(latencies),
+            latencies[len(latencies) // 2],
+            latencies[int(len(latencies) * 0.99) - 1],
+        )
+    return results
+
+
+def main():
+    commits = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    print(f"{commits} single-row commits per profile")
+    print(f"{'profile':<18}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, (mean, p50, p99) in run_benchmark(commits).items():
+        print(f"{name:<18}{mean:>10.3f}{p50:>10.3f}{p99:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
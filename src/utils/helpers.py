@@ -1,4 +1,6 @@
 # src/utils/helpers.py
+import json
+from sqlalchemy import insert
 from src.models import AuditLog
 
 def log_action(db_session, action, entity_type, entity_id, details):
@@ -9,4 +11,79 @@ def log_action(db_session, action, entity_type, entity_id, details):
         entity_id=entity_id,
         details=details
     )
-    db_session.add(log_entry)
\ No newline at end of file
+    db_session.add(log_entry)
+
+# Groups larger than this are collapsed into one summary entry by bulk operations
+BULK_COLLAPSE_THRESHOLD = 10
+
+
+def summary_details(message, entity_ids, entries=None):
+    """JSON details for a collapsed audit entry; ``entries`` pairs each id with its own details."""
+    payload = {"message": message, "entity_ids": list(entity_ids)}
+    if entries is not None:
+        payload["entries"] = [list(entry) for entry in entries]
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"))
+
+
+def parse_summary_details(details):
+    """The payload of a collapsed entry's details, or None for plain-text details."""
+    if not details or not details.startswith("{"):
+        return None
+    try:
+        payload = json.loads(details)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) and "entity_ids" in payload else None
+
+
+class AuditWriter:
+    """Buffers audit entries for one unit of work and inserts them with a single executemany.
+
+    Use as a context manager around the work; entries are flushed on a
+    clean exit and dropped if the block raises. Like log_action it does
+    not commit. With ``collapse_threshold``, any (action, entity_type)
+    group with more entries than that is written as one summary entry
+    whose details are JSON (see summary_details) holding the message,
+    the entity ids and each entity's own details.
+    """
+
+    def __init__(self, db_session, collapse_threshold=None, summary="{action} of {count} {entity_type} records."):
+        self.db_session = db_session
+        self.collapse_threshold = collapse_threshold
+        self.summary = summary
+        self._entries = []
+
+    def add(self, action, entity_type, entity_id, details):
+        self._entries.append((action, entity_type, entity_id, details))
+
+    def rows(self):
+        groups = {}
+        for entry in self._entries:
+            groups.setdefault((entry[0], entry[1]), []).append(entry)
+        rows = []
+        for (action, entity_type), entries in groups.items():
+            if self.collapse_threshold is not None and len(entries) > self.collapse_threshold:
+                message = self.summary.format(action=action, entity_type=entity_type, count=len(entries))
+                rows.append({
+                    "action": action, "entity_type": entity_type, "entity_id": None,
+                    "details": summary_details(message, [e[2] for e in entries], [(e[2], e[3]) for e in entries]),
+                })
+            else:
+                rows.extend({"action": a, "entity_type": t, "entity_id": i, "details": d} for a, t, i, d in entries)
+        return rows
+
+    def flush(self):
+        rows = self.rows()
+        if rows:
+            self.db_session.execute(insert(AuditLog.__table__), rows)
+        self._entries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.flush()
+        else:
+            self._entries = []
+        return False
\ No newline at end of file
@@ -1,29 +1,207 @@
 # src/utils/inventory_audit.py
-from src.models import Inventory, InventoryHistory, Product
+import sys
+import json
+import sqlite3
+import argparse
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+# inventory_history replayed per product in time order; expected is the stock after each row
+RUNNING_STOCK = """
+    SELECT h.id, h.product_id, h.new_stock,
+           SUM(COALESCE(h.change_quantity, 0)) OVER (
+               PARTITION BY h.product_id ORDER BY h.timestamp, h.id ROWS UNBOUNDED PRECEDING
+           ) AS expected
+    FROM inventory_history h
+"""
+
+HISTORY_CHECK = f"""
+    WITH running AS ({RUNNING_STOCK})
+    SELECT r.id, r.product_id, p.name, r.expected, r.new_stock
+    FROM running r
+    JOIN products p ON p.id = r.product_id
+    JOIN inventory i ON i.product_id = p.id
+    WHERE r.new_stock IS NOT r.expected OR r.new_stock < 0
+    ORDER BY r.product_id, r.id
+"""
+
+# Products with an inventory row whose stock differs from the sum of their history
+STOCK_CHECK = """
+    SELECT p.id, p.name, COALESCE(t.total, 0) AS expected, i.stock_quantity
+    FROM inventory i
+    JOIN products p ON p.id = i.product_id
+    LEFT JOIN (
+        SELECT product_id, SUM(COALESCE(change_quantity, 0)) AS total FROM inventory_history GROUP BY product_id
+    ) t ON t.product_id = p.id
+    WHERE i.stock_quantity IS NOT COALESCE(t.total, 0)
+    ORDER BY p.id
+"""
+
+ORPHAN_CHECK = """
+    SELECT h.id FROM inventory_history h
+    WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.id = h.product_id)
+    ORDER BY h.id
+"""
+
+OPENING_BALANCE_REASON = "Integrity repair: opening balance"
+
+# Window functions (the checks) arrived in SQLite 3.25, UPDATE ... FROM (the repair) in 3.33
+CHECK_MIN_SQLITE_VERSION = (3, 25, 0)
+REPAIR_MIN_SQLITE_VERSION = (3, 33, 0)
+
+
+def require_sqlite_version(minimum, purpose):
+    """Raises RuntimeError if the SQLite library Python links against is older than ``minimum``."""
+    if sqlite3.sqlite_version_info < minimum:
+        raise RuntimeError(f"{purpose} needs SQLite {'.'.join(map(str, minimum))} or newer, "
+                           f"but this Python uses SQLite {sqlite3.sqlite_version}.")
+
+
+class InventoryIntegrityReport:
+    """Result of check_inventory_integrity; ``to_dict()``/``to_json()`` give the machine-readable form."""
+
+    def __init__(self):
+        self.history_mismatches = []  # {history_id, product_id, product_name, expected, actual}
+        self.negative_stock = []  # {history_id, product_id, product_name, new_stock}
+        self.stock_mismatches = []  # {product_id, product_name, expected, actual}
+        self.orphaned_history = []  # history ids
+
+    @property
+    def ok(self):
+        return not (self.history_mismatches or self.negative_stock or self.stock_mismatches or self.orphaned_history)
+
+    def to_dict(self):
+        return {
+            "ok": self.ok,
+            "history_mismatches": self.history_mismatches,
+            "negative_stock": self.negative_stock,
+            "stock_mismatches": self.stock_mismatches,
+            "orphaned_history": self.orphaned_history,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def errors(self):
+        """Human-readable messages, one per problem (orphans excluded, as before)."""
+        messages = []
+        for m in self.history_mismatches:
+            messages.append(f"Stock mismatch for product {m['product_name']} at history {m['history_id']}: "
+                            f"expected {m['expected']}, got {m['actual']}")
+        for n in self.negative_stock:
+            messages.append(f"Negative stock for product {n['product_name']} at history {n['history_id']}")
+        for m in self.stock_mismatches:
+            messages.append(f"Current stock mismatch for product {m['product_name']}: "
+                            f"expected {m['expected']}, got {m['actual']}")
+        return messages
+
+
+def check_inventory_integrity(db: Session):
+    """Finds history/stock mismatches, negative stock and orphaned history in three queries."""
+    require_sqlite_version(CHECK_MIN_SQLITE_VERSION, "The inventory integrity check")
+    report = InventoryIntegrityReport()
+    for history_id, product_id, name, expected, new_stock in db.execute(text(HISTORY_CHECK)):
+        if new_stock != expected:
+            report.history_mismatches.append({"history_id": history_id, "product_id": product_id,
+                                              "product_name": name, "expected": expected, "actual": new_stock})
+        if new_stock is not None and new_stock < 0:
+            report.negative_stock.append({"history_id": history_id, "product_id": product_id,
+                                          "product_name": name, "new_stock": new_stock})
+    report.stock_mismatches = [
+        {"product_id": product_id, "product_name": name, "expected": expected, "actual": stock}
+        for product_id, name, expected, stock in db.execute(text(STOCK_CHECK))
+    ]
+    report.orphaned_history = find_orphaned_history(db)
+    return report
+
+
 def validate_inventory_integrity(db: Session):
-    errors = []
-    products = db.query(Product).all()
-    for product in products:
-        if not product.inventory:
-            continue
-        history = db.query(InventoryHistory).filter_by(product_id=product.id).order_by(InventoryHistory.timestamp).all()
-        stock_calc = 0
-        for h in history:
-            stock_calc += h.change_quantity
-            if h.new_stock != stock_calc:
-                errors.append(f"Stock mismatch for product {product.name} at history {h.id}: expected {stock_calc}, got {h.new_stock}")
-            if h.new_stock < 0:
-                errors.append(f"Negative stock for product {product.name} at history {h.id}")
-        if product.inventory.stock_quantity != stock_calc:
-            errors.append(f"Current stock mismatch for product {product.name}: expected {stock_calc}, got {product.inventory.stock_quantity}")
-    return errors
+    return check_inventory_integrity(db).errors()
+
 
 def find_orphaned_history(db: Session):
-    orphans = []
-    histories = db.query(InventoryHistory).all()
-    for h in histories:
-        if not db.query(Product).filter_by(id=h.product_id).first():
-            orphans.append(h.id)
-    return orphans
+    return [history_id for (history_id,) in db.execute(text(ORPHAN_CHECK))]
+
+
+def repair_inventory(db: Session, delete_orphans=False):
+    """Rebuilds inventory from inventory_history in a few bulk statements and commits; returns row counts.
+
+    - Products with stock but no history get an opening-balance history
+      row, so stock set outside the ledger (e.g. CSV imports) is kept.
+    - Every history row's new_stock is set to the running sum.
+    - Every inventory row's stock_quantity is set to its history total.
+    - With ``delete_orphans``, history rows of deleted products are removed.
+
+    Raises RuntimeError before writing anything if SQLite is older than 3.33.
+    """
+    require_sqlite_version(REPAIR_MIN_SQLITE_VERSION, "Inventory repair")
+    result = {}
+    try:
+        result["opening_balances_added"] = db.execute(text("""
+            INSERT INTO inventory_history (product_id, change_quantity, new_stock, reason)
+            SELECT i.product_id, i.stock_quantity, i.stock_quantity, :reason
+            FROM inventory i
+            WHERE COALESCE(i.stock_quantity, 0) != 0
+              AND NOT EXISTS (SELECT 1 FROM inventory_history h WHERE h.product_id = i.product_id)
+        """), {"reason": OPENING_BALANCE_REASON}).rowcount
+        result["history_rows_fixed"] = db.execute(text(f"""
+            UPDATE inventory_history SET new_stock = running.expected
+            FROM ({RUNNING_STOCK}) AS running
+            WHERE inventory_history.id = running.id AND inventory_history.new_stock IS NOT running.expected
+        """)).rowcount
+        result["stock_rows_fixed"] = db.execute(text("""
+            UPDATE inventory SET stock_quantity = COALESCE(totals.total, 0)
+            FROM inventory AS i2
+            LEFT JOIN (
+                SELECT product_id, SUM(COALESCE(change_quantity, 0)) AS total FROM inventory_history GROUP BY product_id
+            ) AS totals ON totals.product_id = i2.product_id
+            WHERE inventory.id = i2.id AND inventory.stock_quantity IS NOT COALESCE(totals.total, 0)
+        """)).rowcount
+        result["orphans_deleted"] = 0
+        if delete_orphans:
+            result["orphans_deleted"] = db.execute(text("""
+                DELETE FROM inventory_history
+                WHERE NOT EXISTS (SELECT 1 FROM products p WHERE p.id = inventory_history.product_id)
+            """)).rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result
+
+
+def main():
+    """python -m src.utils.inventory_audit [--repair [--delete-orphans]] [--json]
+
+    Exits with status 1 when problems remain.
+    """
+    from .database import SessionLocal
+
+    parser = argparse.ArgumentParser(prog="python -m src.utils.inventory_audit")
+    parser.add_argument("--repair", action="store_true", help="rebuild stock and new_stock from the history")
+    parser.add_argument("--delete-orphans", action="store_true", help="with --repair, delete orphaned history rows")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        repaired = repair_inventory(db, delete_orphans=args.delete_orphans) if args.repair else None
+        report = check_inventory_integrity(db)
+    if args.json:
+        output = report.to_dict()
+        if repaired is not None:
+            output["repair"] = repaired
+        print(json.dumps(output, indent=2))
+    else:
+        if repaired is not None:
+            print("Repair: " + ", ".join(f"{key}={value}" for key, value in repaired.items()))
+        for message in report.errors():
+            print(message)
+        if report.orphaned_history:
+            print(f"{len(report.orphaned_history)} orphaned history rows: {report.orphaned_history[:20]}")
+        if report.ok:
+            print("Inventory is consistent.")
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,287 @@
+# src/utils/invoice_csv.py
+import csv
+import os
+import gzip
+import hashlib
+from datetime import date
+from sqlalchemy import select, delete, insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import Invoice, InvoiceItem, CustomerCompany
+from .bulk_import import format_rejections, LOOKUP_BATCH_SIZE
+from .invoice_number_service import InvoiceNumberService
+from .sales_rollup import refresh_sales_rollup
+
+INVOICE_COLUMNS = ['InvoiceNumber', 'CustomerName', 'Date', 'VehicleNumber', 'TotalAmount']
+LINE_ITEM_COLUMNS = INVOICE_COLUMNS + ['ProductName', 'Quantity', 'PricePerUnit']
+
+DEFAULT_EXPORT_BATCH_SIZE = 1000
+# Invoices per committed import batch
+DEFAULT_IMPORT_BATCH_SIZE = 500
+
+
+def open_csv(file_name, mode='r'):
+    """Opens a CSV file for text reading ('r') or writing ('w'), gzip-compressed when the name ends in .gz."""
+    if file_name.lower().endswith('.gz'):
+        return gzip.open(file_name, mode + 't', newline='', encoding='utf-8-sig' if mode == 'r' else 'utf-8')
+    return open(file_name, mode=mode, newline='', encoding='utf-8-sig' if mode == 'r' else 'utf-8')
+
+
+class InvoiceExporter:
+    """Streams invoices (optionally one row per line item) straight from SQL to CSV.
+
+    Customer and item columns are joined in the query and rows are fetched
+    ``batch_size`` at a time with ``yield_per``, so no ORM objects are built
+    and memory stays flat regardless of table size.
+    """
+
+    def __init__(self, db_session, line_items=False, batch_size=DEFAULT_EXPORT_BATCH_SIZE, progress_callback=None):
+        self.db_session = db_session
+        self.line_items = line_items
+        self.batch_size = batch_size
+        self.progress_callback = progress_callback
+
+    def columns(self):
+        return LINE_ITEM_COLUMNS if self.line_items else INVOICE_COLUMNS
+
+    def build_query(self):
+        entities = [Invoice.invoice_number, CustomerCompany.name, Invoice.date, Invoice.vehicle_number, Invoice.total_amount]
+        order_by = [Invoice.date.desc(), Invoice.id.desc()]
+        if self.line_items:
+            entities += [InvoiceItem.product_name, InvoiceItem.quantity, InvoiceItem.price_per_unit]
+            order_by.append(InvoiceItem.id)
+        query = self.db_session.query(*entities).outerjoin(Invoice.customer)
+        if self.line_items:
+            query = query.outerjoin(Invoice.items)
+        return query.order_by(*order_by).yield_per(self.batch_size)
+
+    def run(self, file_name):
+        """Writes the export and returns the number of data rows written."""
+        rows_written = 0
+        try:
+            with open_csv(file_name, 'w') as outfile:
+                writer = csv.writer(outfile)
+                writer.writerow(self.columns())
+                for row in self.build_query():
+                    writer.writerow(row)
+                    rows_written += 1
+                    if self.progress_callback and rows_written % self.batch_size == 0:
+                        self.progress_callback(rows_written)
+        except BaseException:
+            # Don't leave a truncated export behind (e.g. when cancelled from the progress callback)
+            if os.path.exists(file_name):
+                os.remove(file_name)
+            raise
+        return rows_written
+
+
+class InvoiceImportReport:
+    def __init__(self):
+        self.rows_read = 0
+        self.invoices_imported = 0
+        self.items_imported = 0
+        self.rejected = []  # (line_number, reason)
+        # Last CSV line whose batch was committed; pass as start_line to resume
+        self.last_committed_line = 0
+
+    def summary(self, max_rejections=10):
+        lines = [f"Imported {self.invoices_imported} invoices and {self.items_imported} line items "
+                 f"from {self.rows_read} rows."]
+        lines.extend(format_rejections(self.rejected, max_rejections))
+        return "\n".join(lines)
+
+
+class InvoiceImporter:
+    """Bulk-imports invoices, with or without line items, in committed batches.
+
+    Accepts both export layouts from InvoiceExporter; rows sharing an
+    InvoiceNumber are grouped into one invoice with its items, so an
+    invoice's lines must be contiguous in the file. Customers are resolved
+    from a name -> id map loaded once. Invoices are upserted with
+    ON CONFLICT(invoice_number) and, when the file has item columns, their
+    items are replaced, so re-running an import is idempotent. A row with a
+    blank InvoiceNumber becomes a new invoice identified by ``import_key``,
+    a hash of the row's values plus how many identical rows came before it
+    in the file; re-importing the file finds those invoices again by key.
+    Numbers for new ones are reserved as one block per batch from the
+    invoice sequence and inserted without an upsert. Explicit numbers move
+    the sequence past themselves first, so a reserved number never lands
+    on an imported one.
+    Each batch of ``batch_size`` invoices is committed on its own; after a
+    failure, ``report.last_committed_line`` can be passed as
+    ``start_line`` to resume.
+    """
+
+    UPDATE_COLUMNS = ('customer_id', 'vehicle_number', 'date', 'total_amount')
+    UNNUMBERED_KEY = "\0new:"
+
+    def __init__(self, db_session, batch_size=DEFAULT_IMPORT_BATCH_SIZE, start_line=0, progress_callback=None,
+                 number_service=None):
+        self.db_session = db_session
+        self.number_service = number_service or InvoiceNumberService()
+        self.batch_size = batch_size
+        self.start_line = start_line
+        self.progress_callback = progress_callback
+        self.report = InvoiceImportReport()
+        self.report.last_committed_line = start_line
+
+    def run(self, file_name):
+        self.customer_ids = dict(self.db_session.query(CustomerCompany.name, CustomerCompany.id))
+        with open_csv(file_name, 'r') as infile:
+            reader = csv.DictReader(infile)
+            has_items = 'ProductName' in (reader.fieldnames or [])
+            pending = {}
+            last_line = self.start_line
+            seen_unnumbered = {}
+            for line_number, row in enumerate(reader, start=2):
+                invoice_number = (row.get('InvoiceNumber') or '').strip()
+                # Counted on skipped lines too, so a resumed import derives the same keys
+                import_key = None if invoice_number else self._import_key(row, seen_unnumbered)
+                if line_number <= self.start_line:
+                    continue
+                self.report.rows_read += 1
+                # Only cut a batch between invoices so an invoice's items are never split
+                if len(pending) >= self.batch_size and invoice_number not in pending:
+                    self._flush(pending, has_items, last_line)
+                    pending = {}
+                self._add_row(pending, line_number, invoice_number, row, has_items, import_key)
+                last_line = line_number
+            if pending:
+                self._flush(pending, has_items, last_line)
+        return self.report
+
+    def _import_key(self, row, seen):
+        fields = "\x1f".join((row.get(column) or '').strip() for column in LINE_ITEM_COLUMNS[1:])
+        digest = hashlib.sha1(fields.encode('utf-8')).hexdigest()
+        seen[digest] = seen.get(digest, 0) + 1
+        return f"{digest}:{seen[digest]}"
+
+    def _reject(self, line_number, reason):
+        self.report.rejected.append((line_number, reason))
+
+    def _parse_item(self, line_number, row):
+        product_name = (row.get('ProductName') or '').strip()
+        if not product_name:
+            return None
+        try:
+            quantity = int(float(row.get('Quantity') or 0))
+            price_per_unit = float(row.get('PricePerUnit') or 0)
+        except ValueError:
+            self._reject(line_number, f"invalid quantity or price for item '{product_name}'")
+            return None
+        return {"product_name": product_name, "quantity": quantity, "price_per_unit": price_per_unit}
+
+    def _add_row(self, pending, line_number, invoice_number, row, has_items, import_key=None):
+        if not invoice_number:
+            # Rows without a number become new invoices numbered from the sequence at flush time
+            invoice_number = f"{self.UNNUMBERED_KEY}{line_number}"
+        if invoice_number not in pending:
+            customer_name = (row.get('CustomerName') or '').strip()
+            customer_id = self.customer_ids.get(customer_name)
+            if customer_id is None:
+                self._reject(line_number, f"unknown customer '{customer_name}'")
+                return
+            try:
+                invoice_date = date.fromisoformat((row.get('Date') or '').strip())
+            except ValueError:
+                self._reject(line_number, f"invalid Date '{row.get('Date')}'")
+                return
+            total_str = (row.get('TotalAmount') or '').strip()
+            try:
+                total_amount = float(total_str) if total_str else None
+            except ValueError:
+                self._reject(line_number, f"invalid TotalAmount '{total_str}'")
+                return
+            pending[invoice_number] = {
+                "values": {
+                    "invoice_number": invoice_number, "customer_id": customer_id,
+                    "vehicle_number": (row.get('VehicleNumber') or '').strip(),
+                    "date": invoice_date, "total_amount": total_amount, "payment_status": "Pending",
+                },
+                "items": [],
+                "import_key": import_key,
+            }
+        if has_items:
+            item = self._parse_item(line_number, row)
+            if item is not None:
+                pending[invoice_number]["items"].append(item)
+
+    def _flush(self, pending, has_items, last_line):
+        conn = self.db_session.connection()
+        for entry in pending.values():
+            if entry["values"]["total_amount"] is None:
+                entry["values"]["total_amount"] = sum(i["quantity"] * i["price_per_unit"] for i in entry["items"])
+        numbered = {key: entry for key, entry in pending.items() if not key.startswith(self.UNNUMBERED_KEY)}
+        unnumbered = [entry for key, entry in pending.items() if key.startswith(self.UNNUMBERED_KEY)]
+
+        # Unnumbered rows imported before keep the number they were given and are updated like numbered ones
+        keys = [entry["import_key"] for entry in unnumbered]
+        existing = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            existing.update(tuple(row) for row in conn.execute(
+                select(Invoice.import_key, Invoice.invoice_number)
+                .where(Invoice.import_key.in_(keys[start:start + LOOKUP_BATCH_SIZE]))
+            ))
+        for entry in unnumbered:
+            number = existing.get(entry["import_key"])
+            if number is not None:
+                entry["values"]["invoice_number"] = number
+                numbered[number] = entry
+        unnumbered = [entry for entry in unnumbered if entry["import_key"] not in existing]
+
+        # An upsert can move an invoice to another date or customer, so the groups it
+        # leaves need refreshing as well as the ones it lands in
+        rollup_keys = {(entry["values"]["date"], entry["values"]["customer_id"]) for entry in pending.values()}
+        numbers = list(numbered)
+        for start in range(0, len(numbers), LOOKUP_BATCH_SIZE):
+            rollup_keys.update(tuple(row) for row in conn.execute(
+                select(Invoice.date, Invoice.customer_id)
+                .where(Invoice.invoice_number.in_(numbers[start:start + LOOKUP_BATCH_SIZE]))
+            ))
+
+        if numbered:
+            stmt = sqlite_insert(Invoice.__table__)
+            # Existing invoices keep their payment status
+            stmt = stmt.on_conflict_do_update(
+                index_elements=['invoice_number'],
+                set_={column: stmt.excluded[column] for column in self.UPDATE_COLUMNS},
+            )
+            conn.execute(stmt, [entry["values"] for entry in numbered.values()])
+            # Imported numbers may be ahead of the sequence; later allocations must skip them
+            self.number_service.advance_past(self.db_session, numbers)
+
+        if unnumbered:
+            allocated = self.number_service.allocate_block(
+                self.db_session, [entry["values"]["date"] for entry in unnumbered]
+            )
+            for number, entry in zip(allocated, unnumbered):
+                entry["values"]["invoice_number"] = number
+                numbered[number] = entry
+            # A plain INSERT: a fresh number that somehow exists already must fail, not overwrite that invoice
+            conn.execute(insert(Invoice.__table__),
+                         [dict(entry["values"], import_key=entry["import_key"]) for entry in unnumbered])
+            numbers.extend(allocated)
+        pending = numbered
+
+        if has_items:
+            invoice_ids = {}
+            for start in range(0, len(numbers), LOOKUP_BATCH_SIZE):
+                batch = numbers[start:start + LOOKUP_BATCH_SIZE]
+                invoice_ids.update(
+                    (number, invoice_id) for invoice_id, number in
+                    conn.execute(select(Invoice.id, Invoice.invoice_number).where(Invoice.invoice_number.in_(batch)))
+                )
+            ids = list(invoice_ids.values())
+            for start in range(0, len(ids), LOOKUP_BATCH_SIZE):
+                conn.execute(delete(InvoiceItem.__table__).where(InvoiceItem.invoice_id.in_(ids[start:start + LOOKUP_BATCH_SIZE])))
+            items = [dict(item, invoice_id=invoice_ids[number])
+                     for number, entry in pending.items() for item in entry["items"]]
+            if items:
+                conn.execute(insert(InvoiceItem.__table__), items)
+            self.report.items_imported += len(items)
+
+        refresh_sales_rollup(conn, rollup_keys)
+        self.db_session.commit()
+        self.report.invoices_imported += len(pending)
+        self.report.last_committed_line = last_line
+        if self.progress_callback:
+            self.progress_callback(self.report.rows_read)
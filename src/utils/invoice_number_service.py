@@ -1,24 +1,122 @@
 # src/utils/invoice_number_service.py
 import os
+import re
 import json
+from datetime import date
+from sqlalchemy import select, update, text, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import InvoiceSequence
+from .database import PROJECT_ROOT
+
+DEFAULT_PREFIX = "INV-"
+# Pre-database counter file; only read once to seed the sequence
+LEGACY_COUNTER_FILE = os.path.join(PROJECT_ROOT, "invoice_counter.json")
+
+
+def financial_year_label(invoice_date):
+    """Indian financial year (April-March) for a date, e.g. 2025-06-01 -> '2025-26'."""
+    start_year = invoice_date.year if invoice_date.month >= 4 else invoice_date.year - 1
+    return f"{start_year}-{(start_year + 1) % 100:02d}"
+
 
 class InvoiceNumberService:
-    def __init__(self, storage_file="invoice_counter.json"):
-        self.storage_file = storage_file
-        self.counter = self._load_counter()
-
-    def _load_counter(self):
-        if os.path.exists(self.storage_file):
-            with open(self.storage_file, 'r') as f:
-                return json.load(f)
-        else:
-            return {"counter": 0}
-
-    def _save_counter(self):
-        with open(self.storage_file, 'w') as f:
-            json.dump(self.counter, f)
-
-    def get_next_invoice_number(self):
-        self.counter['counter'] += 1
-        self._save_counter()
-        return f"INV-{self.counter['counter']:05d}"
+    """Allocates invoice numbers from the invoice_sequences table.
+
+    Numbers are taken inside the caller's transaction, so an invoice that is
+    rolled back gives its number back and numbering stays gap-free. The
+    UPDATE takes SQLite's write lock until commit, which keeps two app
+    instances sharing the database from issuing the same number. With
+    ``per_financial_year`` each April-March year gets its own prefix and
+    counter (INV-2025-26-00001).
+    """
+
+    def __init__(self, prefix=DEFAULT_PREFIX, per_financial_year=False, legacy_counter_file=LEGACY_COUNTER_FILE):
+        self.prefix = prefix
+        self.per_financial_year = per_financial_year
+        self.legacy_counter_file = legacy_counter_file
+
+    def prefix_for(self, invoice_date=None):
+        if not self.per_financial_year:
+            return self.prefix
+        return f"{self.prefix}{financial_year_label(invoice_date or date.today())}-"
+
+    def format_number(self, prefix, value):
+        return f"{prefix}{value:05d}"
+
+    def _legacy_counter(self):
+        if self.legacy_counter_file and os.path.exists(self.legacy_counter_file):
+            with open(self.legacy_counter_file, 'r') as f:
+                return int(json.load(f).get("counter", 0))
+        return 0
+
+    def _initial_value(self, conn, prefix):
+        # Continue after the highest purely numeric suffix already issued under this prefix
+        highest = conn.execute(
+            text("SELECT MAX(CAST(SUBSTR(invoice_number, :start) AS INTEGER)) FROM invoices "
+                 "WHERE SUBSTR(invoice_number, 1, :length) = :prefix AND SUBSTR(invoice_number, :start) NOT GLOB '*[^0-9]*'"),
+            {"start": len(prefix) + 1, "length": len(prefix), "prefix": prefix},
+        ).scalar() or 0
+        if prefix == self.prefix:
+            highest = max(highest, self._legacy_counter())
+        return highest
+
+    def _ensure_sequence(self, conn, prefix):
+        exists = conn.execute(select(InvoiceSequence.prefix).where(InvoiceSequence.prefix == prefix)).first()
+        if exists is None:
+            conn.execute(
+                sqlite_insert(InvoiceSequence.__table__)
+                .values(prefix=prefix, last_value=self._initial_value(conn, prefix))
+                .on_conflict_do_nothing(index_elements=['prefix'])
+            )
+
+    def _reserve(self, db_session, prefix, count):
+        """Advances the counter for ``prefix`` by ``count`` and returns the first reserved value."""
+        conn = db_session.connection()
+        self._ensure_sequence(conn, prefix)
+        conn.execute(
+            update(InvoiceSequence.__table__)
+            .where(InvoiceSequence.prefix == prefix)
+            .values(last_value=InvoiceSequence.last_value + count)
+        )
+        last_value = conn.execute(select(InvoiceSequence.last_value).where(InvoiceSequence.prefix == prefix)).scalar()
+        return last_value - count + 1
+
+    def advance_past(self, db_session, invoice_numbers):
+        """Raises counters so numbers written without the service (e.g. imported) are never allocated again.
+
+        Each number is split into a prefix and its trailing digits, the same
+        way ``_initial_value`` reads them, and the counter for that prefix is
+        moved up to the highest suffix if it is behind. Counters that don't
+        exist yet are left alone; they are seeded from the invoices table
+        when first used.
+        """
+        highest = {}
+        for number in invoice_numbers:
+            match = re.fullmatch(r"(.*?)([0-9]+)", number)
+            if match:
+                prefix, value = match.group(1), int(match.group(2))
+                highest[prefix] = max(highest.get(prefix, 0), value)
+        if highest:
+            db_session.connection().execute(
+                update(InvoiceSequence.__table__)
+                .where(InvoiceSequence.prefix == bindparam("sequence_prefix"),
+                       InvoiceSequence.last_value < bindparam("highest"))
+                .values(last_value=bindparam("highest")),
+                [{"sequence_prefix": prefix, "highest": value} for prefix, value in highest.items()],
+            )
+
+    def get_next_invoice_number(self, db_session, invoice_date=None):
+        prefix = self.prefix_for(invoice_date)
+        return self.format_number(prefix, self._reserve(db_session, prefix, 1))
+
+    def allocate_block(self, db_session, invoice_dates):
+        """Reserves one number per date with a single counter update per prefix; returns them in order."""
+        by_prefix = {}
+        for position, invoice_date in enumerate(invoice_dates):
+            by_prefix.setdefault(self.prefix_for(invoice_date), []).append(position)
+        numbers = [None] * len(invoice_dates)
+        for prefix, positions in by_prefix.items():
+            first = self._reserve(db_session, prefix, len(positions))
+            for offset, position in enumerate(positions):
+                numbers[position] = self.format_number(prefix, first + offset)
+        return numbers
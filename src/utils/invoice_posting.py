@@ -0,0 +1,109 @@
+# src/utils/invoice_posting.py
+from sqlalchemy import select, update, insert, case
+from src.models import Invoice, InvoiceItem, Inventory, InventoryHistory, Product
+from .sales_rollup import refresh_sales_rollup
+
+
+class InsufficientStockError(Exception):
+    def __init__(self, product_name, requested, available):
+        super().__init__(f"Insufficient stock for {product_name}: requested {requested}, only {available} available.")
+        self.product_name = product_name
+        self.requested = requested
+        self.available = available
+
+
+class InvoicePostingService:
+    """Saves an invoice, its items and the matching stock deductions in one transaction.
+
+    Products are resolved by id in a single query, all stock is decremented
+    by one conditional UPDATE that only succeeds if every product has
+    enough stock, and history and item rows are bulk-inserted. Any failure
+    rolls back everything, including the allocated invoice number.
+    """
+
+    def __init__(self, db_session, number_service):
+        self.db_session = db_session
+        self.number_service = number_service
+
+    def post_invoice(self, invoice_data, user_id=None):
+        try:
+            invoice = self._post(invoice_data, user_id)
+            self.db_session.commit()
+            return invoice
+        except Exception:
+            self.db_session.rollback()
+            raise
+
+    def _post(self, invoice_data, user_id):
+        conn = self.db_session.connection()
+        items = invoice_data['items']
+
+        # Same product on several lines is deducted once with the combined quantity
+        quantities = {}
+        for item in items:
+            if item.get('product_id'):
+                quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+
+        stock_rows = {}
+        if quantities:
+            stock_rows = {
+                product_id: (name, stock)
+                for product_id, name, stock in conn.execute(
+                    select(Product.id, Product.name, Inventory.stock_quantity)
+                    .outerjoin(Inventory, Inventory.product_id == Product.id)
+                    .where(Product.id.in_(list(quantities)))
+                )
+            }
+
+        invoice_number = self.number_service.get_next_invoice_number(self.db_session, invoice_data['date'])
+        invoice = Invoice(
+            invoice_number=invoice_number,
+            customer_id=invoice_data['customer_id'],
+            vehicle_number=invoice_data['vehicle_number'],
+            date=invoice_data['date'],
+            total_amount=invoice_data['total_amount'],
+            payment_status="Pending",
+        )
+        self.db_session.add(invoice)
+        self.db_session.flush()
+
+        if quantities:
+            requested = case(quantities, value=Inventory.product_id)
+            result = conn.execute(
+                update(Inventory.__table__)
+                .where(Inventory.product_id.in_(list(quantities)), Inventory.stock_quantity >= requested)
+                .values(stock_quantity=Inventory.stock_quantity - requested)
+            )
+            if result.rowcount != len(quantities):
+                # Report the first product that could not cover its quantity
+                for product_id, quantity in quantities.items():
+                    name, stock = stock_rows.get(product_id, (str(product_id), None))
+                    if stock is None or stock < quantity:
+                        raise InsufficientStockError(name, quantity, stock or 0)
+                raise InsufficientStockError("one or more products", sum(quantities.values()), 0)
+
+            new_stock = dict(conn.execute(
+                select(Inventory.product_id, Inventory.stock_quantity).where(Inventory.product_id.in_(list(quantities)))
+            ))
+            conn.execute(insert(InventoryHistory.__table__), [
+                {
+                    "product_id": product_id,
+                    "change_quantity": -quantity,
+                    "new_stock": new_stock[product_id],
+                    "reason": f"Invoice {invoice_number}",
+                    "user_id": user_id,
+                }
+                for product_id, quantity in quantities.items()
+            ])
+
+        conn.execute(insert(InvoiceItem.__table__), [
+            {
+                "invoice_id": invoice.id,
+                "product_name": item['product_name'],
+                "quantity": item['quantity'],
+                "price_per_unit": item['price_per_unit'],
+            }
+            for item in items
+        ])
+        refresh_sales_rollup(conn, [(invoice.date, invoice.customer_id)])
+        return invoice
@@ -0,0 +1,261 @@
+# src/utils/invoice_table_model.py
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QEvent, pyqtSignal
+from PyQt6.QtGui import QColor, QPen, QPainter
+from PyQt6.QtWidgets import (QStyledItemDelegate, QComboBox, QStyleOptionButton, QStyle, QApplication)
+from sqlalchemy import or_, and_
+from src.models import Invoice, CustomerCompany
+from src.utils.helpers import log_action
+from src.utils.pagination import QueryPager
+from src.utils.query_profiles import query_budget
+
+INVOICE_STATUSES = ["Pending", "Paid", "Overdue"]
+
+# (background, text, border) per payment status
+STATUS_COLORS = {
+    "Paid": ("#43a047", "#ffffff", "#388e3c"),
+    "Pending": ("#fbc02d", "#222222", "#fbc02d"),
+    "Overdue": ("#e53935", "#ffffff", "#b71c1c"),
+}
+
+
+class InvoiceTableModel(QAbstractTableModel):
+    """Lazily fetched invoice rows for a QTableView.
+
+    Only plain column tuples are cached (no ORM objects). Rows are pulled in
+    ``batch_size`` chunks through ``canFetchMore``/``fetchMore`` as the view
+    scrolls, using keyset paging on (sort key, id) so each batch costs the
+    same however deep the view has scrolled and rows inserted meanwhile
+    can't shift later batches. The total row count is cached per filter by
+    a QueryPager.
+    """
+
+    HEADERS = ["Invoice #", "Company", "Date", "Total", "Status", "Actions"]
+    STATUS_COLUMN = 4
+    ACTIONS_COLUMN = 5
+    SORT_COLUMNS = {
+        0: Invoice.invoice_number,
+        1: CustomerCompany.name,
+        2: Invoice.date,
+        3: Invoice.total_amount,
+        4: Invoice.payment_status,
+    }
+
+    def __init__(self, db_session, batch_size=100, parent=None):
+        super().__init__(parent)
+        self.db_session = db_session
+        self.pager = QueryPager(page_size=batch_size)
+        self.status_filter = None
+        self.sort_column = 2
+        self.sort_order = Qt.SortOrder.DescendingOrder
+        self._rows = []
+        self._exhausted = False
+
+    def set_filter(self, status_filter, sort_order=Qt.SortOrder.DescendingOrder):
+        """Filters by payment status (None for all) and orders by date."""
+        self.status_filter = status_filter
+        self.sort_column = 2
+        self.sort_order = sort_order
+        self.refresh(invalidate_counts=False)
+
+    def refresh(self, invalidate_counts=True):
+        self.beginResetModel()
+        if invalidate_counts:
+            self.pager.invalidate()
+        self._rows = []
+        self._exhausted = False
+        self.endResetModel()
+
+    def build_query(self):
+        query = self.db_session.query(
+            Invoice.id, Invoice.invoice_number, CustomerCompany.name, Invoice.date,
+            Invoice.total_amount, Invoice.payment_status
+        ).outerjoin(Invoice.customer)
+        if self.status_filter:
+            query = query.filter(Invoice.payment_status == self.status_filter)
+        sort_expr = self.sort_expr()
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            return query.order_by(sort_expr.desc(), Invoice.id.desc())
+        return query.order_by(sort_expr.asc(), Invoice.id.asc())
+
+    def sort_expr(self):
+        return self.SORT_COLUMNS.get(self.sort_column, Invoice.date)
+
+    def after_last_row(self, query):
+        """Restricts ``query`` to rows that sort after the last fetched row."""
+        if not self._rows:
+            return query
+        last = self._rows[-1]
+        last_id = last[0]
+        # Row tuples are (id, *columns), so column n's value is at n + 1
+        last_key = last[self.sort_column + 1]
+        sort_expr = self.sort_expr()
+        # SQLite sorts NULLs first ascending and last descending
+        if self.sort_order == Qt.SortOrder.DescendingOrder:
+            if last_key is None:
+                return query.filter(sort_expr.is_(None), Invoice.id < last_id)
+            return query.filter(or_(sort_expr < last_key, and_(sort_expr == last_key, Invoice.id < last_id),
+                                    sort_expr.is_(None)))
+        if last_key is None:
+            return query.filter(or_(and_(sort_expr.is_(None), Invoice.id > last_id), sort_expr.isnot(None)))
+        return query.filter(or_(sort_expr > last_key, and_(sort_expr == last_key, Invoice.id > last_id)))
+
+    def total_count(self):
+        return self.pager.total_count(self.build_query(), self.status_filter)
+
+    def invoice_id(self, row):
+        return self._rows[row][0]
+
+    # --- Qt model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        invoice_id, number, company, date, total, status = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return number
+            if column == 1:
+                return company or ""
+            if column == 2:
+                return date.strftime("%Y-%m-%d") if date else ""
+            if column == 3:
+                return f"₹{total or 0:,.2f}"
+            if column == self.STATUS_COLUMN:
+                return status or "Pending"
+        elif role == Qt.ItemDataRole.EditRole and column == self.STATUS_COLUMN:
+            return status or "Pending"
+        elif role == Qt.ItemDataRole.UserRole:
+            return invoice_id
+        return None
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.column() in (self.STATUS_COLUMN, self.ACTIONS_COLUMN):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if role != Qt.ItemDataRole.EditRole or index.column() != self.STATUS_COLUMN:
+            return False
+        row = self._rows[index.row()]
+        if value == row[5]:
+            return False
+        self.db_session.query(Invoice).filter(Invoice.id == row[0]).update({Invoice.payment_status: value})
+        log_action(self.db_session, "UPDATE", "Invoice", row[0], f"Invoice '{row[1]}' status changed to {value}.")
+        self.db_session.commit()
+        self._rows[index.row()] = row[:5] + (value,)
+        # Per-status counts are now stale
+        self.pager.invalidate()
+        self.dataChanged.emit(index, index)
+        return True
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return False
+        return not self._exhausted and len(self._rows) < self.total_count()
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        with query_budget(1):
+            query = self.after_last_row(self.build_query()).limit(self.pager.page_size)
+            batch = [tuple(r) for r in query]
+        # Guards against a stale cached count after rows were deleted elsewhere
+        if len(batch) < self.pager.page_size:
+            self._exhausted = True
+        if not batch:
+            return
+        start = len(self._rows)
+        self.beginInsertRows(QModelIndex(), start, start + len(batch) - 1)
+        self._rows.extend(batch)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column not in self.SORT_COLUMNS or (column, order) == (self.sort_column, self.sort_order):
+            return
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh(invalidate_counts=False)
+
+
+class StatusDelegate(QStyledItemDelegate):
+    """Paints the payment status as a coloured pill and edits it with a combo box."""
+
+    def paint(self, painter, option, index):
+        status = index.data(Qt.ItemDataRole.DisplayRole)
+        background, text, border = STATUS_COLORS.get(status, STATUS_COLORS["Pending"])
+        rect = option.rect.adjusted(8, 10, -8, -10)
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor(border), 2))
+        painter.setBrush(QColor(background))
+        painter.drawRoundedRect(rect, 6, 6)
+        font = painter.font()
+        font.setBold(True)
+        painter.setFont(font)
+        painter.setPen(QColor(text))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, status)
+        painter.restore()
+
+    def createEditor(self, parent, option, index):
+        editor = QComboBox(parent)
+        editor.addItems(INVOICE_STATUSES)
+        editor.activated.connect(lambda _: self.commitData.emit(editor))
+        return editor
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+
+class ActionsDelegate(QStyledItemDelegate):
+    """Draws the per-row action buttons and reports clicks by row; no widgets are created."""
+
+    download_requested = pyqtSignal(int)
+    share_requested = pyqtSignal(int)
+
+    LABELS = ("Download PDF", "Share")
+
+    def _button_rects(self, rect):
+        inner = rect.adjusted(6, 12, -6, -12)
+        width = (inner.width() - 6) // 2
+        return [QRect(inner.left(), inner.top(), width, inner.height()),
+                QRect(inner.left() + width + 6, inner.top(), width, inner.height())]
+
+    def paint(self, painter, option, index):
+        style = option.widget.style() if option.widget else QApplication.style()
+        for label, rect in zip(self.LABELS, self._button_rects(option.rect)):
+            button = QStyleOptionButton()
+            button.rect = rect
+            button.text = label
+            button.state = QStyle.StateFlag.State_Enabled
+            style.drawControl(QStyle.ControlElement.CE_PushButton, button, painter, option.widget)
+
+    def createEditor(self, parent, option, index):
+        return None
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() != QEvent.Type.MouseButtonRelease:
+            return False
+        point = event.position().toPoint()
+        download_rect, share_rect = self._button_rects(option.rect)
+        if download_rect.contains(point):
+            self.download_requested.emit(index.row())
+            return True
+        if share_rect.contains(point):
+            self.share_requested.emit(index.row())
+            return True
+        return False
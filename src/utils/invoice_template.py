@@ -1,8 +1,172 @@
 # src/utils/invoice_template.py
+import os
 from reportlab.lib.enums import TA_CENTER, TA_RIGHT
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.platypus import Paragraph, Table, TableStyle
 from reportlab.lib import colors
+from reportlab.lib.utils import ImageReader
+
+# Bump whenever the rendered output changes; it is part of the PDF cache key
+TEMPLATE_VERSION = 3
+
+LETTERHEAD_FORM = "letterhead"
+
+# Vertical layout (points) shared by every page of an invoice
+FIRST_PAGE_TABLE_TOP = 650  # below customer and invoice details
+CONTINUATION_TABLE_TOP = 735  # below the letterhead band and the "continued" caption
+PAGE_BOTTOM = 70  # above the letterhead footer
+
+# Per-process caches: decoded logos by (path, size, mtime) and the compiled
+# letterhead for the current settings. Cleared when settings are saved.
+_image_cache = {}
+_letterhead_cache = {}
+
+
+def load_image(path):
+    """Decodes an image once per process; returns None if it is missing or unreadable."""
+    if not path or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _image_cache:
+        try:
+            _image_cache[key] = ImageReader(path)
+        except Exception:
+            _image_cache[key] = None
+    return _image_cache[key]
+
+
+def letterhead_key(settings):
+    logo_path = getattr(settings, 'logo_filepath', None)
+    logo_stamp = None
+    if logo_path and os.path.exists(logo_path):
+        stat = os.stat(logo_path)
+        logo_stamp = (stat.st_size, stat.st_mtime_ns)
+    return (TEMPLATE_VERSION, getattr(settings, 'chosen_template', None), settings.company_name,
+            settings.address, settings.gstin, settings.pan_number, logo_path, logo_stamp)
+
+
+def get_letterhead(settings):
+    """Compiled Letterhead for these settings, built on first use and reused for every invoice after."""
+    key = letterhead_key(settings)
+    letterhead = _letterhead_cache.get(key)
+    if letterhead is None:
+        # Only the current settings are ever needed
+        _letterhead_cache.clear()
+        letterhead = _letterhead_cache[key] = Letterhead(settings)
+    return letterhead
+
+
+def invalidate_letterhead_cache():
+    _letterhead_cache.clear()
+    _image_cache.clear()
+
+
+class Letterhead:
+    """Static header band, company block, logo and footer built from UserSettings.
+
+    Text is prepared and the logo decoded once; each document then gets the
+    letterhead as a single form XObject that every page references, so
+    per-invoice work is limited to the variable content.
+    """
+
+    def __init__(self, settings):
+        self.company_name = settings.company_name or ""
+        self.address = settings.address or ""
+        self.tax_line = f"GSTIN: {settings.gstin} | PAN: {settings.pan_number}"
+        self.logo = load_image(getattr(settings, 'logo_filepath', None))
+
+    def define_form(self, c, width, height):
+        c.beginForm(LETTERHEAD_FORM)
+        c.setFillColorRGB(0.13, 0.32, 0.56)
+        c.rect(0, 760, width, 60, fill=1, stroke=0)
+        if self.logo is not None:
+            # Right end of the header band, aspect ratio preserved
+            c.drawImage(self.logo, width - 110, 765, width=60, height=50, preserveAspectRatio=True, anchor='e', mask='auto')
+        c.setFillColorRGB(1, 1, 1)
+        c.setFont("Helvetica-Bold", 28)
+        c.drawString(50, 790, self.company_name)
+        c.setFont("Helvetica", 12)
+        c.drawString(50, 775, self.address)
+        c.drawString(50, 760, self.tax_line)
+        c.setFont("Helvetica-Oblique", 10)
+        c.setFillColorRGB(0.4, 0.4, 0.4)
+        c.drawString(50, 40, "Thank you for your business!")
+        c.endForm()
+
+class StreamingItemTable:
+    """Lays out invoice line items over as many pages as they need.
+
+    Items are pulled from any iterable one page at a time, so memory stays
+    bounded by a page of rows however long the invoice is, and every page
+    costs the same to draw. Rows have a fixed height, which makes the rows
+    per page known up front. The header row repeats on every page, and a
+    page that continues onto another ends with a "Carried forward" subtotal
+    that opens the next page as "Brought forward".
+    """
+
+    ROW_HEIGHT = 18
+
+    def __init__(self, template, header, col_widths, style_commands, make_row, header_height=24, x=50):
+        self.template = template
+        self.header = header
+        self.col_widths = col_widths
+        self.style_commands = style_commands
+        # make_row(index, item) -> (cells, line_total)
+        self.make_row = make_row
+        self.header_height = header_height
+        self.x = x
+
+    def _subtotal_row(self, label, amount):
+        return [label] + [''] * (len(self.header) - 2) + [f"₹{amount:,.2f}"]
+
+    def draw(self, items, top):
+        """Draws all items starting at ``top`` on the current page; returns (y below the table, items subtotal)."""
+        items = iter(items)
+        pending = next(items, None)
+        index = 0
+        subtotal = 0.0
+        while True:
+            brought_forward = index > 0
+            # Room for the header, the brought-forward row and a carried-forward row
+            capacity = int((top - PAGE_BOTTOM - self.header_height) // self.ROW_HEIGHT) - 1 - int(brought_forward)
+            data = [self.header]
+            if brought_forward:
+                data.append(self._subtotal_row("Brought forward", subtotal))
+            while pending is not None and len(data) - 1 - int(brought_forward) < capacity:
+                cells, line_total = self.make_row(index, pending)
+                data.append(cells)
+                subtotal += line_total
+                index += 1
+                pending = next(items, None)
+            last_page = pending is None
+            if not last_page:
+                data.append(self._subtotal_row("Carried forward", subtotal))
+
+            y = self._draw_page_table(data, top, brought_forward, not last_page)
+            if last_page:
+                return y, subtotal
+            self.template.start_continuation_page()
+            top = CONTINUATION_TABLE_TOP
+
+    def _draw_page_table(self, data, top, brought_forward, carried_forward):
+        style = list(self.style_commands)
+        last_column = len(self.header) - 1
+        subtotal_rows = ([1] if brought_forward else []) + ([len(data) - 1] if carried_forward else [])
+        for row in subtotal_rows:
+            style += [
+                ('SPAN', (0, row), (last_column - 1, row)),
+                ('FONTNAME', (0, row), (-1, row), 'Helvetica-Bold'),
+                ('ALIGN', (0, row), (last_column - 1, row), 'RIGHT'),
+            ]
+        row_heights = [self.header_height] + [self.ROW_HEIGHT] * (len(data) - 1)
+        table = Table(data, colWidths=self.col_widths, rowHeights=row_heights)
+        table.setStyle(TableStyle(style))
+        table.wrapOn(self.template.c, self.template.width, self.template.height)
+        y = top - sum(row_heights)
+        table.drawOn(self.template.c, self.x, y)
+        return y
+
 
 class InvoiceTemplate:
 
@@ -26,26 +190,43 @@ class InvoiceTemplate:
         self.width = width
         self.height = height
         self.settings = settings
+        self.letterhead = get_letterhead(settings)
+        self._letterhead_defined = False
+        self.page_number = 1
+        self.invoice_number = None
+        # Set by the items table: where the next block may start, and the items subtotal
+        self.cursor_y = FIRST_PAGE_TABLE_TOP
+        self.items_subtotal = None
 
     def draw_invoice(self, invoice_data):
-        self.draw_modern_header()
+        self.invoice_number = invoice_data['invoice_number']
+        self.draw_letterhead()
         self.draw_modern_customer_info(invoice_data)
         self.draw_modern_invoice_details(invoice_data)
         self.draw_modern_items_table(invoice_data)
         self.draw_modern_summary(invoice_data)
-        self.draw_modern_footer()
-
-    def draw_modern_header(self):
-        self.c.setFillColorRGB(0.13, 0.32, 0.56)
-        self.c.rect(0, 760, self.width, 60, fill=1, stroke=0)
-        self.c.setFillColorRGB(1, 1, 1)
-        self.c.setFont("Helvetica-Bold", 28)
-        self.c.drawString(50, 790, self.settings.company_name)
-        self.c.setFont("Helvetica", 12)
-        self.c.drawString(50, 775, self.settings.address)
-        self.c.drawString(50, 760, f"GSTIN: {self.settings.gstin} | PAN: {self.settings.pan_number}")
+
+    def draw_letterhead(self):
+        """Places the header and footer on the current page; the form is defined once per document."""
+        if not self._letterhead_defined:
+            self.letterhead.define_form(self.c, self.width, self.height)
+            self._letterhead_defined = True
+        self.c.doForm(LETTERHEAD_FORM)
         self.c.setFillColorRGB(0, 0, 0)
 
+    def start_continuation_page(self):
+        self.c.showPage()
+        self.page_number += 1
+        self.draw_letterhead()
+        self.c.setFont("Helvetica-Oblique", 10)
+        self.c.drawString(50, 745, f"Invoice #: {self.invoice_number} (continued) - page {self.page_number}")
+
+    def ensure_space(self, height):
+        """Starts a new page if fewer than ``height`` points are left below the cursor."""
+        if self.cursor_y - height < PAGE_BOTTOM:
+            self.start_continuation_page()
+            self.cursor_y = CONTINUATION_TABLE_TOP
+
     def draw_modern_customer_info(self, invoice_data):
         self.c.setFont("Helvetica-Bold", 13)
         self.c.drawString(50, 730, "Bill To:")
@@ -65,16 +246,17 @@ class InvoiceTemplate:
     def draw_modern_items_table(self, invoice_data):
         self.c.setFont("Helvetica-Bold", 12)
         self.c.drawString(50, 660, "Items:")
-        data = [["Product Name", "Price", "Quantity", "Total"]]
-        for item in invoice_data['items']:
-            data.append([
+
+        def make_row(index, item):
+            line_total = item['quantity'] * item['price_per_unit']
+            return [
                 item['product_name'],
                 f"₹{item['price_per_unit']:,.2f}",
                 str(item['quantity']),
-                f"₹{item['quantity'] * item['price_per_unit']:,.2f}"
-            ])
-        table = Table(data, colWidths=[180, 80, 80, 80])
-        style = TableStyle([
+                f"₹{line_total:,.2f}"
+            ], line_total
+
+        table = StreamingItemTable(self, ["Product Name", "Price", "Quantity", "Total"], [180, 80, 80, 80], [
             ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#1976d2')),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
             ('ALIGN', (1, 1), (-1, -1), 'CENTER'),
@@ -83,21 +265,17 @@ class InvoiceTemplate:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
             ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
             ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-        ])
-        table.setStyle(style)
-        table.wrapOn(self.c, self.width, self.height)
-        table.drawOn(self.c, 50, 600 - 24 * len(data))
+        ], make_row)
+        self.cursor_y, self.items_subtotal = table.draw(invoice_data['items'], FIRST_PAGE_TABLE_TOP)
 
     def draw_modern_summary(self, invoice_data):
-        total = invoice_data['total_amount']
+        total = invoice_data.get('total_amount')
+        if total is None:
+            total = self.items_subtotal or 0
+        self.ensure_space(30)
         self.c.setFont("Helvetica-Bold", 13)
-        self.c.drawString(350, 570, f"Total: ₹{total:,.2f}")
-
-    def draw_modern_footer(self):
-        self.c.setFont("Helvetica-Oblique", 10)
-        self.c.setFillColorRGB(0.4, 0.4, 0.4)
-        self.c.drawString(50, 40, "Thank you for your business!")
-        self.c.setFillColorRGB(0, 0, 0)
+        self.c.drawString(350, self.cursor_y - 30, f"Total: ₹{total:,.2f}")
+        self.cursor_y -= 30
 
     def draw_header(self):
         self.c.setFont("Helvetica-Bold", 24)
@@ -124,20 +302,18 @@ class InvoiceTemplate:
         self.c.drawString(50, 600, f"Vehicle Number: {invoice_data['vehicle_number']}")
 
     def draw_items_table(self, invoice_data):
-        table_data = [["#", "Product", "Quantity", "Price", "Total"]]
-        for i, item in enumerate(invoice_data['items']):
+        def make_row(index, item):
             quantity = self.safe_int(item.get('quantity', 0))
             price_per_unit = self.safe_float(item.get('price_per_unit', 0.0))
-            table_data.append([
-                str(i + 1),
+            return [
+                str(index + 1),
                 item.get('product_name', ''),
                 str(quantity),
                 f"₹{price_per_unit:.2f}",
                 f"₹{quantity * price_per_unit:.2f}"
-            ])
+            ], quantity * price_per_unit
 
-        table = Table(table_data, colWidths=[30, 250, 70, 70, 80])
-        table.setStyle(TableStyle([
+        table = StreamingItemTable(self, ["#", "Product", "Quantity", "Price", "Total"], [30, 250, 70, 70, 80], [
             ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
             ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
             ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
@@ -145,9 +321,8 @@ class InvoiceTemplate:
             ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
             ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
             ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        table.wrapOn(self.c, self.width, self.height)
-        table.drawOn(self.c, 50, 450)
+        ], make_row, header_height=28)
+        self.cursor_y, self.items_subtotal = table.draw(invoice_data['items'], 590)
 
     def get_tax_info(self, subtotal, customer_state_code):
         if customer_state_code == self.settings.state_code:
@@ -168,27 +343,33 @@ class InvoiceTemplate:
             }
 
     def draw_summary(self, invoice_data):
-        subtotal = sum(self.safe_int(item.get('quantity', 0)) * self.safe_float(item.get('price_per_unit', 0.0)) for item in invoice_data['items'])
+        # Items may be a one-shot iterator, so reuse the subtotal from draw_items_table
+        subtotal = self.items_subtotal
+        if subtotal is None:
+            subtotal = sum(self.safe_int(item.get('quantity', 0)) * self.safe_float(item.get('price_per_unit', 0.0)) for item in invoice_data['items'])
         tax_info = self.get_tax_info(subtotal, invoice_data['customer']['state_code'])
         total = subtotal + tax_info['total_tax']
+        self.ensure_space(90)
+        top = self.cursor_y - 30
 
         self.c.setFont("Helvetica-Bold", 12)
-        self.c.drawString(400, 400, "Subtotal:")
+        self.c.drawString(400, top, "Subtotal:")
         if tax_info['tax_type'] == 'IGST':
-            self.c.drawString(400, 380, "IGST (18%):")
+            self.c.drawString(400, top - 20, "IGST (18%):")
         else:
-            self.c.drawString(400, 380, "CGST (9%):")
-            self.c.drawString(400, 360, "SGST (9%):")
-        self.c.drawString(400, 340, "Total:")
+            self.c.drawString(400, top - 20, "CGST (9%):")
+            self.c.drawString(400, top - 40, "SGST (9%):")
+        self.c.drawString(400, top - 60, "Total:")
 
         self.c.setFont("Helvetica", 12)
-        self.c.drawString(500, 400, f"₹{subtotal:.2f}")
+        self.c.drawString(500, top, f"₹{subtotal:.2f}")
         if tax_info['tax_type'] == 'IGST':
-            self.c.drawString(500, 380, f"₹{tax_info['igst']:.2f}")
+            self.c.drawString(500, top - 20, f"₹{tax_info['igst']:.2f}")
         else:
-            self.c.drawString(500, 380, f"₹{tax_info['cgst']:.2f}")
-            self.c.drawString(500, 360, f"₹{tax_info['sgst']:.2f}")
-        self.c.drawString(500, 340, f"₹{total:.2f}")
+            self.c.drawString(500, top - 20, f"₹{tax_info['cgst']:.2f}")
+            self.c.drawString(500, top - 40, f"₹{tax_info['sgst']:.2f}")
+        self.c.drawString(500, top - 60, f"₹{total:.2f}")
+        self.cursor_y = top - 60
 
     def draw_footer(self):
         self.c.setFont("Helvetica-Oblique", 10)
@@ -0,0 +1,102 @@
+# src/utils/migrations.py
+from sqlalchemy import text
+from .sales_rollup import backfill_sales_rollup
+from .query_cache import install_data_version
+
+# Schema version lives in SQLite's PRAGMA user_version, which is written
+# inside the same transaction as the migration that bumps it.
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(text(f"PRAGMA table_info({table})"))}
+
+
+def _add_column(conn, table, column, column_type):
+    if column not in _columns(conn, table):
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"))
+
+
+def _legacy_columns(conn):
+    """Columns that used to be added by the old migrate_add_*.py scripts."""
+    _add_column(conn, "inventory_history", "new_stock", "INTEGER")
+    _add_column(conn, "user_settings", "state", "VARCHAR")
+    _add_column(conn, "user_settings", "state_code", "VARCHAR")
+
+
+# Names match the indexes declared on the models, so create_all on a fresh
+# database and this migration on an old one end up with the same schema.
+PERFORMANCE_INDEXES = [
+    ("ix_invoices_date", "invoices", "date"),
+    ("ix_invoices_customer_id", "invoices", "customer_id"),
+    ("ix_invoices_payment_status", "invoices", "payment_status"),
+    ("ix_invoice_items_invoice_id", "invoice_items", "invoice_id"),
+    ("ix_inventory_history_product_id_timestamp", "inventory_history", "product_id, timestamp"),
+    ("ix_products_company_id", "products", "company_id"),
+    ("ix_products_name", "products", "name"),
+    ("ix_audit_logs_timestamp", "audit_logs", "timestamp"),
+]
+
+
+def _performance_indexes(conn):
+    for name, table, columns in PERFORMANCE_INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    # Refresh planner statistics so the new indexes are actually chosen
+    conn.execute(text("ANALYZE"))
+
+
+# Serve the audit log viewer's filters; both also cover the rowid, so
+# "WHERE action = ? AND id < ? ORDER BY id DESC" pages without sorting
+AUDIT_LOG_INDEXES = [
+    ("ix_audit_logs_action", "audit_logs", "action"),
+    ("ix_audit_logs_entity_type_entity_id", "audit_logs", "entity_type, entity_id"),
+]
+
+
+def _audit_log_indexes(conn):
+    for name, table, columns in AUDIT_LOG_INDEXES:
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})"))
+    conn.execute(text("ANALYZE audit_logs"))
+
+
+def _invoice_import_key(conn):
+    _add_column(conn, "invoices", "import_key", "VARCHAR")
+    conn.execute(text("CREATE UNIQUE INDEX IF NOT EXISTS ix_invoices_import_key ON invoices (import_key)"))
+
+
+# (version, description, function(conn)); append only, never renumber
+MIGRATIONS = [
+    (1, "legacy columns (inventory_history.new_stock, user_settings.state/state_code)", _legacy_columns),
+    (2, "performance indexes", _performance_indexes),
+    (3, "backfill daily sales rollup", backfill_sales_rollup),
+    (4, "data version counter for the query cache", install_data_version),
+    (5, "audit log filter indexes", _audit_log_indexes),
+    (6, "invoices.import_key for re-importing unnumbered CSV rows", _invoice_import_key),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute(text("PRAGMA user_version")).scalar()
+
+
+def run_migrations(engine):
+    """Applies pending migrations in order inside one transaction; returns the versions applied.
+
+    Expects the tables to exist already (Base.metadata.create_all runs first).
+    If any migration fails, the whole run is rolled back and the schema
+    version is left unchanged.
+    """
+    applied = []
+    with engine.begin() as conn:
+        # pysqlite doesn't open a transaction before DDL on its own; IMMEDIATE also
+        # stops a second app instance from migrating at the same time
+        conn.exec_driver_sql("BEGIN IMMEDIATE")
+        current = get_schema_version(conn)
+        for version, description, migrate in MIGRATIONS:
+            if version <= current:
+                continue
+            migrate(conn)
+            conn.execute(text(f"PRAGMA user_version = {int(version)}"))
+            applied.append(version)
+    return applied
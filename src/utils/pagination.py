@@ -0,0 +1,43 @@
+# src/utils/pagination.py
+
+
+class QueryPager:
+    """Pushes LIMIT/OFFSET paging into SQL and caches the row count per filter.
+
+    The caller builds a filtered, ordered query and passes a hashable
+    ``filter_key`` describing the filter. Counts are only re-run when the
+    filter changes or ``invalidate()`` is called, so a page flip costs a
+    single ``page_size`` SELECT.
+    """
+
+    def __init__(self, page_size=20):
+        self.page_size = page_size
+        self.current_page = 0
+        self._count_cache = {}
+
+    def invalidate(self):
+        """Drops cached counts; call after rows are inserted or deleted."""
+        self._count_cache.clear()
+
+    def reset(self):
+        self.current_page = 0
+
+    def total_count(self, query, filter_key):
+        if filter_key not in self._count_cache:
+            # Query.count() wraps the query in a subquery, so an unfiltered single-table
+            # query still counts from its table
+            self._count_cache[filter_key] = query.order_by(None).count()
+        return self._count_cache[filter_key]
+
+    def max_page(self, query, filter_key):
+        return max(0, (self.total_count(query, filter_key) - 1) // self.page_size)
+
+    def fetch_page(self, query, page=None):
+        page = self.current_page if page is None else page
+        return query.limit(self.page_size).offset(page * self.page_size).all()
+
+    def has_prev(self):
+        return self.current_page > 0
+
+    def has_next(self, query, filter_key):
+        return self.current_page < self.max_page(query, filter_key)
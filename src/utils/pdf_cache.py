@@ -0,0 +1,153 @@
+# src/utils/pdf_cache.py
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+from datetime import date, datetime
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from src.models import PdfCacheEntry, UserSettings
+from .database import PROJECT_ROOT
+from .invoice_template import TEMPLATE_VERSION
+from .pdf_worker import write_pdf_atomically
+from .bulk_import import LOOKUP_BATCH_SIZE
+
+PDF_DIR = os.path.join(PROJECT_ROOT, "pdf")
+DEFAULT_CACHE_DIR = os.path.join(PDF_DIR, "cache")
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# UserSettings fields the templates draw; changing any other setting keeps cached PDFs valid
+RENDERED_SETTINGS_FIELDS = (
+    "company_name", "address", "gstin", "pan_number", "state_code",
+    "email", "upi_id", "tagline", "logo_filepath", "chosen_template",
+)
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def pdf_cache_key(invoice_data, settings):
+    """sha256 over the invoice payload, the rendered settings fields and the template version."""
+    rendered = {field: getattr(settings, field, None) for field in RENDERED_SETTINGS_FIELDS}
+    logo = rendered.get("logo_filepath")
+    if logo and os.path.exists(logo):
+        # Replacing the logo file under the same name must still invalidate
+        stat = os.stat(logo)
+        rendered["logo_stamp"] = [stat.st_size, stat.st_mtime_ns]
+    canonical = json.dumps(
+        {"template_version": TEMPLATE_VERSION, "settings": rendered, "invoice": invoice_data},
+        sort_keys=True, separators=(",", ":"), default=_json_default,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class PdfCache:
+    """Content-addressed store of rendered invoice PDFs.
+
+    Files live under ``cache_dir/<first two hex digits>/<key>.pdf`` and are
+    indexed in the pdf_cache_entries table. Because the key covers
+    everything that affects the output, an edited invoice or a change to a
+    rendered settings field simply produces a new key; entries that are no
+    longer reachable age out through least-recently-used eviction once the
+    cache exceeds ``max_bytes``.
+    """
+
+    def __init__(self, db_session, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.db_session = db_session
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def relative_path(self, key):
+        return os.path.join(key[:2], f"{key}.pdf")
+
+    def get(self, key):
+        """Path of the cached PDF for ``key``, or None; refreshes its LRU timestamp."""
+        entry = self.db_session.get(PdfCacheEntry, key)
+        if entry is None:
+            return None
+        path = os.path.join(self.cache_dir, entry.file_path)
+        if not os.path.exists(path):
+            # File removed behind our back; forget the entry
+            self.db_session.delete(entry)
+            self.db_session.commit()
+            return None
+        entry.last_accessed = func.now()
+        self.db_session.commit()
+        return path
+
+    def render(self, key, invoice_data, settings):
+        relative_path = self.relative_path(key)
+        path = os.path.join(self.cache_dir, relative_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_pdf_atomically(settings, invoice_data, path)
+        stmt = sqlite_insert(PdfCacheEntry.__table__).values(
+            cache_key=key, invoice_number=invoice_data.get("invoice_number"),
+            file_path=relative_path, size_bytes=os.path.getsize(path),
+        )
+        self.db_session.execute(stmt.on_conflict_do_update(
+            index_elements=["cache_key"],
+            set_={"size_bytes": stmt.excluded.size_bytes, "last_accessed": func.now()},
+        ))
+        self.db_session.commit()
+        self.evict()
+        return path
+
+    def get_or_render(self, invoice_data, settings):
+        """Returns (path, cache_hit) for the invoice's PDF, rendering it only on a miss."""
+        key = pdf_cache_key(invoice_data, settings)
+        path = self.get(key)
+        if path is not None:
+            return path, True
+        return self.render(key, invoice_data, settings), False
+
+    def evict(self):
+        """Deletes least recently used entries until the cache fits in ``max_bytes``."""
+        total = self.db_session.execute(select(func.coalesce(func.sum(PdfCacheEntry.size_bytes), 0))).scalar()
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        rows = self.db_session.execute(
+            select(PdfCacheEntry.cache_key, PdfCacheEntry.file_path, PdfCacheEntry.size_bytes)
+            .order_by(PdfCacheEntry.last_accessed, PdfCacheEntry.created_at)
+        ).all()
+        for key, relative_path, size in rows:
+            if total <= self.max_bytes:
+                break
+            path = os.path.join(self.cache_dir, relative_path)
+            if os.path.exists(path):
+                os.remove(path)
+            evicted.append(key)
+            total -= size
+        for start in range(0, len(evicted), LOOKUP_BATCH_SIZE):
+            batch = evicted[start:start + LOOKUP_BATCH_SIZE]
+            self.db_session.execute(delete(PdfCacheEntry.__table__).where(PdfCacheEntry.cache_key.in_(batch)))
+        self.db_session.commit()
+
+
+def copy_file_atomically(source, destination):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".pdf.tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, destination)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return destination
+
+
+def cached_invoice_job(invoice_data, file_path):
+    """Background-job function that places the invoice's PDF at ``file_path``, rendering only on a cache miss.
+
+    Returns (file_path, cache_hit).
+    """
+    def job(context):
+        settings = context.session.query(UserSettings).first()
+        cached_path, cache_hit = PdfCache(context.session).get_or_render(invoice_data, settings)
+        return copy_file_atomically(cached_path, file_path), cache_hit
+    return job
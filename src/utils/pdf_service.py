@@ -19,3 +19,16 @@ class PdfService:
 
         c.save()
         return file_path
+
+
+def generate_invoice_job(invoice_data, file_path):
+    """Returns a background-job function that renders an invoice PDF and returns its path.
+
+    Settings are loaded on the job's own session rather than passed in from
+    the GUI thread's session.
+    """
+    def job(context):
+        from src.models import UserSettings
+        settings = context.session.query(UserSettings).first()
+        return PdfService(settings).generate_invoice(invoice_data, file_path=file_path)
+    return job
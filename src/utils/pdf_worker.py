@@ -0,0 +1,41 @@
+# src/utils/pdf_worker.py
+import os
+import tempfile
+from types import SimpleNamespace
+from .pdf_service import PdfService
+
+# Entry points for BatchPdfRenderer's worker processes. Workers are spawned
+# and import this module fresh, so it must only pull in reportlab and the
+# PDF template: no PyQt, SQLAlchemy or the app's database engine.
+
+
+def write_pdf_atomically(settings, invoice_data, file_path):
+    """Renders to a temporary file in the target directory, then renames it into place."""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".pdf.tmp")
+    os.close(fd)
+    try:
+        PdfService(settings).generate_invoice(invoice_data, file_path=tmp_path)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return file_path
+
+
+_worker_settings = None
+
+
+def init_worker(settings_dict):
+    # Runs once per worker process so settings aren't pickled with every invoice
+    global _worker_settings
+    _worker_settings = SimpleNamespace(**settings_dict)
+
+
+def render_in_worker(job):
+    invoice_data, file_path = job
+    try:
+        write_pdf_atomically(_worker_settings, invoice_data, file_path)
+        return invoice_data["invoice_number"], None
+    except Exception as e:
+        return invoice_data["invoice_number"], str(e)
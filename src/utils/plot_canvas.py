@@ -1,46 +1,197 @@
 # src/utils/plot_canvas.py
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from functools import lru_cache
+import matplotlib
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+from matplotlib.dates import AutoDateLocator, ConciseDateFormatter, date2num
+from src.utils.downsample import lttb
+
+# Line charts never get fewer points than this, however narrow the canvas
+MIN_LINE_POINTS = 100
+# Headroom above the tallest bar/point when the y-axis has to be rescaled
+Y_HEADROOM = 1.15
+
+
+@lru_cache(maxsize=1)
+def theme_rc():
+    """rcParams for the dark theme; figures and artists created inside ``rc_context(theme_rc())`` pick them up."""
+    from src.utils.theme import DARK_THEME
+    return {
+        'figure.facecolor': DARK_THEME['bg_surface'],
+        'axes.facecolor': DARK_THEME['bg_surface'],
+        'axes.edgecolor': DARK_THEME['border_main'],
+        'axes.titlecolor': DARK_THEME['text_primary'],
+        'axes.labelcolor': DARK_THEME['text_secondary'],
+        'xtick.color': DARK_THEME['text_secondary'],
+        'ytick.color': DARK_THEME['text_secondary'],
+        'text.color': DARK_THEME['text_primary'],
+        'patch.edgecolor': DARK_THEME['bg_surface'],
+        'lines.color': DARK_THEME['accent_primary'],
+    }
+
 
 class PlotCanvas(FigureCanvas):
+    """Chart widget that builds its artists once and updates them in place.
+
+    Bars and lines are animated artists: when only their data changes and
+    the axes (limits, tick labels, titles) stay put, they are redrawn over
+    a cached background and blitted. Anything that changes the axes
+    schedules a full ``draw_idle()`` instead, which also refreshes the
+    cached background.
+    """
+
     def __init__(self, parent=None, width=5, height=4, dpi=100):
-        fig = Figure(figsize=(width, height), dpi=dpi)
-        self.axes = fig.add_subplot(111)
+        with self.themed():
+            fig = Figure(figsize=(width, height), dpi=dpi)
+            self.axes = fig.add_subplot(111)
         super().__init__(fig)
         self.setParent(parent)
+        self._bars = None
+        self._bar_labels = None
+        self._line = None
+        self._pie_artists = []
+        self._message = None
+        self._background = None
+        self.mpl_connect('draw_event', self._on_draw)
+
+    def themed(self):
+        return matplotlib.rc_context(theme_rc())
+
+    def _animated_artists(self):
+        artists = list(self._bars) if self._bars is not None else []
+        if self._line is not None:
+            artists.append(self._line)
+        return [artist for artist in artists if artist.get_visible()]
+
+    def _on_draw(self, event):
+        # Background without the animated artists, then the artists on top
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        for artist in self._animated_artists():
+            self.axes.draw_artist(artist)
+
+    def _refresh(self, full):
+        if full or self._background is None:
+            self.draw_idle()
+            return
+        self.restore_region(self._background)
+        for artist in self._animated_artists():
+            self.axes.draw_artist(artist)
+        self.blit(self.figure.bbox)
+
+    def _set_texts(self, title, xlabel, ylabel):
+        changed = False
+        for getter, setter, value in (
+            (self.axes.get_title, self.axes.set_title, title),
+            (self.axes.get_xlabel, self.axes.set_xlabel, xlabel),
+            (self.axes.get_ylabel, self.axes.set_ylabel, ylabel),
+        ):
+            if getter() != value:
+                setter(value)
+                changed = True
+        return changed
+
+    def _fit_ylim(self, values):
+        """Rescales the y-axis only when the data no longer fits or uses under half of it."""
+        top = max(values, default=0) or 1
+        current = self.axes.get_ylim()[1]
+        if current > 0 and top <= current and top > current / 2 and self.axes.get_ylim()[0] == 0:
+            return False
+        self.axes.set_ylim(0, top * Y_HEADROOM)
+        return True
+
+    def _show_data(self):
+        """Hides the message and any pie left from another chart type; returns True if that needs a full draw."""
+        changed = False
+        if self._message is not None and self._message.get_visible():
+            self._message.set_visible(False)
+            self.axes.set_axis_on()
+            changed = True
+        if self._pie_artists:
+            for artist in self._pie_artists:
+                artist.remove()
+            self._pie_artists = []
+            self.axes.set_aspect('auto')
+            changed = True
+        return changed
+
+    def show_message(self, text):
+        """Replaces the chart with a centred message, e.g. when there is no data."""
+        if self._message is None:
+            with self.themed():
+                self._message = self.axes.text(0.5, 0.5, text, transform=self.axes.transAxes,
+                                               horizontalalignment='center', verticalalignment='center',
+                                               fontsize=14)
+        self._message.set_text(text)
+        self._message.set_visible(True)
+        for artist in self._animated_artists():
+            artist.set_visible(False)
+        self.axes.set_axis_off()
+        self.draw_idle()
 
     def plot_bar(self, x, y, title, xlabel, ylabel):
-        from src.utils.theme import DARK_THEME
-        self.axes.cla()
-        fig = self.figure
-        fig.patch.set_facecolor(DARK_THEME['bg_surface'])
-        self.axes.set_facecolor(DARK_THEME['bg_surface'])
-        bars = self.axes.bar(x, y, color=DARK_THEME['accent_primary'])
-        self.axes.set_title(title, color=DARK_THEME['text_primary'])
-        self.axes.set_xlabel(xlabel, color=DARK_THEME['text_secondary'])
-        self.axes.set_ylabel(ylabel, color=DARK_THEME['text_secondary'])
-        self.axes.tick_params(axis='x', colors=DARK_THEME['text_secondary'])
-        self.axes.tick_params(axis='y', colors=DARK_THEME['text_secondary'])
-        for spine in self.axes.spines.values():
-            spine.set_color(DARK_THEME['border_main'])
-        self.draw()
+        labels = list(x)
+        heights = [float(value) for value in y]
+        full = self._show_data()
+        if self._bars is None or len(self._bars) != len(heights):
+            if self._bars is not None:
+                self._bars.remove()
+            with self.themed():
+                self._bars = self.axes.bar(range(len(heights)), heights,
+                                           color=theme_rc()['lines.color'], animated=True)
+            full = True
+        else:
+            for rect, height in zip(self._bars, heights):
+                rect.set_height(height)
+                rect.set_visible(True)
+        if labels != self._bar_labels:
+            self.axes.set_xticks(range(len(labels)))
+            self.axes.set_xticklabels(labels)
+            self._bar_labels = labels
+            full = True
+        full = self._set_texts(title, xlabel, ylabel) or full
+        full = self._fit_ylim(heights) or full
+        self._refresh(full)
+
+    def plot_line(self, dates, values, title, xlabel, ylabel, max_points=None):
+        """Plots ``values`` against ``dates``, downsampled with LTTB to about one point per pixel."""
+        xs = [float(x) for x in date2num(list(dates))]
+        ys = [float(value) for value in values]
+        xs, ys = lttb(xs, ys, max_points or max(MIN_LINE_POINTS, self.width()))
+        full = self._show_data()
+        if self._line is None:
+            with self.themed():
+                (self._line,) = self.axes.plot([], [], animated=True)
+            locator = AutoDateLocator()
+            self.axes.xaxis.set_major_locator(locator)
+            self.axes.xaxis.set_major_formatter(ConciseDateFormatter(locator))
+            full = True
+        self._line.set_data(xs, ys)
+        self._line.set_visible(True)
+        if xs:
+            # A single day still needs a non-empty x range
+            xlim = (xs[0], xs[-1]) if xs[-1] > xs[0] else (xs[0] - 1, xs[0] + 1)
+            if tuple(self.axes.get_xlim()) != xlim:
+                self.axes.set_xlim(*xlim)
+                full = True
+        full = self._set_texts(title, xlabel, ylabel) or full
+        full = self._fit_ylim(ys) or full
+        self._refresh(full)
 
     def plot_pie(self, sizes, labels, title):
+        # Wedge geometry depends on every size, so the pie is rebuilt, but without cla() or re-theming
         from src.utils.theme import DARK_THEME
-        self.axes.cla()
-        fig = self.figure
-        fig.patch.set_facecolor(DARK_THEME['bg_surface'])
-        self.axes.set_facecolor(DARK_THEME['bg_surface'])
+        self._show_data()
+        for artist in self._animated_artists():
+            artist.set_visible(False)
         colors = [DARK_THEME['accent_primary'], DARK_THEME['accent_danger']]
-        wedges, texts, autotexts = self.axes.pie(
-            sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors,
-            textprops={'color': DARK_THEME['text_primary'], 'fontsize': 12}
-        )
-        self.axes.axis('equal')
-        self.axes.set_title(title, color=DARK_THEME['text_primary'])
+        with self.themed():
+            wedges, texts, autotexts = self.axes.pie(
+                sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors,
+                textprops={'color': DARK_THEME['text_primary'], 'fontsize': 12}
+            )
         for text in texts:
             text.set_color(DARK_THEME['text_secondary'])
-        for spine in self.axes.spines.values():
-            spine.set_color(DARK_THEME['border_main'])
-        self.draw()
+        self._pie_artists = list(wedges) + list(texts) + list(autotexts)
+        self.axes.axis('equal')
+        self._set_texts(title, "", "")
+        self.draw_idle()
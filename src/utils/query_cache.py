@@ -0,0 +1,97 @@
+# src/utils/query_cache.py
+import threading
+from collections import OrderedDict
+from sqlalchemy import text
+
+# Tables whose writes bump the data version. Triggers keep the counter in
+# step with every write path (ORM, Core bulk inserts, raw SQL, other processes).
+DATA_VERSION_TABLES = ("invoices", "invoice_items", "products", "inventory", "customer_companies")
+
+DEFAULT_MAX_ENTRIES = 128
+
+
+def install_data_version(conn):
+    """Creates the single-row data_version counter and its triggers if missing."""
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS data_version ("
+        "id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)"
+    ))
+    conn.execute(text("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)"))
+    for table in DATA_VERSION_TABLES:
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(text(
+                f"CREATE TRIGGER IF NOT EXISTS {table}_data_version_{event.lower()} AFTER {event} ON {table} "
+                f"BEGIN UPDATE data_version SET version = version + 1 WHERE id = 1; END"
+            ))
+
+
+def get_data_version(db):
+    """Current data version; ``db`` is a Session or Connection."""
+    return db.execute(text("SELECT version FROM data_version WHERE id = 1")).scalar() or 0
+
+
+class QueryCache:
+    """LRU cache of query results validated against the data version.
+
+    Entries are keyed by a query name plus its (hashable) parameters and
+    remember the data version they were computed at; any committed write
+    to a tracked table makes them stale, so a lookup costs one single-row
+    SELECT on a hit. The version is read before the query runs, so a write
+    racing with the computation can only cause an extra miss, never a
+    stale hit. Cached values are shared and must not be mutated. Safe to
+    use from worker threads.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (name, params) -> (version, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_compute(self, db, name, params, compute):
+        """Returns the cached result for (name, params) or stores ``compute()``."""
+        key = (name, params)
+        version = get_data_version(db)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+_query_cache = None
+
+
+def get_query_cache():
+    """Shared QueryCache for the application."""
+    global _query_cache
+    if _query_cache is None:
+        _query_cache = QueryCache()
+    return _query_cache
@@ -0,0 +1,65 @@
+# src/utils/query_profiles.py
+import os
+from contextlib import nullcontext
+from sqlalchemy import event
+from sqlalchemy.orm import joinedload, selectinload
+from src.models import CustomerCompany, Product, Invoice
+from .database import engine
+
+# Named loader profiles. Every listing/export path picks one of these so the
+# relationships it touches per row are loaded up front instead of lazily.
+LOADER_PROFILES = {
+    # Invoice history rows and invoice CSV export only need the customer name
+    "invoice_list": (joinedload(Invoice.customer),),
+    # Anything that walks invoice lines (PDF, export with items)
+    "invoice_detail": (joinedload(Invoice.customer), selectinload(Invoice.items)),
+    # Companies & products CSV export
+    "company_products": (selectinload(CustomerCompany.products),),
+    # Inventory table: product, its company and its stock row
+    "product_inventory": (joinedload(Product.company), joinedload(Product.inventory)),
+    # Product dropdowns and integrity checks that only read stock
+    "product_stock": (joinedload(Product.inventory),),
+}
+
+
+def with_profile(query, profile_name):
+    """Applies the named loader profile's eager-load options to a query."""
+    return query.options(*LOADER_PROFILES[profile_name])
+
+
+class QueryCounter:
+    """Counts SQL statements issued on an engine while the context is active.
+
+    If ``max_statements`` is given, leaving the context raises AssertionError
+    when the budget was exceeded.
+    """
+
+    def __init__(self, max_statements=None, bind=None):
+        self.max_statements = max_statements
+        self.bind = bind if bind is not None else engine
+        self.count = 0
+        self.statements = []
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.count += 1
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.bind, "before_cursor_execute", self._on_execute)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        event.remove(self.bind, "before_cursor_execute", self._on_execute)
+        if exc_type is None and self.max_statements is not None and self.count > self.max_statements:
+            raise AssertionError(
+                f"Expected at most {self.max_statements} SQL statements, got {self.count}:\n"
+                + "\n".join(self.statements)
+            )
+        return False
+
+
+def query_budget(max_statements, bind=None):
+    """Enforces a statement budget when BILLING_APP_QUERY_BUDGET=1 (test mode); a no-op otherwise."""
+    if os.environ.get("BILLING_APP_QUERY_BUDGET") == "1":
+        return QueryCounter(max_statements=max_statements, bind=bind)
+    return nullcontext()
@@ -0,0 +1,93 @@
+# src/utils/sales_rollup.py
+import time
+from sqlalchemy import Table, Column, Integer, Date, MetaData, text, insert, delete
+
+# daily_sales and daily_invoice_totals hold one row per (date, customer[, product]).
+# Writers refresh just the (date, customer_id) groups they touched by
+# recomputing them from invoices/invoice_items, so the rollup can never
+# drift from the facts and a refresh is idempotent.
+
+_keys_metadata = MetaData()
+_rollup_keys = Table(
+    "sales_rollup_keys", _keys_metadata,
+    Column("date", Date),
+    Column("customer_id", Integer),
+    prefixes=["TEMPORARY"],
+)
+
+# "IS" so that invoices without a customer are matched as well
+_KEY_MATCHES = "k.date = {alias}.date AND k.customer_id IS {alias}.customer_id"
+
+_SALES_SELECT = """
+    SELECT i.date, i.customer_id, it.product_name, SUM(it.quantity), SUM(it.quantity * it.price_per_unit)
+    FROM invoices i JOIN invoice_items it ON it.invoice_id = i.id
+    {where}
+    GROUP BY i.date, i.customer_id, it.product_name
+"""
+
+_TOTALS_SELECT = """
+    SELECT i.date, i.customer_id, COUNT(*), SUM(COALESCE(i.total_amount, 0))
+    FROM invoices i
+    {where}
+    GROUP BY i.date, i.customer_id
+"""
+
+_SALES_INSERT = "INSERT INTO daily_sales (date, customer_id, product_name, quantity, revenue)"
+_TOTALS_INSERT = "INSERT INTO daily_invoice_totals (date, customer_id, invoice_count, total_amount)"
+
+
+def refresh_sales_rollup(conn, keys):
+    """Recomputes the rollup rows for the given (date, customer_id) pairs.
+
+    Call inside the transaction that changed the invoices, after the
+    change, with the keys of both the old and the new version of every
+    touched invoice.
+    """
+    keys = {(invoice_date, customer_id) for invoice_date, customer_id in keys if invoice_date is not None}
+    if not keys:
+        return
+    _rollup_keys.create(conn, checkfirst=True)
+    conn.execute(delete(_rollup_keys))
+    conn.execute(insert(_rollup_keys), [{"date": d, "customer_id": c} for d, c in keys])
+
+    where = f"WHERE EXISTS (SELECT 1 FROM sales_rollup_keys k WHERE {_KEY_MATCHES.format(alias='i')})"
+    for table, insert_sql, select_sql in (
+        ("daily_sales", _SALES_INSERT, _SALES_SELECT),
+        ("daily_invoice_totals", _TOTALS_INSERT, _TOTALS_SELECT),
+    ):
+        conn.execute(text(
+            f"DELETE FROM {table} WHERE EXISTS "
+            f"(SELECT 1 FROM sales_rollup_keys k WHERE {_KEY_MATCHES.format(alias=table)})"
+        ))
+        conn.execute(text(insert_sql + select_sql.format(where=where)))
+    conn.execute(delete(_rollup_keys))
+
+
+def backfill_sales_rollup(conn):
+    """Rebuilds both rollup tables from scratch."""
+    for table, insert_sql, select_sql in (
+        ("daily_sales", _SALES_INSERT, _SALES_SELECT),
+        ("daily_invoice_totals", _TOTALS_INSERT, _TOTALS_SELECT),
+    ):
+        conn.execute(text(f"DELETE FROM {table}"))
+        conn.execute(text(insert_sql + select_sql.format(where="")))
+
+
+def main():
+    """One-shot backfill: python -m src.utils.sales_rollup"""
+    from src.models import DailySales, DailyInvoiceTotals
+    from .database import Base, get_engine
+
+    engine = get_engine("bulk_load")
+    Base.metadata.create_all(bind=engine, tables=[DailySales.__table__, DailyInvoiceTotals.__table__])
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        backfill_sales_rollup(conn)
+        sales_rows = conn.execute(text("SELECT COUNT(*) FROM daily_sales")).scalar()
+        total_rows = conn.execute(text("SELECT COUNT(*) FROM daily_invoice_totals")).scalar()
+    print(f"Rebuilt {sales_rows} daily_sales and {total_rows} daily_invoice_totals rows "
+          f"in {time.perf_counter() - started:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# src/utils/search_index.py
+from sqlalchemy import Integer, column, text, or_
+from sqlalchemy.exc import OperationalError
+from src.models import CustomerCompany, Product, AuditLog
+
+# FTS5 tables kept in sync with their source table by triggers, so every write
+# path (ORM, Core bulk inserts, raw SQL) updates the index.
+# fts table -> (source table, indexed column, tokenizer)
+FTS_TABLES = {
+    "products_fts": ("products", "name", "trigram"),
+    "customer_companies_fts": ("customer_companies", "name", "trigram"),
+    # Word tokens rather than trigrams: audit details are long and the table is unbounded
+    "audit_logs_fts": ("audit_logs", "details", "unicode61"),
+}
+
+# The trigram tokenizer needs at least three characters to match anything
+MIN_INDEXED_TERM_LENGTH = 3
+
+_fts_available = None
+
+
+def _search_index_ddl(fts_table, source_table, column_name, tokenizer):
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts_table} USING fts5("
+        f"{column_name}, content='{source_table}', content_rowid='id', tokenize='{tokenizer}')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ai AFTER INSERT ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}(rowid, {column_name}) VALUES (new.id, new.{column_name}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_ad AFTER DELETE ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name}); END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts_table}_au AFTER UPDATE OF {column_name} ON {source_table} BEGIN "
+        f"INSERT INTO {fts_table}({fts_table}, rowid, {column_name}) VALUES ('delete', old.id, old.{column_name}); "
+        f"INSERT INTO {fts_table}(rowid, {column_name}) VALUES (new.id, new.{column_name}); END",
+    ]
+
+
+def ensure_search_index(engine):
+    """Creates the FTS5 name indexes and their sync triggers if missing.
+
+    Newly created indexes are rebuilt from their source table. Returns False
+    when this SQLite build lacks FTS5/trigram support; searches then fall
+    back to LIKE.
+    """
+    global _fts_available
+    try:
+        with engine.begin() as conn:
+            existing = {row[0] for row in conn.execute(text("SELECT name FROM sqlite_master WHERE type = 'table'"))}
+            for fts_table, (source_table, column_name, tokenizer) in FTS_TABLES.items():
+                for statement in _search_index_ddl(fts_table, source_table, column_name, tokenizer):
+                    conn.execute(text(statement))
+                if fts_table not in existing:
+                    conn.execute(text(f"INSERT INTO {fts_table}({fts_table}) VALUES ('rebuild')"))
+        _fts_available = True
+    except OperationalError:
+        _fts_available = False
+    return _fts_available
+
+
+def search_index_available(db_session):
+    global _fts_available
+    if _fts_available is None:
+        names = ", ".join(f"'{name}'" for name in FTS_TABLES)
+        found = db_session.execute(
+            text(f"SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name IN ({names})")
+        ).scalar()
+        _fts_available = found == len(FTS_TABLES)
+    return _fts_available
+
+
+def _match_rowids(fts_table, term, prefix=False):
+    # Quoted as a single phrase so user input is never parsed as FTS syntax
+    phrase = '"' + term.replace('"', '""') + '"'
+    if prefix:
+        # Last word may be partially typed
+        phrase += "*"
+    return text(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH :phrase").bindparams(
+        phrase=phrase
+    ).columns(column("rowid", Integer))
+
+
+def _use_index(db_session, term):
+    return len(term) >= MIN_INDEXED_TERM_LENGTH and search_index_available(db_session)
+
+
+def product_search_clause(db_session, term):
+    """Matches products whose own name or company name contains ``term``."""
+    if _use_index(db_session, term):
+        return or_(
+            Product.id.in_(_match_rowids("products_fts", term)),
+            Product.company_id.in_(_match_rowids("customer_companies_fts", term)),
+        )
+    return or_(Product.name.ilike(f"%{term}%"), CustomerCompany.name.ilike(f"%{term}%"))
+
+
+def company_search_clause(db_session, term):
+    if _use_index(db_session, term):
+        return CustomerCompany.id.in_(_match_rowids("customer_companies_fts", term))
+    return CustomerCompany.name.ilike(f"%{term}%")
+
+
+def audit_details_search_clause(db_session, term):
+    """Matches audit log entries whose details contain the words of ``term``; the last word may be a prefix."""
+    if term.strip() and search_index_available(db_session):
+        return AuditLog.id.in_(_match_rowids("audit_logs_fts", term, prefix=True))
+    return AuditLog.details.ilike(f"%{term}%")
+
+
+class IncrementalSearch:
+    """Reuses the previous result set while the user keeps typing.
+
+    ``lookup(term, limit)`` returns rows of ``(id, searchable_text, ...)``
+    with lowercase text. When a new term extends the previous one, the
+    cached rows are narrowed in memory instead of querying again. If a
+    lookup returns more than ``max_cached`` rows, ``search`` returns None
+    and the caller should filter in SQL instead. A ``lookup`` passed to
+    ``search`` replaces the default one for that call, e.g. to query
+    through a worker thread's session.
+    """
+
+    def __init__(self, lookup=None, max_cached=None):
+        self.lookup = lookup
+        self.max_cached = max_cached
+        self.invalidate()
+
+    def invalidate(self):
+        self._last_term = None
+        self._last_rows = None
+
+    def search(self, term, lookup=None):
+        term = term.strip().lower()
+        if self._last_rows is not None and self._last_term is not None and term.startswith(self._last_term):
+            if term != self._last_term:
+                self._last_rows = [row for row in self._last_rows if any(term in value for value in row[1:])]
+        else:
+            limit = self.max_cached + 1 if self.max_cached is not None else None
+            rows = (lookup or self.lookup)(term, limit)
+            self._last_rows = rows if self.max_cached is None or len(rows) <= self.max_cached else None
+        self._last_term = term
+        return None if self._last_rows is None else [row[0] for row in self._last_rows]
@@ -0,0 +1,52 @@
+# src/utils/startup_timing.py
+import os
+import sys
+import time
+
+# Imported at the top of main.py so the clock starts before the app modules load.
+# Set BILLING_APP_STARTUP_TIMING=1 to print the report.
+_START = time.perf_counter()
+ENABLED = os.environ.get("BILLING_APP_STARTUP_TIMING") == "1"
+
+_marks = []
+
+
+def mark(label):
+    elapsed = time.perf_counter() - _START
+    _marks.append((label, elapsed))
+    return elapsed
+
+
+def format_report():
+    lines = ["Startup timing (seconds since launch):"]
+    previous = 0.0
+    for label, elapsed in _marks:
+        lines.append(f"  {elapsed:8.3f}  (+{elapsed - previous:6.3f})  {label}")
+        previous = elapsed
+    heavy = [name for name in ("matplotlib", "reportlab") if name in sys.modules]
+    lines.append(f"  heavy modules loaded: {', '.join(heavy) if heavy else 'none'}")
+    return "\n".join(lines)
+
+
+def watch_first_paint(widget):
+    """Marks "first paint" when ``widget`` first paints, and prints the report if enabled."""
+    from PyQt6.QtCore import QObject, QEvent
+
+    class FirstPaintFilter(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint:
+                obj.removeEventFilter(self)
+                mark("first paint")
+                if ENABLED:
+                    print(format_report())
+            return False
+
+    paint_filter = FirstPaintFilter(widget)
+    widget.installEventFilter(paint_filter)
+    return paint_filter
+
+
+def report_tab_built(name, seconds):
+    mark(f"tab built: {name}")
+    if ENABLED:
+        print(f"Tab '{name}' built in {seconds:.3f}s")
@@ -0,0 +1,32 @@
+# src/utils/stock_summary.py
+from sqlalchemy import func, case, and_
+from sqlalchemy.orm import Session
+from src.models import Product, Inventory
+
+DEFAULT_LOW_STOCK_THRESHOLD = 10
+
+
+def get_stock_summary(db: Session):
+    """Returns total, low-stock and out-of-stock product counts in one aggregate query.
+
+    Products without an inventory row count as out of stock with the default threshold.
+    """
+    stock = func.coalesce(Inventory.stock_quantity, 0)
+    threshold = func.coalesce(Inventory.low_stock_threshold, DEFAULT_LOW_STOCK_THRESHOLD)
+    total, low, out = db.query(
+        func.count(Product.id),
+        func.sum(case((and_(stock > 0, stock <= threshold), 1), else_=0)),
+        func.sum(case((stock == 0, 1), else_=0)),
+    ).outerjoin(Product.inventory).one()
+    return {"total": total or 0, "low_stock": low or 0, "out_of_stock": out or 0}
+
+
+def apply_stock_filter(query, stock_filter):
+    """Narrows a Product query to "Low Stock" or "Out of Stock" with SQL predicates on the inventory join."""
+    if stock_filter == "Low Stock":
+        return query.join(Inventory, Inventory.product_id == Product.id).filter(
+            Inventory.stock_quantity > 0, Inventory.stock_quantity <= Inventory.low_stock_threshold
+        )
+    if stock_filter == "Out of Stock":
+        return query.join(Inventory, Inventory.product_id == Product.id).filter(Inventory.stock_quantity == 0)
+    return query
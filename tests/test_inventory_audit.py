@@ -0,0 +1,83 @@
+# tests/test_inventory_audit.py
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.models import Product, Inventory, InventoryHistory
+from src.utils.database import Base
+from src.utils import inventory_audit
+from src.utils.inventory_audit import check_inventory_integrity, repair_inventory, OPENING_BALANCE_REASON
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add_all([
+            Product(id=1, name="Bolt", price=1.0),
+            Product(id=2, name="Nut", price=1.0),
+            Product(id=3, name="Washer", price=1.0),
+            # Bolt's stock and second new_stock disagree with its history (expected 7)
+            Inventory(product_id=1, stock_quantity=9),
+            # Nut went negative, consistently
+            Inventory(product_id=2, stock_quantity=-3),
+            # Washer has stock but no history at all
+            Inventory(product_id=3, stock_quantity=5),
+        ])
+        session.flush()
+        session.add_all([
+            InventoryHistory(id=1, product_id=1, change_quantity=10, new_stock=10),
+            InventoryHistory(id=2, product_id=1, change_quantity=-3, new_stock=9),
+            InventoryHistory(id=3, product_id=2, change_quantity=2, new_stock=2),
+            InventoryHistory(id=4, product_id=2, change_quantity=-5, new_stock=-3),
+            # History of a product that no longer exists
+            InventoryHistory(id=5, product_id=999, change_quantity=4, new_stock=4),
+        ])
+        session.commit()
+        yield session
+
+
+def test_check_reports_every_kind_of_problem(db_session):
+    report = check_inventory_integrity(db_session)
+
+    assert not report.ok
+    assert report.history_mismatches == [
+        {"history_id": 2, "product_id": 1, "product_name": "Bolt", "expected": 7, "actual": 9},
+    ]
+    assert report.negative_stock == [{"history_id": 4, "product_id": 2, "product_name": "Nut", "new_stock": -3}]
+    assert report.stock_mismatches == [
+        {"product_id": 1, "product_name": "Bolt", "expected": 7, "actual": 9},
+        {"product_id": 3, "product_name": "Washer", "expected": 0, "actual": 5},
+    ]
+    assert report.orphaned_history == [5]
+
+
+def test_repair_rebuilds_stock_from_history(db_session):
+    result = repair_inventory(db_session, delete_orphans=True)
+
+    assert result == {"opening_balances_added": 1, "history_rows_fixed": 1, "stock_rows_fixed": 1, "orphans_deleted": 1}
+    stock = dict(db_session.query(Inventory.product_id, Inventory.stock_quantity))
+    assert stock == {1: 7, 2: -3, 3: 5}
+    assert db_session.get(InventoryHistory, 2).new_stock == 7
+    opening = db_session.query(InventoryHistory).filter_by(product_id=3).one()
+    assert (opening.change_quantity, opening.new_stock, opening.reason) == (5, 5, OPENING_BALANCE_REASON)
+    assert db_session.get(InventoryHistory, 5) is None
+
+    # Negative stock is real history, not a bookkeeping error, so it is still reported
+    report = check_inventory_integrity(db_session)
+    assert not report.history_mismatches and not report.stock_mismatches and not report.orphaned_history
+    assert [n["product_id"] for n in report.negative_stock] == [2]
+
+
+def test_repair_keeps_orphans_unless_asked(db_session):
+    assert repair_inventory(db_session)["orphans_deleted"] == 0
+    assert check_inventory_integrity(db_session).orphaned_history == [5]
+
+
+def test_repair_refuses_old_sqlite(db_session, monkeypatch):
+    monkeypatch.setattr(inventory_audit.sqlite3, "sqlite_version_info", (3, 32, 3))
+    monkeypatch.setattr(inventory_audit.sqlite3, "sqlite_version", "3.32.3")
+
+    with pytest.raises(RuntimeError, match="3.33"):
+        repair_inventory(db_session)
+    assert dict(db_session.query(Inventory.product_id, Inventory.stock_quantity))[1] == 9
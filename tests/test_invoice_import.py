@@ -0,0 +1,74 @@
+# tests/test_invoice_import.py
+from datetime import date
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.models import CustomerCompany, Invoice, InvoiceSequence
+from src.utils.database import Base
+from src.utils.invoice_csv import InvoiceImporter, INVOICE_COLUMNS
+from src.utils.invoice_number_service import InvoiceNumberService
+
+
+@pytest.fixture
+def db_session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        session.add(CustomerCompany(name="Acme"))
+        session.commit()
+        yield session
+
+
+@pytest.fixture
+def number_service():
+    return InvoiceNumberService(legacy_counter_file=None)
+
+
+def write_csv(path, rows):
+    lines = [",".join(INVOICE_COLUMNS)]
+    lines += [f"{number},Acme,2025-06-01,,{total}" for number, total in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def invoices(db_session):
+    return dict(db_session.query(Invoice.invoice_number, Invoice.total_amount))
+
+
+def test_blank_numbers_skip_explicit_ones_in_the_same_batch(tmp_path, db_session, number_service):
+    file_name = write_csv(tmp_path / "invoices.csv", [
+        ("INV-00001", 10), ("", 20), ("INV-00003", 30), ("", 40),
+    ])
+    report = InvoiceImporter(db_session, number_service=number_service).run(file_name)
+
+    assert report.invoices_imported == 4
+    assert invoices(db_session) == {"INV-00001": 10, "INV-00003": 30, "INV-00004": 20, "INV-00005": 40}
+
+
+def test_explicit_numbers_advance_an_existing_sequence(tmp_path, db_session, number_service):
+    # Seed the sequence before the import, as posting an invoice would
+    assert number_service.get_next_invoice_number(db_session) == "INV-00001"
+    db_session.add(Invoice(invoice_number="INV-00001", customer_id=1, date=date(2025, 6, 1), total_amount=5))
+    db_session.commit()
+
+    file_name = write_csv(tmp_path / "invoices.csv", [("", 20), ("INV-00009", 90), ("", 30)])
+    InvoiceImporter(db_session, batch_size=1, number_service=number_service).run(file_name)
+
+    assert invoices(db_session) == {"INV-00001": 5, "INV-00002": 20, "INV-00009": 90, "INV-00010": 30}
+    assert db_session.get(InvoiceSequence, "INV-").last_value == 10
+    # New invoices posted after the import carry on after the imported numbers
+    assert number_service.get_next_invoice_number(db_session) == "INV-00011"
+
+
+def test_reimporting_blank_numbers_updates_instead_of_duplicating(tmp_path, db_session, number_service):
+    rows = [("", 20), ("INV-00005", 50), ("", 20), ("", 30)]
+    file_name = write_csv(tmp_path / "invoices.csv", rows)
+    InvoiceImporter(db_session, number_service=number_service).run(file_name)
+    first = invoices(db_session)
+
+    # Resuming after the first two data lines, then re-running the whole file
+    InvoiceImporter(db_session, start_line=3, number_service=number_service).run(file_name)
+    InvoiceImporter(db_session, number_service=number_service).run(file_name)
+
+    assert invoices(db_session) == first
+    assert len(first) == 4
@@ -0,0 +1,66 @@
+# tests/test_query_profiles.py
+from datetime import date
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from src.models import CustomerCompany, Invoice, InvoiceItem
+from src.utils.database import Base
+from src.utils.query_profiles import with_profile, query_budget
+
+INVOICES = 5
+ITEMS_PER_INVOICE = 3
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(bind=engine)
+    with sessionmaker(bind=engine)() as session:
+        for n in range(INVOICES):
+            customer = CustomerCompany(name=f"Customer {n}")
+            session.add(Invoice(
+                invoice_number=f"INV-{n:05d}", customer=customer, date=date(2025, 6, 1 + n), total_amount=30,
+                items=[InvoiceItem(product_name=f"Item {i}", quantity=1, price_per_unit=10) for i in range(ITEMS_PER_INVOICE)],
+            ))
+        session.commit()
+    return engine
+
+
+@pytest.fixture
+def db_session(engine):
+    with sessionmaker(bind=engine)() as session:
+        yield session
+
+
+@pytest.fixture
+def budget_mode(monkeypatch):
+    monkeypatch.setenv("BILLING_APP_QUERY_BUDGET", "1")
+
+
+def test_invoice_list_profile_loads_customers_in_one_statement(engine, db_session, budget_mode):
+    with query_budget(1, bind=engine) as counter:
+        invoices = with_profile(db_session.query(Invoice), "invoice_list").order_by(Invoice.id).all()
+        names = [invoice.customer.name for invoice in invoices]
+    assert names == [f"Customer {n}" for n in range(INVOICES)]
+    assert counter.count == 1
+
+
+def test_invoice_detail_profile_loads_items_in_two_statements(engine, db_session, budget_mode):
+    with query_budget(2, bind=engine) as counter:
+        invoices = with_profile(db_session.query(Invoice), "invoice_detail").order_by(Invoice.id).all()
+        lines = sum(len(invoice.items) for invoice in invoices if invoice.customer.name)
+    assert lines == INVOICES * ITEMS_PER_INVOICE
+    assert counter.count == 2
+
+
+def test_budget_catches_lazy_loading(engine, db_session, budget_mode):
+    with pytest.raises(AssertionError, match="at most 2 SQL statements"):
+        with query_budget(2, bind=engine):
+            for invoice in db_session.query(Invoice).all():
+                len(invoice.items)
+
+
+def test_budget_is_off_outside_test_mode(engine, db_session, monkeypatch):
+    monkeypatch.delenv("BILLING_APP_QUERY_BUDGET", raising=False)
+    with query_budget(0, bind=engine):
+        db_session.query(Invoice).all()